@@ -20,6 +20,9 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+from result_schema import BenchmarkRecord, ResultStore, write_csv
+from benchmark_internal_universal import MODEL_NAME  # model deployed in all pods, recorded with every result
+
 # Configuration
 DEPLOYMENTS = {
     'base-yolo': {
@@ -48,6 +51,8 @@ DEPLOYMENTS = {
         'port_forward_http': 8200,
         'port_forward_grpc': 8201,
         'supports_grpc': True,
+        # Ensemble installed by kubernetes/nim-grpc/deployment.yaml (engine + server-side top-K/NMS)
+        'topk_model': f"{MODEL_NAME}_topk",
     },
     'nim-batching': {
         'namespace': 'yolo-nim-batching',
@@ -64,6 +69,45 @@ ITERATIONS = 50
 CONCURRENCY = 1  # Set to 1 for sequential, 8+ for load testing
 OUTPUT_DIR = Path("/mnt/coecommonfss/llmcore/benchmarking")
 
+# Append-only store of every run (one BenchmarkRecord per line), read by visualize_results.py
+RESULT_STORE = OUTPUT_DIR / "results.jsonl"
+# The whole store re-exported after every run, in the aggregated_results.csv layout
+RESULT_CSV = OUTPUT_DIR / "aggregated_results.csv"
+
+# Directory of real JPEGs to replay instead of random inputs (None = random inputs)
+CORPUS_DIR = None
+CORPUS_ORDER = 'sequential'  # 'sequential' or 'shuffle'
+
+# Client request policy for NIM load tests (see request_policy.py), e.g. "--deadline-ms 2000 --retries 2 --hedge"
+REQUEST_POLICY_ARGS = ""
+
+# Client-side load balancing across all replica pods of a NIM deployment for load tests
+# (None = the pod's local Triton only): 'round-robin', 'least-outstanding' or 'p2c'
+LOAD_BALANCE = None
+
+# Client processes for NIM load tests: > 1 drives the load from multiproc_load.py (one asyncio
+# loop per process) instead of one threaded process, so the client's GIL is not the bottleneck
+CLIENT_PROCESSES = 1
+
+# Helper modules imported by the in-pod benchmark scripts
+SUPPORT_MODULES = ["image_corpus.py", "triton_metrics.py", "latency_analysis.py", "result_schema.py",
+                   "request_policy.py", "load_balancer.py", "histogram.py", "http_codec.py",
+                   "cost_accounting.py"]
+# Server modules they import as well (image_corpus counts detections with base-yolo's decode/NMS)
+SHARED_MODULES = [Path(__file__).resolve().parent.parent / "docker" / "base-yolo" / "nms.py"]
+
+# Model matrix run on the Triton deployments (None = single-model run only).
+# Models are loaded/unloaded through the explicit model-control API; each entry
+# must exist in the pod's model repository ('<model>_<imgsz>' for imgsz != 640):
+# deploy with the same lists, MATRIX_MODELS=... MATRIX_IMGSZ=... ./deploy-all.sh
+MATRIX_MODELS = None  # e.g. ["yolov8s", "yolov8m", "yolov8l", "yolov8x", "yolov11s", "yolov11m", "yolov11l"]
+MATRIX_IMGSZ = [640]
+MATRIX_CONCURRENCY = [1, 4, 8, 16, 32]
+
+# Compare raw output0 with the server-side top-K ensemble on deployments that have one
+# ('topk_model' above): response bytes and end-to-end latency including client NMS
+TOPK_COMPARE = False
+
 # Colors
 class Colors:
     RED = '\033[0;31m'
@@ -107,6 +151,14 @@ def get_pod_name(namespace, label):
         return stdout.strip()
     return None
 
+def get_pod_ips(namespace, label):
+    """Pod IPs of every running replica behind a deployment"""
+    cmd = f"kubectl get pods -n {namespace} -l {label} --field-selector=status.phase=Running -o jsonpath='{{.items[*].status.podIP}}'"
+    success, stdout, _ = run_command(cmd)
+    if success and stdout:
+        return stdout.split()
+    return []
+
 def copy_benchmark_to_pod(deployment_name, config):
     """Copy appropriate benchmark script to pod"""
     print_info(f"Copying benchmark script to {deployment_name}...")
@@ -123,7 +175,8 @@ def copy_benchmark_to_pod(deployment_name, config):
     # Choose appropriate benchmark script
     if deployment_name == 'base-yolo':
         # Use appropriate PyTorch benchmark based on concurrency
-        if CONCURRENCY > 1:
+        # (the /benchmark endpoint cannot replay a corpus, so corpus runs use /infer)
+        if CONCURRENCY > 1 or CORPUS_DIR:
             src = OUTPUT_DIR / "benchmark_base_yolo_concurrent.py"
             dest_name = "benchmark_base_yolo_concurrent.py"
         else:
@@ -133,18 +186,72 @@ def copy_benchmark_to_pod(deployment_name, config):
         # Use universal Triton benchmark for NIMs
         src = OUTPUT_DIR / "benchmark_internal_universal.py"
         dest_name = "benchmark_internal_universal.py"
+        if MATRIX_MODELS or (TOPK_COMPARE and config.get('topk_model')):
+            cmd = f"kubectl cp {OUTPUT_DIR / 'benchmark_matrix.py'} {config['namespace']}/{pod_name}:/tmp/debug/benchmark_matrix.py -c {config['container']}"
+            run_command(cmd)
+        if TOPK_COMPARE and config.get('topk_model'):
+            cmd = f"kubectl cp {OUTPUT_DIR / 'benchmark_topk.py'} {config['namespace']}/{pod_name}:/tmp/debug/benchmark_topk.py -c {config['container']}"
+            run_command(cmd)
+        if use_multiproc():
+            cmd = f"kubectl cp {OUTPUT_DIR / 'multiproc_load.py'} {config['namespace']}/{pod_name}:/tmp/debug/multiproc_load.py -c {config['container']}"
+            run_command(cmd)
 
     # Copy benchmark script
     cmd = f"kubectl cp {src} {config['namespace']}/{pod_name}:/tmp/debug/{dest_name} -c {config['container']}"
     success, _, stderr = run_command(cmd)
 
-    if success:
-        print_success(f"Benchmark script copied to {deployment_name}")
-        return True
-    else:
+    if not success:
         print_error(f"Failed to copy to {deployment_name}: {stderr}")
         return False
 
+    # Copy helper modules next to the script
+    for module in [OUTPUT_DIR / m for m in SUPPORT_MODULES] + SHARED_MODULES:
+        cmd = f"kubectl cp {module} {config['namespace']}/{pod_name}:/tmp/debug/{module.name} -c {config['container']}"
+        success, _, stderr = run_command(cmd)
+        if not success:
+            print_error(f"Failed to copy {module.name} to {deployment_name}: {stderr}")
+            return False
+
+    # Copy image corpus (decoded cache is built inside the pod on first use)
+    if CORPUS_DIR:
+        cmd = f"kubectl cp {CORPUS_DIR} {config['namespace']}/{pod_name}:/tmp/debug/corpus -c {config['container']}"
+        success, _, stderr = run_command(cmd)
+        if not success:
+            print_error(f"Failed to copy corpus to {deployment_name}: {stderr}")
+            return False
+
+    print_success(f"Benchmark script copied to {deployment_name}")
+    return True
+
+def use_multiproc():
+    """NIM load tests run from multiproc_load.py (no corpus replay or request policy there)"""
+    return CLIENT_PROCESSES > 1 and CONCURRENCY > 1 and not CORPUS_DIR
+
+def corpus_args():
+    """Extra in-pod benchmark arguments for corpus replay"""
+    if not CORPUS_DIR:
+        return ""
+    return f" --corpus /tmp/debug/corpus --corpus-order {CORPUS_ORDER}"
+
+def policy_args():
+    """Extra in-pod benchmark arguments for the client request policy"""
+    if not REQUEST_POLICY_ARGS or CONCURRENCY <= 1:
+        return ""
+    return f" {REQUEST_POLICY_ARGS}"
+
+def lb_args(config):
+    """Protocol and --endpoints/--lb arguments to spread a NIM load test over its replicas"""
+    if not LOAD_BALANCE or CONCURRENCY <= 1:
+        return "auto", ""
+    pod_ips = get_pod_ips(config['namespace'], config['pod_label'])
+    if len(pod_ips) < 2:
+        print_warning(f"LOAD_BALANCE set but only {len(pod_ips)} replica(s) found, using the local endpoint")
+        return "auto", ""
+    protocol, port = ('grpc', 8001) if config['supports_grpc'] else ('http', 8000)
+    endpoints = ','.join(f"{ip}:{port}" for ip in pod_ips)
+    print_info(f"Balancing over {len(pod_ips)} replicas ({LOAD_BALANCE})")
+    return protocol, f" --endpoints {endpoints} --lb {LOAD_BALANCE}"
+
 def run_internal_benchmark(deployment_name, config):
     """Run benchmark inside the pod"""
     mode = "LOAD TEST" if CONCURRENCY > 1 else "Sequential"
@@ -157,10 +264,10 @@ def run_internal_benchmark(deployment_name, config):
 
     # Choose appropriate benchmark script
     if deployment_name == 'base-yolo':
-        if CONCURRENCY > 1:
+        if CONCURRENCY > 1 or CORPUS_DIR:
             print_info(f"Running PyTorch load test ({ITERATIONS} requests, {CONCURRENCY} workers)...")
             script_name = "benchmark_base_yolo_concurrent.py"
-            cmd = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} -- python3 /tmp/debug/{script_name} {ITERATIONS} {CONCURRENCY}"
+            cmd = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} -- python3 /tmp/debug/{script_name} {ITERATIONS} {CONCURRENCY}{corpus_args()}"
         else:
             print_info(f"Running PyTorch baseline benchmark ({ITERATIONS} iterations)...")
             script_name = "benchmark_base_yolo.py"
@@ -172,7 +279,14 @@ def run_internal_benchmark(deployment_name, config):
             print_info(f"Running load test ({ITERATIONS} requests, {CONCURRENCY} workers)...")
         else:
             print_info(f"Running sequential benchmark ({ITERATIONS} iterations)...")
-        cmd = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} -- python3 /tmp/debug/{script_name} {ITERATIONS} auto {CONCURRENCY}"
+        if use_multiproc():
+            protocol = 'grpc' if config['supports_grpc'] else 'http'
+            _, balance = lb_args(config)
+            print_info(f"Spreading the load over {CLIENT_PROCESSES} client processes ({protocol.upper()})")
+            cmd = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} -- python3 /tmp/debug/multiproc_load.py {ITERATIONS} {protocol} {CONCURRENCY} --processes {CLIENT_PROCESSES}{balance}"
+        else:
+            protocol, balance = lb_args(config)
+            cmd = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} -- python3 /tmp/debug/{script_name} {ITERATIONS} {protocol} {CONCURRENCY}{corpus_args()}{policy_args()}{balance}"
 
     # Run benchmark
     success, stdout, stderr = run_command(cmd)
@@ -193,14 +307,87 @@ def run_internal_benchmark(deployment_name, config):
     if success:
         try:
             results = json.loads(json_output)
-            results['deployment'] = deployment_name
-            results['test_type'] = 'internal'
-            return results
+            results.setdefault('model', MODEL_NAME)
+            return BenchmarkRecord.from_result(
+                results,
+                deployment=deployment_name,
+                location='internal',
+                test_type='internal',
+                timestamp=datetime.now().isoformat(),
+            )
         except json.JSONDecodeError:
             print_warning("Could not parse JSON results")
 
     return None
 
+def run_matrix_benchmark(deployment_name, config, store):
+    """Run the model x resolution x concurrency matrix inside a Triton pod and merge its records"""
+    print_header(f"Model Matrix: {deployment_name}")
+
+    pod_name = get_pod_name(config['namespace'], config['pod_label'])
+    if not pod_name:
+        print_error(f"Pod not found for {deployment_name}")
+        return 0
+
+    pod_store = "/tmp/debug/matrix_results.jsonl"
+    exec_prefix = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} --"
+    run_command(f"{exec_prefix} rm -f {pod_store}")
+
+    print_info(f"Models: {', '.join(MATRIX_MODELS)} | imgsz: {MATRIX_IMGSZ} | concurrency: {MATRIX_CONCURRENCY}")
+    cmd = (f"{exec_prefix} sh -c 'cd /tmp/debug && python3 benchmark_matrix.py"
+           f" --models {','.join(MATRIX_MODELS)}"
+           f" --imgsz {','.join(str(s) for s in MATRIX_IMGSZ)}"
+           f" --concurrency {','.join(str(c) for c in MATRIX_CONCURRENCY)}"
+           f" --iterations {ITERATIONS} --deployment {deployment_name} --store {pod_store}'")
+    success, stdout, stderr = run_command(cmd)
+    print(stdout)
+    if not success:
+        print_warning(f"Matrix run reported failures on {deployment_name}: {stderr[:300]}")
+
+    # Merge whatever completed (the pod store is appended run by run)
+    success, output, _ = run_command(f"{exec_prefix} cat {pod_store}")
+    if not success:
+        print_error(f"No matrix results from {deployment_name}")
+        return 0
+
+    merged = 0
+    for line in output.splitlines():
+        if line.strip():
+            store.append(BenchmarkRecord.from_dict(json.loads(line)))
+            merged += 1
+    print_success(f"Merged {merged} matrix records into {RESULT_STORE}")
+    return merged
+
+def run_topk_benchmark(deployment_name, config):
+    """Compare raw output with the top-K ensemble inside a Triton pod; returns the comparison dict"""
+    print_header(f"Raw vs Top-K Output: {deployment_name}")
+
+    pod_name = get_pod_name(config['namespace'], config['pod_label'])
+    if not pod_name:
+        print_error(f"Pod not found for {deployment_name}")
+        return None
+
+    exec_prefix = f"kubectl exec -n {config['namespace']} {pod_name} -c {config['container']} --"
+    protocol = 'grpc' if config['supports_grpc'] else 'http'
+    corpus = " --corpus /tmp/debug/corpus" if CORPUS_DIR else ""
+    cmd = (f"{exec_prefix} sh -c 'cd /tmp/debug && python3 benchmark_topk.py {ITERATIONS} {protocol} {CONCURRENCY}"
+           f" --topk-model {config['topk_model']}{corpus}'")
+    success, stdout, stderr = run_command(cmd)
+    print(stdout)
+    if not success:
+        print_error(f"Top-K comparison failed for {deployment_name}: {stderr[:300]}")
+        return None
+
+    success, json_output, _ = run_command(f"{exec_prefix} cat /tmp/debug/topk_results.json")
+    if not success:
+        return None
+    results = json.loads(json_output)
+    result_file = OUTPUT_DIR / f"{deployment_name}_topk.json"
+    with open(result_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_success(f"Results saved: {result_file}")
+    return results
+
 def test_port_forward(deployment_name, config, protocol='http'):
     """Test deployment via port forwarding"""
     print_info(f"Testing {deployment_name} via port forwarding ({protocol.upper()})...")
@@ -261,6 +448,7 @@ def generate_report(all_results):
         report_lines.append(f"Concurrency: {CONCURRENCY} workers (LOAD TEST MODE)")
     else:
         report_lines.append(f"Mode: Sequential (1 request at a time)")
+    report_lines.append(f"Input: {'image corpus ' + str(CORPUS_DIR) + ' (' + CORPUS_ORDER + ')' if CORPUS_DIR else 'random tensors'}")
     report_lines.append("")
 
     # Summary table
@@ -282,33 +470,32 @@ def generate_report(all_results):
         report_lines.append("-" * 85)
 
     # Sort by mean latency (put base-yolo last for comparison)
-    sorted_results = sorted(all_results, key=lambda x: (
-        0 if x.get('deployment') != 'base-yolo' else 1,  # base-yolo last
-        x.get('latency_ms', {}).get('mean', 999999)
+    sorted_results = sorted(all_results, key=lambda r: (
+        0 if r.deployment != 'base-yolo' else 1,  # base-yolo last
+        r.get('latency_mean_ms', 999999)
     ))
 
     # Find base-yolo baseline for speedup calculation
     baseline_latency = None
-    for result in sorted_results:
-        if result.get('deployment') == 'base-yolo':
-            baseline_latency = result['latency_ms']['mean']
+    for record in sorted_results:
+        if record.deployment == 'base-yolo':
+            baseline_latency = record.latency_mean_ms
             break
 
-    for result in sorted_results:
-        if 'latency_ms' in result:
-            deployment = result['deployment']
-            framework = result.get('framework', result['protocol']).upper()
+    for record in sorted_results:
+        if record.latency_mean_ms is not None:
+            deployment = record.deployment
+            framework = record.get('framework', record.protocol).upper()
             if framework in ['HTTP', 'GRPC']:
                 framework = 'TensorRT'
-            mean = result['latency_ms']['mean']
-            p95 = result['latency_ms']['p95']
-            fps = result.get('throughput_fps', 0)
-            mode = result.get('mode', 'sequential')
+            mean = record.latency_mean_ms
+            p95 = record.get('latency_p95_ms', 0)
+            fps = record.get('throughput_fps', 0)
 
             if CONCURRENCY > 1:
                 # For concurrent mode, show throughput and mode
                 throughput_str = f"{fps:.1f} FPS"
-                mode_str = f"{mode} (c={result.get('concurrency', 1)})"
+                mode_str = f"{record.mode} (c={record.concurrency:g})"
                 report_lines.append(f"{deployment:<15} | {framework:<10} | {mean:>9.2f}  | {p95:>9.2f}  | {throughput_str:<12} | {mode_str}")
             else:
                 # For sequential mode, show speedup
@@ -324,46 +511,99 @@ def generate_report(all_results):
 
     report_lines.append("")
 
+    # Resources per 1000 inferences (client always; server where it reports /accounting)
+    costed = [r for r in sorted_results if (r.get('client_cost') or {}).get('per_1000_inferences')]
+    if costed:
+        report_lines.append("=" * 80)
+        report_lines.append("COST PER 1000 INFERENCES")
+        report_lines.append("=" * 80)
+        report_lines.append("")
+        report_lines.append(f"{'Deployment':<15} | {'Protocol':<8} | {'Client CPU-s':>12} | {'MB sent':>9} | "
+                            f"{'MB recv':>9} | {'Server CPU-s':>12}")
+        report_lines.append("-" * 82)
+        for record in costed:
+            client = record.get('client_cost')['per_1000_inferences']
+            server = (record.get('server_cost') or {}).get('per_1000_inferences')
+            server_cpu = f"{server['process_cpu_sec']:>12.2f}" if server else f"{'N/A':>12}"
+            report_lines.append(f"{record.deployment:<15} | {(record.protocol or '').upper():<8} | "
+                                f"{client['cpu_sec']:>12.2f} | {client['mb_sent']:>9.2f} | "
+                                f"{client['mb_received']:>9.2f} | {server_cpu}")
+        report_lines.append("")
+
     # Detailed results
     report_lines.append("=" * 80)
     report_lines.append("DETAILED RESULTS")
     report_lines.append("=" * 80)
     report_lines.append("")
 
-    for result in sorted_results:
-        if 'latency_ms' not in result:
+    for record in sorted_results:
+        if record.latency_mean_ms is None:
             continue
 
-        deployment = result['deployment']
-        protocol = result['protocol'].upper()
-
         report_lines.append(f"{'─' * 80}")
-        report_lines.append(f"{deployment} ({protocol})")
+        report_lines.append(f"{record.deployment} ({(record.protocol or '').upper()}, model {record.model})")
         report_lines.append(f"{'─' * 80}")
 
-        lat = result['latency_ms']
         report_lines.append(f"  Latency Statistics:")
-        report_lines.append(f"    Min:       {lat['min']:>8.2f} ms")
-        report_lines.append(f"    Mean:      {lat['mean']:>8.2f} ms")
-        report_lines.append(f"    Median:    {lat['median']:>8.2f} ms")
-        report_lines.append(f"    P90:       {lat['p90']:>8.2f} ms")
-        report_lines.append(f"    P95:       {lat['p95']:>8.2f} ms")
-        report_lines.append(f"    P99:       {lat['p99']:>8.2f} ms")
-        report_lines.append(f"    Max:       {lat['max']:>8.2f} ms")
-
-        if 'throughput_fps' in result:
-            report_lines.append(f"  Throughput:    {result['throughput_fps']:>8.1f} FPS")
-            if 'avg_latency_fps' in result:
-                report_lines.append(f"  Avg FPS:       {result['avg_latency_fps']:>8.1f} (from latency)")
-
-        if 'concurrency' in result:
-            report_lines.append(f"  Concurrency:   {result['concurrency']} workers")
-
-        if 'total_time_sec' in result:
-            report_lines.append(f"  Total Time:    {result['total_time_sec']:>8.2f} sec")
-
-        if 'errors' in result and result['errors'] > 0:
-            report_lines.append(f"  Errors:        {result['errors']}")
+        for label, field in (('Min', 'latency_min_ms'), ('Mean', 'latency_mean_ms'),
+                             ('Median', 'latency_p50_ms'), ('P90', 'latency_p90_ms'),
+                             ('P95', 'latency_p95_ms'), ('P99', 'latency_p99_ms'),
+                             ('Max', 'latency_max_ms')):
+            value = getattr(record, field)
+            if value is not None:
+                report_lines.append(f"    {label + ':':<10} {value:>8.2f} ms")
+
+        if record.throughput_fps is not None:
+            report_lines.append(f"  Throughput:    {record.throughput_fps:>8.1f} FPS")
+            if record.avg_latency_fps is not None:
+                report_lines.append(f"  Avg FPS:       {record.avg_latency_fps:>8.1f} (from latency)")
+
+        report_lines.append(f"  Concurrency:   {record.concurrency:g} workers")
+
+        if record.total_time_sec is not None:
+            report_lines.append(f"  Total Time:    {record.total_time_sec:>8.2f} sec")
+
+        if record.errors:
+            report_lines.append(f"  Errors:        {record.errors:g}")
+
+        server = record.get('server_metrics')
+        if server:
+            parts = server['per_request_ms']
+            report_lines.append(f"  Server Breakdown (Triton metrics, per request):")
+            report_lines.append(f"    Avg Batch:   {server['avg_batch_size']:>8.2f} ({server['executions']} executions)")
+            report_lines.append(f"    Queue:       {parts['queue']:>8.2f} ms")
+            report_lines.append(f"    Compute:     {parts['compute_input'] + parts['compute_infer'] + parts['compute_output']:>8.2f} ms "
+                                f"(input {parts['compute_input']:.2f}, infer {parts['compute_infer']:.2f}, output {parts['compute_output']:.2f})")
+            if 'transport' in parts:
+                report_lines.append(f"    Transport:   {parts['transport']:>8.2f} ms")
+
+        if record.get('latency_by_detections'):
+            report_lines.append(f"  Latency by detection count:")
+            for label, stats in record.get('latency_by_detections').items():
+                report_lines.append(f"    {label:<6} dets: {stats['requests']:>5} req, "
+                                    f"mean {stats['mean']:>8.2f} ms, p95 {stats['p95']:>8.2f} ms")
+
+        steady = record.get('steady_state')
+        if steady:
+            report_lines.append(f"  Steady State ({steady['method']}): from request {steady['steady_state_index']} "
+                                f"of {steady['requests']}, mean {steady['latency_ms']['mean']:.2f} ms, "
+                                f"p99 {steady['latency_ms']['p99']:.2f} ms")
+            if steady['warmup_shortfall']:
+                report_lines.append(f"    ⚠ Fixed warmup too short by {steady['warmup_shortfall']} requests")
+
+        for side, cost in (('Client', record.get('client_cost')), ('Server', record.get('server_cost'))):
+            per = (cost or {}).get('per_inference')
+            if not per:
+                continue
+            cpu_ms = per['cpu_ms'] if 'cpu_ms' in per else per['process_cpu_ms']
+            sent, received = (per['bytes_sent'], per['bytes_received']) if 'bytes_sent' in per else (per['bytes_out'], per['bytes_in'])
+            report_lines.append(f"  {side} Cost (per inference): {cpu_ms:.2f} ms CPU, "
+                                f"{sent:,.0f} B sent, {received:,.0f} B received")
+            peak = per.get('alloc_peak_bytes', cost.get('alloc_peak_bytes_per_request'))
+            if peak is not None:
+                retained = per.get('retained_blocks', cost.get('retained_blocks_per_request'))
+                report_lines.append(f"    Allocations: {peak / 1024:,.0f} KiB peak, {retained:,.0f} blocks "
+                                    f"retained per request ({cost['alloc_samples']} sampled)")
 
         report_lines.append("")
 
@@ -374,18 +614,18 @@ def generate_report(all_results):
     report_lines.append("")
 
     # Find best performers (excluding baseline)
-    nim_results = [r for r in sorted_results if r.get('deployment') != 'base-yolo']
+    nim_results = [r for r in sorted_results if r.deployment != 'base-yolo' and r.latency_mean_ms is not None]
     if nim_results:
         best_latency = nim_results[0]
-        best_throughput = max(nim_results, key=lambda x: x.get('throughput_fps', 0))
+        best_throughput = max(nim_results, key=lambda r: r.get('throughput_fps', 0))
 
         report_lines.append("Best NIM Performance:")
-        report_lines.append(f"  Lowest Latency:     {best_latency['deployment']} - {best_latency['latency_ms']['mean']:.2f} ms")
-        report_lines.append(f"  Highest Throughput: {best_throughput['deployment']} - {best_throughput.get('throughput_fps', 0):.1f} FPS")
+        report_lines.append(f"  Lowest Latency:     {best_latency.deployment} - {best_latency.latency_mean_ms:.2f} ms")
+        report_lines.append(f"  Highest Throughput: {best_throughput.deployment} - {best_throughput.get('throughput_fps', 0):.1f} FPS")
 
         # TensorRT speedup
         if baseline_latency:
-            best_speedup = baseline_latency / best_latency['latency_ms']['mean']
+            best_speedup = baseline_latency / best_latency.latency_mean_ms
             report_lines.append(f"  TensorRT Speedup:   {best_speedup:.1f}x faster than PyTorch baseline")
         report_lines.append("")
 
@@ -488,6 +728,7 @@ def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     all_results = []
+    store = ResultStore(RESULT_STORE)
 
     # Step 1: Copy benchmark scripts to all pods
     print_header("Step 1: Copying Benchmark Scripts to Pods")
@@ -504,15 +745,30 @@ def main():
         result = run_internal_benchmark(deployment_name, config)
         if result:
             all_results.append(result)
+            store.append(result)
 
             # Save individual result
             result_file = OUTPUT_DIR / f"{deployment_name}_internal.json"
             with open(result_file, 'w') as f:
-                json.dump(result, f, indent=2)
-            print_success(f"Results saved: {result_file}")
+                json.dump(result.to_dict(), f, indent=2)
+            print_success(f"Results saved: {result_file} (appended to {RESULT_STORE.name})")
 
         time.sleep(1)
 
+    # Step 2b: Model matrix on the Triton deployments
+    if MATRIX_MODELS:
+        print_header("Step 2b: Running Model Matrix")
+        for deployment_name, config in DEPLOYMENTS.items():
+            if deployment_name != 'base-yolo':
+                run_matrix_benchmark(deployment_name, config, store)
+
+    # Step 2c: Raw output vs server-side top-K
+    if TOPK_COMPARE:
+        print_header("Step 2c: Comparing Raw Output with Server-Side Top-K")
+        for deployment_name, config in DEPLOYMENTS.items():
+            if config.get('topk_model'):
+                run_topk_benchmark(deployment_name, config)
+
     # Step 3: Test port forwarding
     print_header("Step 3: Testing Port Forwarding Endpoints")
     print("Ensure setup_port_forwarding.sh is running!\n")
@@ -539,8 +795,11 @@ def main():
         # Save all results
         all_results_file = OUTPUT_DIR / f"all_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(all_results_file, 'w') as f:
-            json.dump(all_results, f, indent=2)
+            json.dump([r.to_dict() for r in all_results], f, indent=2)
         print_success(f"All results saved: {all_results_file}")
+
+        write_csv(store.load(), RESULT_CSV)
+        print_success(f"Result store exported: {RESULT_CSV}")
     else:
         print_error("No results to generate report")
 
@@ -3,58 +3,100 @@
 Base YOLO PyTorch Benchmark Script
 Runs inside base-yolo pod to measure baseline PyTorch performance
 
+Starts a background benchmark job on the server's /benchmark endpoint and
+follows its NDJSON progress stream, so the server keeps serving /infer while
+the benchmark runs. Ctrl+C cancels the job.
+
 Usage:
-  python3 benchmark_base_yolo.py [iterations]
+  python3 benchmark_base_yolo.py [iterations] [--batch-sizes 1,4,8] [--threads 1,2] [--warmup 10]
+                                 [--profiles default,latency,throughput,cpu-max]
 """
 
 import sys
 import json
 import time
+import argparse
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
 
-def benchmark_base_yolo(iterations=50):
-    """Benchmark base-yolo using its built-in /benchmark endpoint"""
-    try:
-        from urllib.request import Request, urlopen
-    except ImportError:
-        print("ERROR: urllib not available")
-        sys.exit(1)
+BASE_URL = "http://127.0.0.1:8080"
+STREAM_READ_TIMEOUT_SEC = 60  # longest gap between progress lines (one slow model call)
 
+def _request(path, method='GET', timeout=10):
+    req = Request(f"{BASE_URL}{path}", method=method)
+    req.add_header('Content-Type', 'application/json')
+    try:
+        with urlopen(req, timeout=timeout) as response:
+            return json.loads(response.read())
+    except HTTPError as e:
+        # Rejected jobs (e.g. threads above BENCHMARK_MAX_MODEL_COPIES) explain why in the body
+        raise RuntimeError(f"HTTP {e.code}: {e.read().decode(errors='replace').strip()}") from None
+
+def follow_job(job_id):
+    """Print progress from the job's NDJSON event stream; returns the final status"""
+    status = None
+    last_line = 0.0
+    with urlopen(f"{BASE_URL}/benchmark/{job_id}/events", timeout=STREAM_READ_TIMEOUT_SEC) as response:
+        for line in response:
+            if not line.strip():
+                continue
+            status = json.loads(line)
+            progress = status.get('progress')
+            now = time.time()
+            if progress and now - last_line >= 2:
+                last_line = now
+                lat = progress.get('latency_ms') or {}
+                print(f"  [{status['configs_done'] + 1}/{len(status['configs'])}] "
+                      f"{progress['profile']} batch {progress['batch_size']} threads {progress['threads']}: "
+                      f"{progress['completed']}/{progress['iterations']}"
+                      + (f"  p50 {lat['p50']:.1f} ms  p95 {lat['p95']:.1f} ms" if lat else '')
+                      + (f"  (yielded {progress['yield_ms']:.0f} ms to traffic)" if progress['yield_ms'] else ''))
+    return status
+
+def benchmark_base_yolo(iterations=50, batch_sizes='1', threads='1', warmup=10, profiles=None):
+    """Benchmark base-yolo using its built-in /benchmark endpoint"""
     print(f"\n{'='*70}")
     print(f"Base YOLO PyTorch Benchmark (Inside Pod)")
     print(f"{'='*70}\n")
 
     print(f"Configuration:")
-    print(f"  URL: http://127.0.0.1:8080/benchmark")
-    print(f"  Iterations: {iterations}")
+    print(f"  URL: {BASE_URL}/benchmark")
+    print(f"  Iterations: {iterations} per configuration")
+    print(f"  Batch sizes: {batch_sizes}")
+    print(f"  Threads: {threads}")
+    print(f"  Profiles: {profiles or 'serving profile'}")
     print(f"  Framework: PyTorch + Ultralytics YOLO\n")
 
     # Check health first
     try:
-        health_url = "http://127.0.0.1:8080/health"
-        req = Request(health_url)
-        with urlopen(req, timeout=5) as response:
-            health = json.loads(response.read())
+        health = _request("/health", timeout=5)
         print(f"✓ Server ready: {health.get('status')}")
-        print(f"  Deployment: {health.get('deployment')}\n")
+        print(f"  Deployment: {health.get('deployment')}")
+        print(f"  Serving profile: {health.get('profile', {}).get('name', 'n/a')}\n")
     except Exception as e:
         print(f"✗ Health check failed: {e}")
         return None
 
-    # Run benchmark using built-in endpoint
+    # Run benchmark as a background job and follow its progress
+    job_id = None
     try:
-        url = f"http://127.0.0.1:8080/benchmark?iterations={iterations}"
-        req = Request(url, method='POST')
-        req.add_header('Content-Type', 'application/json')
+        job = _request(f"/benchmark?iterations={iterations}&warmup={warmup}"
+                       f"&batch_sizes={batch_sizes}&threads={threads}"
+                       + (f"&profiles={profiles}" if profiles else ''), method='POST')
+        job_id = job['job_id']
 
-        print(f"Running PyTorch benchmark...")
-        print(f"(includes 10 warmup iterations)\n")
+        print(f"Running PyTorch benchmark (job {job_id}, {len(job['configs'])} configurations)...")
+        print(f"(includes {warmup} warmup iterations per configuration)\n")
 
         start = time.time()
-        with urlopen(req, timeout=300) as response:  # 5 min timeout for large iterations
-            result = json.loads(response.read())
+        status = follow_job(job_id)
         end = time.time()
 
-        print(f"Benchmark completed in {end - start:.2f} seconds\n")
+        if not status or status['state'] != 'done' or not status['results']:
+            print(f"✗ Benchmark job {job_id} ended as {status and status['state']}: {status and status.get('error')}")
+            return None
+        print(f"\nBenchmark completed in {end - start:.2f} seconds\n")
+        result = status['results'][0]
 
         # Print results
         print(f"{'='*70}")
@@ -71,32 +113,47 @@ def benchmark_base_yolo(iterations=50):
         print(f"  Min:     {lat['min']:7.2f} ms")
         print(f"  Max:     {lat['max']:7.2f} ms")
         print(f"  Mean:    {lat['mean']:7.2f} ms")
+        print(f"  P50:     {lat['p50']:7.2f} ms")
         print(f"  P95:     {lat['p95']:7.2f} ms")
+        print(f"  P99:     {lat['p99']:7.2f} ms")
         print()
 
         print(f"Throughput:")
         print(f"  FPS:     {result['fps']:7.2f}")
         print()
 
+        if len(status['results']) > 1:
+            print(f"Sweep:")
+            print(f"  {'Profile':<11} {'Batch':>5} {'Threads':>7} {'Mean ms':>9} {'P95 ms':>9} {'FPS':>9}")
+            for r in status['results']:
+                print(f"  {r['profile']:<11} {r['batch_size']:>5} {r['threads']:>7} {r['latency_ms']['mean']:9.2f} "
+                      f"{r['latency_ms']['p95']:9.2f} {r['fps']:9.2f}")
+            print()
+
         # Format for compatibility with universal benchmark
         formatted_result = {
             'protocol': 'http',
             'location': 'internal',
             'framework': 'pytorch',
             'deployment': 'base-pytorch',
+            'profile': result.get('profile'),
             'iterations': result['iterations'],
             'latency_ms': {
                 'min': lat['min'],
                 'max': lat['max'],
                 'mean': lat['mean'],
-                'median': lat['mean'],  # Not provided by base-yolo, use mean
-                'p50': lat['mean'],
-                'p90': lat['p95'],  # Not provided, use p95
+                'median': lat['p50'],
+                'p50': lat['p50'],
+                'p90': lat['p90'],
                 'p95': lat['p95'],
-                'p99': lat['p95'],  # Not provided, use p95
+                'p99': lat['p99'],
             },
-            'throughput_fps': result['fps']
+            'throughput_fps': result['fps'],
+            'total_time_sec': result['total_time_sec'],
+            'job_id': job_id,
         }
+        if len(status['results']) > 1:
+            formatted_result['sweep'] = status['results']
 
         # Save results
         try:
@@ -112,21 +169,36 @@ def benchmark_base_yolo(iterations=50):
 
         return formatted_result
 
+    except KeyboardInterrupt:
+        if job_id:
+            _request(f"/benchmark/{job_id}", method='DELETE')
+            print(f"\n✗ Cancelled benchmark job {job_id}")
+        return None
     except Exception as e:
         print(f"✗ Benchmark failed: {e}")
         import traceback
         traceback.print_exc()
         return None
 
-if __name__ == '__main__':
-    iterations = 50
-    if len(sys.argv) > 1:
-        try:
-            iterations = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid iterations: {sys.argv[1]}, using default: 50")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark base-yolo with a background /benchmark job")
+    parser.add_argument('iterations', nargs='?', default='50', help='iterations per configuration (default: 50)')
+    parser.add_argument('--batch-sizes', default='1', help='comma-separated batch sizes to sweep (default: 1)')
+    parser.add_argument('--threads', default='1', help='comma-separated inference thread counts (default: 1)')
+    parser.add_argument('--warmup', type=int, default=10, help='warmup calls per configuration (default: 10)')
+    parser.add_argument('--profiles', default=None,
+                        help='comma-separated execution profiles to compare (default: the serving profile)')
+    args = parser.parse_args()
+    try:
+        args.iterations = int(args.iterations)
+    except ValueError:
+        print(f"Invalid iterations: {args.iterations}, using default: 50")
+        args.iterations = 50
+    return args
 
-    result = benchmark_base_yolo(iterations)
+if __name__ == '__main__':
+    args = parse_args()
+    result = benchmark_base_yolo(args.iterations, args.batch_sizes, args.threads, args.warmup, args.profiles)
 
     if result:
         sys.exit(0)
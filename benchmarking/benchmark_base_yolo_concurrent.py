@@ -8,14 +8,57 @@ Usage:
 
   iterations: total number of requests (default: 50)
   concurrency: number of concurrent workers (default: 1 for sequential, 8+ for load testing)
+
+Options:
+  --corpus DIR             post real JPEGs from DIR instead of empty requests
+  --corpus-order ORDER     'sequential' (default) or 'shuffle'
+  --corpus-seed N          seed for shuffled replay (default: 0)
+  --synthetic MODE         server-side input when no corpus is used: 'pool' (default,
+                           pre-generated frames) or 'random' (per-request RNG)
+  --alloc-sample RATE      after the run, trace Python allocations of RATE x requests extra
+                           untimed requests (default: 0, off); the server samples per
+                           ACCOUNTING_ALLOC_SAMPLE_RATE
 """
 
 import sys
 import json
 import time
+import argparse
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
+from image_corpus import load_corpus, latency_by_detections, print_detection_breakdown
+from latency_analysis import SampleRecorder, attach, print_analysis
+from cost_accounting import CostMeter, print_cost, print_server_cost
+
+SERVER_URL = "http://127.0.0.1:8080"
+
+def parse_server_timing(header):
+    """Parse a Server-Timing header ('decode;dur=1.2, inference;dur=9.8') into {stage: ms}"""
+    stages = {}
+    for entry in (header or '').split(','):
+        name, _, params = entry.strip().partition(';')
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'dur' and name:
+                try:
+                    stages[name] = float(value)
+                except ValueError:
+                    pass
+    return stages
+
+def server_accounting(path='/accounting', method='GET'):
+    """Server cost window from base-yolo (None if the server has no /accounting)"""
+    from urllib.request import Request, urlopen
+
+    try:
+        with urlopen(Request(SERVER_URL + path, method=method), timeout=5) as response:
+            return json.loads(response.read())
+    except Exception as e:
+        print(f"⚠ Server cost accounting unavailable ({path}): {e}")
+        return None
+
+def benchmark_base_yolo_concurrent(iterations=50, concurrency=1, corpus=None, synthetic='pool', meter=None):
     """Benchmark base-yolo using concurrent calls to /infer endpoint"""
     try:
         from urllib.request import Request, urlopen
@@ -29,14 +72,15 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
     print(f"{'='*70}\n")
 
     print(f"Configuration:")
-    print(f"  URL: http://127.0.0.1:8080/infer")
+    print(f"  URL: {SERVER_URL}/infer")
     print(f"  Total Requests: {iterations}")
     print(f"  Concurrency: {concurrency} worker{'s' if concurrency > 1 else ''}")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'server synthetic (' + synthetic + ')'}")
     print(f"  Framework: PyTorch + Ultralytics YOLO\n")
 
     # Check health first
     try:
-        health_url = "http://127.0.0.1:8080/health"
+        health_url = f"{SERVER_URL}/health"
         req = Request(health_url)
         with urlopen(req, timeout=5) as response:
             health = json.loads(response.read())
@@ -46,33 +90,65 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         print(f"✗ Health check failed: {e}")
         return None
 
-    # Prepare request payload (use random image - server will generate if empty)
+    # Prepare request payload (server serves a synthetic frame if empty)
     request_data = json.dumps({}).encode('utf-8')
-
-    # Worker function for concurrent execution
-    def one_request():
-        url = "http://127.0.0.1:8080/infer"
+    input_sources = set()
+    server_stage_totals = {}
+    server_stage_counts = {}
+    stats_lock = threading.Lock()
+    samples = SampleRecorder()
+    meter = meter or CostMeter()
+
+    def send():
+        """POST one /infer request: (request body, response body, Server-Timing, start, end)"""
+        url = f"{SERVER_URL}/infer"
         req = Request(url, method='POST')
         req.add_header('Content-Type', 'application/json')
+        req.add_header('X-Synthetic-Input', synthetic)
+        if corpus:
+            data = json.dumps({'image': corpus.jpeg_b64(corpus.next_index())}).encode('utf-8')
+        else:
+            data = request_data
 
         start = time.perf_counter()
-        with urlopen(req, data=request_data, timeout=30) as response:
-            result = json.loads(response.read())
-        end = time.perf_counter()
+        with urlopen(req, data=data, timeout=30) as response:
+            body = response.read()
+            server_timing = response.headers.get('Server-Timing')
+        return data, body, server_timing, start, time.perf_counter()
 
-        return (end - start) * 1000.0  # Return latency in ms
+    # Worker function for concurrent execution
+    def one_request(warmup=False):
+        data, body, server_timing, start, end = send()
+        samples.record(start, end, warmup=warmup)
+        result = json.loads(body)
+        if not warmup:
+            meter.add_bytes(len(data), len(body))
+        with stats_lock:
+            input_sources.add(result.get('input_source', 'unknown'))
+            for stage, ms in parse_server_timing(server_timing).items():
+                server_stage_totals[stage] = server_stage_totals.get(stage, 0.0) + ms
+                server_stage_counts[stage] = server_stage_counts.get(stage, 0) + 1
+
+        return (end - start) * 1000.0, len(result.get('detections', []))  # Latency in ms, detections
 
     # Warmup
     print(f"Warming up (20 iterations)...")
     for _ in range(20):
         try:
-            one_request()
+            one_request(warmup=True)
         except Exception as e:
             print(f"Warmup failed: {e}")
             return None
+    server_stage_totals.clear()
+    server_stage_counts.clear()
     print()
 
+    # Server cost window covers the measured run only
+    server_accounting('/accounting/reset', method='POST')
+    meter.start()
+
     latencies = []
+    detection_counts = []
     errors = 0
 
     if concurrency == 1:
@@ -80,7 +156,9 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         print(f"Running sequential benchmark ({iterations} iterations)...\n")
         for i in range(iterations):
             try:
-                latencies.append(one_request())
+                latency_ms, detections = one_request()
+                latencies.append(latency_ms)
+                detection_counts.append(detections)
 
                 if (i + 1) % 10 == 0:
                     avg = sum(latencies) / len(latencies)
@@ -101,7 +179,9 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
             futures = [ex.submit(one_request) for _ in range(iterations)]
             for i, f in enumerate(as_completed(futures), 1):
                 try:
-                    latencies.append(f.result())
+                    latency_ms, detections = f.result()
+                    latencies.append(latency_ms)
+                    detection_counts.append(detections)
                 except Exception as e:
                     errors += 1
                     if errors == 1:
@@ -114,6 +194,11 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         end_time = time.perf_counter()
         total_time = end_time - start_time
 
+    meter.stop()
+    server_cost = server_accounting()
+    # After the server window is read, so the traced requests are left out of both
+    meter.trace_allocations(lambda: json.loads(send()[1]), iterations)
+
     if not latencies:
         print(f"✗ All requests failed")
         return None
@@ -133,6 +218,7 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
     print(f"Location: internal")
     print(f"Framework: PyTorch (Ultralytics)")
     print(f"Iterations: {len(latencies)}")
+    print(f"Input source: {', '.join(sorted(input_sources))}")
     if concurrency > 1:
         print(f"Concurrency: {concurrency} workers")
     if errors > 0:
@@ -174,6 +260,26 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         print(f"  FPS:     {fps:7.2f}")
     print()
 
+    # Server-side stage means from the Server-Timing header
+    server_timing_ms = {stage: server_stage_totals[stage] / server_stage_counts[stage]
+                        for stage in server_stage_totals}
+    if server_timing_ms:
+        print(f"Server stages (mean ms, from Server-Timing):")
+        for stage, ms in server_timing_ms.items():
+            print(f"  {stage:<14} {ms:7.2f} ms")
+        print()
+
+    client_cost = meter.report(len(latencies))
+    print_cost(client_cost)
+    print_server_cost(server_cost)
+
+    if corpus:
+        formatted_corpus = {
+            'corpus': corpus.describe(),
+            'latency_by_detections': latency_by_detections(latencies, detection_counts),
+        }
+        print_detection_breakdown(formatted_corpus['latency_by_detections'])
+
     # Format for compatibility with universal benchmark
     formatted_result = {
         'protocol': 'http',
@@ -182,6 +288,7 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         'framework': 'pytorch',
         'deployment': 'base-pytorch',
         'iterations': len(latencies),
+        'input_source': ','.join(sorted(input_sources)),
         'latency_ms': lat_stats,
         'throughput_fps': len(latencies) / total_time if concurrency > 1 else 1000.0 / mean
     }
@@ -193,6 +300,19 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
         formatted_result['total_time_sec'] = total_time
         formatted_result['avg_latency_fps'] = 1000.0 / mean
 
+    if server_timing_ms:
+        formatted_result['server_timing_ms'] = server_timing_ms
+
+    formatted_result['client_cost'] = client_cost
+    if server_cost:
+        formatted_result['server_cost'] = server_cost
+
+    if corpus:
+        formatted_result.update(formatted_corpus)
+
+    attach(formatted_result, samples)
+    print_analysis(formatted_result.get('steady_state'))
+
     # Save results
     try:
         import os
@@ -208,25 +328,42 @@ def benchmark_base_yolo_concurrent(iterations=50, concurrency=1):
     return formatted_result
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Base YOLO PyTorch concurrent benchmark")
+    parser.add_argument('iterations', nargs='?', default='50')
+    parser.add_argument('concurrency', nargs='?', default='1')
+    parser.add_argument('--corpus', default=None)
+    parser.add_argument('--corpus-order', choices=['sequential', 'shuffle'], default='sequential')
+    parser.add_argument('--corpus-seed', type=int, default=0)
+    parser.add_argument('--synthetic', choices=['pool', 'random'], default='pool')
+    parser.add_argument('--alloc-sample', type=float, default=0.0, metavar='RATE')
+    args = parser.parse_args()
+
     iterations = 50
     concurrency = 1
 
-    if len(sys.argv) > 1:
-        try:
-            iterations = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid iterations: {sys.argv[1]}, using default: 50")
+    try:
+        iterations = int(args.iterations)
+    except ValueError:
+        print(f"Invalid iterations: {args.iterations}, using default: 50")
 
-    if len(sys.argv) > 2:
+    try:
+        concurrency = int(args.concurrency)
+        if concurrency < 1:
+            print(f"Invalid concurrency: {concurrency}, using default: 1")
+            concurrency = 1
+    except ValueError:
+        print(f"Invalid concurrency: {args.concurrency}, using default: 1")
+
+    corpus = None
+    if args.corpus:
         try:
-            concurrency = int(sys.argv[2])
-            if concurrency < 1:
-                print(f"Invalid concurrency: {concurrency}, using default: 1")
-                concurrency = 1
-        except ValueError:
-            print(f"Invalid concurrency: {sys.argv[2]}, using default: 1")
-
-    result = benchmark_base_yolo_concurrent(iterations, concurrency)
+            corpus = load_corpus(args.corpus, order=args.corpus_order, seed=args.corpus_seed)
+        except Exception as e:
+            print(f"ERROR: Could not load corpus: {e}")
+            sys.exit(1)
+
+    result = benchmark_base_yolo_concurrent(iterations, concurrency, corpus=corpus, synthetic=args.synthetic,
+                                            meter=CostMeter(alloc_sample_rate=args.alloc_sample))
 
     if result:
         sys.exit(0)
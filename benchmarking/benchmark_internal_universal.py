@@ -10,11 +10,35 @@ Usage:
   iterations: number of requests (default: 50)
   protocol: 'http' or 'grpc' (default: auto-detect)
   concurrency: number of concurrent workers (default: 1 for sequential, 8+ for load testing)
+
+Options:
+  --corpus DIR             replay real JPEGs from DIR instead of random tensors
+  --corpus-order ORDER     'sequential' (default) or 'shuffle'
+  --corpus-seed N          seed for shuffled replay (default: 0)
+  --model NAME             Triton model to benchmark (default: yolov8s)
+  --imgsz N                model input resolution (default: 640)
+  --no-server-metrics      skip scraping Triton's metrics port (queue/compute/transport split)
+  --deadline-ms N          per-request deadline shared by retries/hedges (concurrent mode, default: 60000)
+  --retries N              retry failed requests up to N times with jittered backoff (default: 0)
+  --hedge                  send a duplicate request once the rolling p95 has elapsed
+  --hedge-percentile P     percentile that triggers the duplicate (default: 95)
+  --endpoints H:P,H:P      spread concurrent load over several Triton endpoints (replicas/deployments)
+  --lb POLICY              'round-robin' (default), 'least-outstanding' or 'p2c'
+  --stream                 gRPC bidirectional streaming (start_stream/async_stream_infer) instead of unary
+  --stream-inflight N      in-flight requests per stream (default: concurrency, i.e. one stream)
+  --no-unary-compare       skip the unary run at the same concurrency that --stream is compared with
+  --output-format FMT      HTTP: 'discard' (default), 'json' (parse the JSON output) or 'binary'
+                           (binary tensors, read into reused buffers); encode/read/parse are timed
+  --alloc-sample RATE      after the run, trace Python allocations of RATE x iterations extra
+                           untimed requests (default: 0, off); CPU and bytes per inference are
+                           always reported
 """
 
 import sys
 import time
 import json
+import argparse
+import threading
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -25,17 +49,60 @@ except ImportError:
     print("ERROR: numpy not available")
     sys.exit(1)
 
+from image_corpus import load_corpus, count_detections, latency_by_detections, print_detection_breakdown
+from triton_metrics import MetricsProbe, print_breakdown
+from latency_analysis import SampleRecorder, attach, print_analysis
+from request_policy import RequestPolicy, print_policy
+from load_balancer import LoadBalancer, POLICIES, parse_endpoints, print_distribution
+from http_codec import HttpCodec, FORMATS, open_request, request_bytes, print_phases
+from cost_accounting import CostMeter, print_cost
+
 # Configuration
 TRITON_HTTP_URL = "127.0.0.1:8000"
 TRITON_GRPC_URL = "127.0.0.1:8001"
 MODEL_NAME = "yolov8s"
 MODEL_VERSION = "1"
 
-def benchmark_http(iterations=50):
+def next_input(corpus, default_input):
+    """Return (corpus_index, input tensor) for the next request"""
+    if corpus is None:
+        return None, default_input
+    index = corpus.next_index()
+    return index, corpus.nchw_float32(index)
+
+def http_request_body(input_data):
+    """Triton JSON inference request body for a single images tensor"""
+    return json.dumps({
+        "inputs": [{
+            "name": "images",
+            "shape": list(input_data.shape),
+            "datatype": "FP32",
+            "data": input_data.flatten().tolist()
+        }]
+    }).encode('utf-8')
+
+def add_corpus_results(results, corpus, latencies, detection_counts):
+    """Attach corpus metadata and the latency-by-detection-count breakdown"""
+    if corpus is None:
+        return results
+    results['corpus'] = corpus.describe()
+    results['latency_by_detections'] = latency_by_detections(latencies, detection_counts)
+    return results
+
+def finish_results(results, metrics, meter, send, iterations):
+    """Server metrics first, then the untimed allocation pass, so its extra
+    requests stay out of the Triton metrics delta; client_cost last"""
+    if metrics:
+        results = metrics.finish(results)
+    meter.trace_allocations(send, iterations)
+    results['client_cost'] = meter.report(results['iterations'])
+    return results
+
+def benchmark_http(iterations=50, corpus=None, metrics=None,
+                   model_name=MODEL_NAME, imgsz=640, codec=None, meter=None):
     """Benchmark using HTTP protocol"""
     try:
         from urllib.request import Request, urlopen
-        import json as json_module
     except ImportError:
         return None
 
@@ -45,8 +112,9 @@ def benchmark_http(iterations=50):
 
     print(f"Configuration:")
     print(f"  URL: {TRITON_HTTP_URL}")
-    print(f"  Model: {MODEL_NAME}")
-    print(f"  Iterations: {iterations}\n")
+    print(f"  Model: {model_name}")
+    print(f"  Iterations: {iterations}")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'random tensor'}\n")
 
     # Check health
     try:
@@ -59,28 +127,23 @@ def benchmark_http(iterations=50):
         print(f"✗ Server not ready: {e}")
         return None
 
-    # Prepare input
-    input_data = np.random.rand(1, 3, 640, 640).astype(np.float32)
-    request_data = {
-        "inputs": [{
-            "name": "images",
-            "shape": [1, 3, 640, 640],
-            "datatype": "FP32",
-            "data": input_data.flatten().tolist()
-        }]
-    }
+    # Prepare input (corpus runs parse outputs to count detections)
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
+    codec = codec or HttpCodec('json' if corpus else 'discard')
+    meter = meter or CostMeter()
 
-    url = f"http://{TRITON_HTTP_URL}/v2/models/{MODEL_NAME}/infer"
+    url = f"http://{TRITON_HTTP_URL}/v2/models/{model_name}/infer"
 
-    # Warmup
+    # Warmup (timed too, so steady-state detection can check it was long enough)
+    samples = SampleRecorder()
     print("Warming up (10 iterations)...")
     for _ in range(10):
         try:
-            req = Request(url)
-            req.add_header('Content-Type', 'application/json')
-            data = json_module.dumps(request_data).encode('utf-8')
-            with urlopen(req, data=data, timeout=30) as response:
-                _ = response.read()
+            req = codec.request(url, codec.encode(next_input(corpus, input_data)[1]))
+            start = time.perf_counter()
+            with urlopen(req, timeout=30) as response:
+                codec.read(response)
+            samples.record(start, time.perf_counter(), warmup=True)
         except Exception as e:
             print(f"Warmup failed: {e}")
             return None
@@ -88,22 +151,37 @@ def benchmark_http(iterations=50):
 
     # Benchmark
     print(f"Running benchmark ({iterations} iterations)...\n")
+    if metrics:
+        metrics.start()
     latencies = []
+    detection_counts = []
     errors = 0
 
+    meter.start()
     for i in range(iterations):
         try:
-            req = Request(url)
-            req.add_header('Content-Type', 'application/json')
-            data = json_module.dumps(request_data).encode('utf-8')
+            _, request_input = next_input(corpus, input_data)
+            encode_start = time.perf_counter()
+            req = codec.request(url, codec.encode(request_input))
 
             start = time.perf_counter()
-            with urlopen(req, data=data, timeout=30) as response:
-                _ = response.read()
+            with urlopen(req, timeout=30) as response:
+                read_start = time.perf_counter()
+                body = codec.read(response)
             end = time.perf_counter()
+            samples.record(start, end)
+            output = codec.parse(body)
+            parsed = time.perf_counter()
+            meter.add_bytes(request_bytes(req), len(body[0]))
+            codec.phases.add('encode', (start - encode_start) * 1000)
+            codec.phases.add('read', (end - read_start) * 1000)
+            if output is not None:
+                codec.phases.add('parse', (parsed - end) * 1000)
 
             latency_ms = (end - start) * 1000
             latencies.append(latency_ms)
+            if corpus:
+                detection_counts.append(count_detections(output))
 
             if (i + 1) % 10 == 0:
                 avg = sum(latencies) / len(latencies)
@@ -112,6 +190,13 @@ def benchmark_http(iterations=50):
             errors += 1
             if errors == 1:
                 print(f"  Error: {e}")
+    meter.stop()
+
+    def send():
+        req = codec.request(url, codec.encode(next_input(corpus, input_data)[1]))
+        with urlopen(req, timeout=30) as response:
+            codec.parse(codec.read(response))
+
 
     if not latencies:
         return None
@@ -122,6 +207,8 @@ def benchmark_http(iterations=50):
         'protocol': 'http',
         'mode': 'sequential',
         'location': 'internal',
+        'model': model_name,
+        'imgsz': imgsz,
         'iterations': len(latencies),
         'errors': errors,
         'latency_ms': {
@@ -134,12 +221,16 @@ def benchmark_http(iterations=50):
             'p95': latencies_sorted[int(len(latencies) * 0.95)],
             'p99': latencies_sorted[int(len(latencies) * 0.99)],
         },
-        'throughput_fps': 1000 / (sum(latencies) / len(latencies))
+        'throughput_fps': 1000 / (sum(latencies) / len(latencies)),
+        'client_codec': codec.describe()
     }
 
-    return results
+    add_corpus_results(results, corpus, latencies, detection_counts)
+    attach(results, samples)
+    return finish_results(results, metrics, meter, send, iterations)
 
-def benchmark_grpc(iterations=50):
+def benchmark_grpc(iterations=50, corpus=None, metrics=None,
+                   model_name=MODEL_NAME, imgsz=640, meter=None):
     """Benchmark using gRPC protocol (sequential)"""
     try:
         import tritonclient.grpc as grpcclient
@@ -153,8 +244,9 @@ def benchmark_grpc(iterations=50):
 
     print(f"Configuration:")
     print(f"  URL: {TRITON_GRPC_URL}")
-    print(f"  Model: {MODEL_NAME}")
-    print(f"  Iterations: {iterations}\n")
+    print(f"  Model: {model_name}")
+    print(f"  Iterations: {iterations}")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'random tensor'}\n")
 
     # Create client
     try:
@@ -166,7 +258,7 @@ def benchmark_grpc(iterations=50):
 
     # Check health
     try:
-        if client.is_server_ready() and client.is_model_ready(MODEL_NAME):
+        if client.is_server_ready() and client.is_model_ready(model_name):
             print(f"✓ Server and model ready\n")
         else:
             print(f"✗ Server or model not ready")
@@ -176,32 +268,56 @@ def benchmark_grpc(iterations=50):
         return None
 
     # Prepare input
-    input_data = np.random.rand(1, 3, 640, 640).astype(np.float32)
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
     inputs = [grpcclient.InferInput("images", input_data.shape, "FP32")]
     inputs[0].set_data_from_numpy(input_data)
     outputs = [grpcclient.InferRequestedOutput("output0")]
 
-    # Warmup
+    # Warmup (timed too, so steady-state detection can check it was long enough)
+    samples = SampleRecorder()
     print("Warming up (10 iterations)...")
     for _ in range(10):
-        client.infer(MODEL_NAME, inputs, model_version=MODEL_VERSION, outputs=outputs)
+        start = time.perf_counter()
+        client.infer(model_name, inputs, model_version=MODEL_VERSION, outputs=outputs)
+        samples.record(start, time.perf_counter(), warmup=True)
     print()
 
     # Benchmark
     print(f"Running benchmark ({iterations} iterations)...\n")
+    if metrics:
+        metrics.start()
     latencies = []
+    detection_counts = []
+    meter = meter or CostMeter()
+    request_input = input_data
 
+    meter.start()
     for i in range(iterations):
+        if corpus:
+            _, request_input = next_input(corpus, input_data)
+            inputs[0].set_data_from_numpy(request_input)
+
         start = time.perf_counter()
-        response = client.infer(MODEL_NAME, inputs, model_version=MODEL_VERSION, outputs=outputs)
+        response = client.infer(model_name, inputs, model_version=MODEL_VERSION, outputs=outputs)
         end = time.perf_counter()
+        samples.record(start, end)
+        meter.add_bytes(request_input.nbytes, response.get_response().ByteSize())
 
         latency_ms = (end - start) * 1000
         latencies.append(latency_ms)
+        if corpus:
+            detection_counts.append(count_detections(response.as_numpy("output0")))
 
         if (i + 1) % 10 == 0:
             avg = sum(latencies) / len(latencies)
             print(f"  Progress: {i+1}/{iterations} - Avg: {avg:.2f} ms")
+    meter.stop()
+
+    def send():
+        if corpus:
+            inputs[0].set_data_from_numpy(next_input(corpus, input_data)[1])
+        client.infer(model_name, inputs, model_version=MODEL_VERSION, outputs=outputs).as_numpy("output0")
+
 
     # Calculate statistics
     latencies_sorted = sorted(latencies)
@@ -209,6 +325,8 @@ def benchmark_grpc(iterations=50):
         'protocol': 'grpc',
         'mode': 'sequential',
         'location': 'internal',
+        'model': model_name,
+        'imgsz': imgsz,
         'iterations': len(latencies),
         'latency_ms': {
             'min': min(latencies),
@@ -223,9 +341,12 @@ def benchmark_grpc(iterations=50):
         'throughput_fps': 1000 / (sum(latencies) / len(latencies))
     }
 
-    return results
+    add_corpus_results(results, corpus, latencies, detection_counts)
+    attach(results, samples)
+    return finish_results(results, metrics, meter, send, iterations)
 
-def benchmark_grpc_concurrent(iterations=50, concurrency=8):
+def benchmark_grpc_concurrent(iterations=50, concurrency=8, corpus=None, metrics=None,
+                              model_name=MODEL_NAME, imgsz=640, policy=None, lb=None, meter=None):
     """Benchmark using gRPC protocol with concurrency (load testing)"""
     try:
         import tritonclient.grpc as grpcclient
@@ -237,33 +358,36 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
     print(f"Internal gRPC Benchmark (Concurrent, Inside Pod)")
     print(f"{'='*70}\n")
 
+    lb = lb or LoadBalancer([TRITON_GRPC_URL])
     print(f"Configuration:")
-    print(f"  URL: {TRITON_GRPC_URL}")
-    print(f"  Model: {MODEL_NAME}")
+    print(f"  URL: {', '.join(lb.addresses)}" + (f" ({lb.policy})" if len(lb) > 1 else ""))
+    print(f"  Model: {model_name}")
     print(f"  Total Requests: {iterations}")
-    print(f"  Concurrency: {concurrency} workers\n")
+    print(f"  Concurrency: {concurrency} workers")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'random tensor'}\n")
 
-    # Create client for health check
-    try:
-        client = grpcclient.InferenceServerClient(url=TRITON_GRPC_URL, verbose=False)
-        print(f"✓ Connected to Triton")
-    except Exception as e:
-        print(f"✗ Failed to connect: {e}")
-        return None
+    # Create a client per endpoint and check health
+    clients = []
+    for address in lb.addresses:
+        try:
+            client = grpcclient.InferenceServerClient(url=address, verbose=False)
+            print(f"✓ Connected to Triton ({address})")
+        except Exception as e:
+            print(f"✗ Failed to connect to {address}: {e}")
+            return None
 
-    # Check health
-    try:
-        if client.is_server_ready() and client.is_model_ready(MODEL_NAME):
-            print(f"✓ Server and model ready\n")
-        else:
-            print(f"✗ Server or model not ready")
+        try:
+            if not (client.is_server_ready() and client.is_model_ready(model_name)):
+                print(f"✗ Server or model not ready ({address})")
+                return None
+        except Exception as e:
+            print(f"✗ Health check failed ({address}): {e}")
             return None
-    except Exception as e:
-        print(f"✗ Health check failed: {e}")
-        return None
+        clients.append(client)
+    print(f"✓ Server and model ready\n")
 
     # Prepare input once (reused by all workers)
-    input_data = np.random.rand(1, 3, 640, 640).astype(np.float32)
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
 
     # Warmup (single-thread warmup, reduced for high concurrency)
     warmup_iterations = min(10, max(5, iterations // 20))  # Scale warmup with test size
@@ -272,10 +396,13 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
     inputs[0].set_data_from_numpy(input_data)
     outputs = [grpcclient.InferRequestedOutput("output0")]
 
+    samples = SampleRecorder()
     warmup_success = 0
     for i in range(warmup_iterations):
         try:
-            client.infer(MODEL_NAME, inputs, model_version=MODEL_VERSION, outputs=outputs)
+            start = time.perf_counter()
+            clients[i % len(clients)].infer(model_name, inputs, model_version=MODEL_VERSION, outputs=outputs)
+            samples.record(start, time.perf_counter(), warmup=True)
             warmup_success += 1
         except Exception as e:
             if i == 0:  # Only print first error
@@ -287,33 +414,87 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
 
     print(f"  Warmup complete ({warmup_success}/{warmup_iterations} successful)\n")
 
-    # Worker function: each worker creates its own client + inputs (thread-safe)
+    policy = policy or RequestPolicy(max_outstanding=concurrency)
+    meter = meter or CostMeter()
+
+    # One client per endpoint per thread (workers and hedge threads), created before the request is timed
+    local = threading.local()
+    worker_clients = []
+    clients_lock = threading.Lock()
+
+    def thread_clients():
+        per_endpoint = getattr(local, 'clients', None)
+        if per_endpoint is None:
+            per_endpoint = local.clients = {address: grpcclient.InferenceServerClient(url=address, verbose=False)
+                                            for address in lb.addresses}
+            with clients_lock:
+                worker_clients.extend(per_endpoint.values())
+        return per_endpoint
+
+    # Worker function: each worker uses its own clients + inputs (thread-safe)
     def one_request():
         try:
-            c = grpcclient.InferenceServerClient(url=TRITON_GRPC_URL, verbose=False)
-            inp = [grpcclient.InferInput("images", input_data.shape, "FP32")]
-            inp[0].set_data_from_numpy(input_data)
+            thread_clients()  # outside the timed region
+            _, request_input = next_input(corpus, input_data)
+            inp = [grpcclient.InferInput("images", request_input.shape, "FP32")]
+            inp[0].set_data_from_numpy(request_input)
             out = [grpcclient.InferRequestedOutput("output0")]
 
+            # Deadline propagated as the client timeout (s) and Triton's request timeout (us);
+            # each attempt (retry or hedge) picks its own endpoint and can be cancelled when it loses
+            def attempt(timeout, cancel):
+                with lb.pick(cancel) as address:
+                    done = threading.Event()
+                    outcome = {}
+
+                    def callback(result, error):
+                        outcome['result'], outcome['error'] = result, error
+                        done.set()
+
+                    call = thread_clients()[address].async_infer(model_name, inp, callback,
+                                                                 model_version=MODEL_VERSION, outputs=out,
+                                                                 client_timeout=timeout,
+                                                                 timeout=int(timeout * 1e6))
+                    cancel.on_cancel(call.cancel)
+                    done.wait()
+                    if outcome['error'] is not None:
+                        raise outcome['error']
+                    response = outcome['result']
+                    meter.add_bytes(request_input.nbytes, response.get_response().ByteSize())
+                    return response
+
             start = time.perf_counter()
-            c.infer(MODEL_NAME, inp, model_version=MODEL_VERSION, outputs=out)
+            try:
+                response = policy.call(attempt)
+            except Exception:
+                samples.record(start, time.perf_counter(), ok=False)
+                raise
             end = time.perf_counter()
-            return (end - start) * 1000.0
+            samples.record(start, end)
+            detections = count_detections(response.as_numpy("output0")) if corpus else None
+            return (end - start) * 1000.0, detections
         except Exception as e:
             # Re-raise to be caught by executor
             raise Exception(f"Inference failed: {str(e)[:100]}")
 
     latencies = []
+    detection_counts = []
     errors = 0
 
     print(f"Running concurrent benchmark ({iterations} requests, {concurrency} workers)...\n")
+    if metrics:
+        metrics.start()
 
+    meter.start()
+    cpu_start = time.process_time()
     start_time = time.perf_counter()
     with ThreadPoolExecutor(max_workers=concurrency) as ex:
         futures = [ex.submit(one_request) for _ in range(iterations)]
         for i, f in enumerate(as_completed(futures), 1):
             try:
-                latencies.append(f.result())
+                latency_ms, detections = f.result()
+                latencies.append(latency_ms)
+                detection_counts.append(detections)
             except Exception as e:
                 errors += 1
                 if errors == 1:
@@ -325,8 +506,20 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
 
     end_time = time.perf_counter()
     total_time = end_time - start_time
+    cpu_sec = time.process_time() - cpu_start
+    meter.stop()
+    policy.close()
+
+    def send():
+        request_input = next_input(corpus, input_data)[1]
+        inp = [grpcclient.InferInput("images", request_input.shape, "FP32")]
+        inp[0].set_data_from_numpy(request_input)
+        out = [grpcclient.InferRequestedOutput("output0")]
+        clients[0].infer(model_name, inp, model_version=MODEL_VERSION, outputs=out).as_numpy("output0")
 
     if not latencies:
+        for client in worker_clients + clients:
+            client.close()
         return None
 
     # Calculate statistics
@@ -337,6 +530,8 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
         'protocol': 'grpc',
         'mode': 'concurrent',
         'location': 'internal',
+        'model': model_name,
+        'imgsz': imgsz,
         'iterations': len(latencies),
         'errors': errors,
         'concurrency': concurrency,
@@ -354,65 +549,311 @@ def benchmark_grpc_concurrent(iterations=50, concurrency=8):
         # Throughput = total requests / total time (actual throughput under load)
         'throughput_fps': len(latencies) / total_time,
         # Also include per-request average
-        'avg_latency_fps': 1000.0 / mean
+        'avg_latency_fps': 1000.0 / mean,
+        'request_policy': policy.report(),
+        'client_cpu': client_cpu(cpu_sec, total_time)
     }
-
+    if len(lb) > 1:
+        results['load_balancer'] = lb.report()
+
+    add_corpus_results(results, corpus, latencies, detection_counts)
+    attach(results, samples)
+    results = finish_results(results, metrics, meter, send, iterations)
+    for client in worker_clients + clients:
+        client.close()
     return results
 
-def benchmark_http_concurrent(iterations=50, concurrency=8):
-    """Benchmark using HTTP protocol with concurrency (load testing)"""
+def benchmark_grpc_stream(iterations=50, concurrency=8, inflight=None, corpus=None, metrics=None,
+                          model_name=MODEL_NAME, imgsz=640, lb=None, meter=None):
+    """Benchmark using gRPC bidirectional streaming with a window of in-flight requests per stream
+
+    `concurrency` requests are kept in flight in total, over
+    ceil(concurrency / inflight) streams. Responses are matched to requests
+    by request ID. This is how a video client would feed Triton.
+    """
     try:
-        from urllib.request import Request, urlopen
-        import json as json_module
+        import tritonclient.grpc as grpcclient
     except ImportError:
+        print("✗ tritonclient.grpc not available")
         return None
 
+    inflight = max(1, min(inflight or concurrency, concurrency))
+    n_streams = -(-concurrency // inflight)
+    windows = [inflight] * (n_streams - 1) + [concurrency - inflight * (n_streams - 1)]
+    lb = lb or LoadBalancer([TRITON_GRPC_URL])
+
     print(f"\n{'='*70}")
-    print(f"Internal HTTP Benchmark (Concurrent, Inside Pod)")
+    print(f"Internal gRPC Streaming Benchmark (Inside Pod)")
     print(f"{'='*70}\n")
 
     print(f"Configuration:")
-    print(f"  URL: {TRITON_HTTP_URL}")
-    print(f"  Model: {MODEL_NAME}")
+    print(f"  URL: {', '.join(lb.addresses)}")
+    print(f"  Model: {model_name}")
     print(f"  Total Requests: {iterations}")
-    print(f"  Concurrency: {concurrency} workers\n")
+    print(f"  Streams: {n_streams} x {inflight} in flight ({concurrency} total)")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'random tensor'}\n")
 
-    # Check health
     try:
-        health_url = f"http://{TRITON_HTTP_URL}/v2/health/ready"
-        req = Request(health_url)
-        with urlopen(req, timeout=5) as response:
-            _ = response.read()
-        print(f"✓ Server ready\n")
+        client = grpcclient.InferenceServerClient(url=lb.addresses[0], verbose=False)
+        if not (client.is_server_ready() and client.is_model_ready(model_name)):
+            print(f"✗ Server or model not ready")
+            return None
+        print(f"✓ Server and model ready\n")
     except Exception as e:
-        print(f"✗ Server not ready: {e}")
+        print(f"✗ Health check failed: {e}")
         return None
 
-    # Prepare input once (reused by all workers)
-    input_data = np.random.rand(1, 3, 640, 640).astype(np.float32)
-    request_data = {
-        "inputs": [{
-            "name": "images",
-            "shape": [1, 3, 640, 640],
-            "datatype": "FP32",
-            "data": input_data.flatten().tolist()
-        }]
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
+    outputs = [grpcclient.InferRequestedOutput("output0")]
+
+    def make_inputs(request_input):
+        inputs = [grpcclient.InferInput("images", request_input.shape, "FP32")]
+        inputs[0].set_data_from_numpy(request_input)
+        return inputs
+
+    default_inputs = make_inputs(input_data)
+    meter = meter or CostMeter()
+    samples = SampleRecorder()
+    lock = threading.Lock()
+    latencies = []
+    detection_counts = []
+    errors = [0]
+    first_error = [None]
+
+    class Stream:
+        """One bidirectional stream: a sender thread bounded by a window, responses matched by ID"""
+
+        def __init__(self, index, address, window):
+            self.index = index
+            self.window = threading.Semaphore(window)
+            self.pending = {}
+            self.sent = 0
+            self.answered = 0
+            self.sent_all = False
+            self.done = threading.Event()
+            self.client = grpcclient.InferenceServerClient(url=address, verbose=False)
+            self.client.start_stream(callback=self.on_response)
+
+        def on_response(self, result, error):
+            end = time.perf_counter()
+            with lock:
+                if error is not None:
+                    errors[0] += 1
+                    first_error[0] = first_error[0] or str(error)[:100]
+                    # Errors may carry no request ID: drop the oldest outstanding request
+                    request_id = next(iter(self.pending), None)
+                else:
+                    request_id = result.get_response().id
+                entry = self.pending.pop(request_id, None)
+                if entry is not None and error is None:
+                    start, warmup = entry
+                    samples.record(start, end, warmup=warmup)
+                    if not warmup:
+                        meter.add_bytes(input_data.nbytes, result.get_response().ByteSize())
+                        latencies.append((end - start) * 1000.0)
+                        detection_counts.append(count_detections(result.as_numpy("output0")) if corpus else None)
+                self.answered += 1
+                if self.answered == self.sent and self.sent_all:
+                    self.done.set()
+            self.window.release()
+
+        def run(self, count, warmup=False, timeout=60):
+            """Send `count` requests keeping at most `window` in flight; wait for every response"""
+            self.sent_all = False
+            self.done.clear()
+            for k in range(count):
+                if not self.window.acquire(timeout=timeout):
+                    break
+                inputs = make_inputs(next_input(corpus, input_data)[1]) if corpus and not warmup else default_inputs
+                request_id = f"{self.index}-{'w' if warmup else 'r'}{k}"
+                with lock:
+                    self.pending[request_id] = (time.perf_counter(), warmup)
+                    self.sent += 1
+                self.client.async_stream_infer(model_name, inputs, request_id=request_id,
+                                               model_version=MODEL_VERSION, outputs=outputs)
+            with lock:
+                self.sent_all = True
+                if self.answered == self.sent:
+                    self.done.set()
+            self.done.wait(timeout)
+
+        def close(self):
+            with lock:
+                lost = len(self.pending)
+            self.client.stop_stream()
+            self.client.close()
+            return lost
+
+    try:
+        streams = [Stream(i, lb.addresses[i % len(lb)], w) for i, w in enumerate(windows)]
+    except Exception as e:
+        print(f"✗ Failed to start streams: {e}")
+        return None
+
+    warmup_iterations = min(10, max(5, iterations // 20))
+    print(f"Warming up ({warmup_iterations} requests per stream)...")
+    warmers = [threading.Thread(target=s.run, args=(warmup_iterations, True)) for s in streams]
+    for t in warmers:
+        t.start()
+    for t in warmers:
+        t.join()
+    warmup_errors = errors[0]
+    if warmup_errors >= warmup_iterations * n_streams:
+        print(f"✗ All warmup requests failed: {first_error[0]}")
+        for stream in streams:
+            stream.close()
+        return None
+    errors[0] = 0
+    print(f"  Warmup complete\n")
+
+    print(f"Running streaming benchmark ({iterations} requests, {n_streams} streams)...\n")
+    if metrics:
+        metrics.start()
+
+    shares = [iterations // n_streams + (1 if i < iterations % n_streams else 0) for i in range(n_streams)]
+    senders = [threading.Thread(target=s.run, args=(n,)) for s, n in zip(streams, shares)]
+    meter.start()
+    cpu_start = time.process_time()
+    start_time = time.perf_counter()
+    for t in senders:
+        t.start()
+    for t in senders:
+        t.join()
+    end_time = time.perf_counter()
+    total_time = end_time - start_time
+    cpu_sec = time.process_time() - cpu_start
+    meter.stop()
+
+    # Requests that never got a response (stream broken or timed out) are errors too
+    errors[0] += sum(stream.close() for stream in streams)
+    if first_error[0]:
+        print(f"  Error: {first_error[0]}")
+
+    if not latencies:
+        return None
+
+    latencies_sorted = sorted(latencies)
+    mean = sum(latencies) / len(latencies)
+
+    results = {
+        'protocol': 'grpc',
+        'mode': 'concurrent',
+        'transport': 'stream',
+        'location': 'internal',
+        'model': model_name,
+        'imgsz': imgsz,
+        'iterations': len(latencies),
+        'errors': errors[0],
+        'concurrency': concurrency,
+        'streams': n_streams,
+        'inflight_per_stream': inflight,
+        'total_time_sec': total_time,
+        'latency_ms': {
+            'min': min(latencies),
+            'max': max(latencies),
+            'mean': mean,
+            'median': latencies_sorted[len(latencies_sorted) // 2],
+            'p50': latencies_sorted[int(len(latencies_sorted) * 0.50)],
+            'p90': latencies_sorted[int(len(latencies_sorted) * 0.90)],
+            'p95': latencies_sorted[int(len(latencies_sorted) * 0.95)],
+            'p99': latencies_sorted[int(len(latencies_sorted) * 0.99)],
+        },
+        'throughput_fps': len(latencies) / total_time,
+        'avg_latency_fps': 1000.0 / mean,
+        'client_cpu': client_cpu(cpu_sec, total_time),
+        'client_cost': meter.report(len(latencies))
     }
 
-    url = f"http://{TRITON_HTTP_URL}/v2/models/{MODEL_NAME}/infer"
+    add_corpus_results(results, corpus, latencies, detection_counts)
+    attach(results, samples)
+    return metrics.finish(results) if metrics else results
+
+def compare_unary(stream_results, unary_results):
+    """Attach the unary run at the same concurrency and the stream/unary ratios"""
+    if not unary_results:
+        return stream_results
+    s, u = stream_results['latency_ms'], unary_results['latency_ms']
+    stream_results['unary'] = {
+        'iterations': unary_results['iterations'],
+        'errors': unary_results['errors'],
+        'latency_ms': u,
+        'throughput_fps': unary_results['throughput_fps'],
+        'client_cpu': unary_results.get('client_cpu'),
+        'client_cost': unary_results.get('client_cost'),
+    }
+    stream_results['stream_vs_unary'] = {
+        'throughput_ratio': stream_results['throughput_fps'] / unary_results['throughput_fps'],
+        'p50_delta_ms': s['p50'] - u['p50'],
+        'p99_delta_ms': s['p99'] - u['p99'],
+    }
+    return stream_results
+
+def print_stream_comparison(results):
+    unary = results.get('unary')
+    if not unary:
+        return
+    print(f"Streaming vs Unary (concurrency {results['concurrency']}):")
+    print(f"  {'':10} {'FPS':>9} {'P50':>9} {'P95':>9} {'P99':>9}")
+    for name, r in (('stream', results), ('unary', unary)):
+        lat = r['latency_ms']
+        print(f"  {name:10} {r['throughput_fps']:9.2f} {lat['p50']:9.2f} {lat['p95']:9.2f} {lat['p99']:9.2f}")
+    ratio = results['stream_vs_unary']
+    print(f"  Throughput: {ratio['throughput_ratio']:.2f}x | P50 {ratio['p50_delta_ms']:+.2f} ms | "
+          f"P99 {ratio['p99_delta_ms']:+.2f} ms (stream - unary)")
+    print()
+
+def benchmark_http_concurrent(iterations=50, concurrency=8, corpus=None, metrics=None,
+                              model_name=MODEL_NAME, imgsz=640, policy=None, lb=None, codec=None, meter=None):
+    """Benchmark using HTTP protocol with concurrency (load testing)"""
+    try:
+        from urllib.request import Request, urlopen
+    except ImportError:
+        return None
+
+    print(f"\n{'='*70}")
+    print(f"Internal HTTP Benchmark (Concurrent, Inside Pod)")
+    print(f"{'='*70}\n")
+
+    lb = lb or LoadBalancer([TRITON_HTTP_URL])
+    print(f"Configuration:")
+    print(f"  URL: {', '.join(lb.addresses)}" + (f" ({lb.policy})" if len(lb) > 1 else ""))
+    print(f"  Model: {model_name}")
+    print(f"  Total Requests: {iterations}")
+    print(f"  Concurrency: {concurrency} workers")
+    print(f"  Input: {'image corpus (' + str(len(corpus)) + ' images)' if corpus else 'random tensor'}\n")
+
+    # Check health of every endpoint
+    for address in lb.addresses:
+        try:
+            health_url = f"http://{address}/v2/health/ready"
+            req = Request(health_url)
+            with urlopen(req, timeout=5) as response:
+                _ = response.read()
+        except Exception as e:
+            print(f"✗ Server not ready ({address}): {e}")
+            return None
+    print(f"✓ Server ready\n")
+
+    # Prepare input once (reused by all workers; corpus runs parse outputs to count detections)
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
+    codec = codec or HttpCodec('json' if corpus else 'discard')
+    request_data = codec.encode(input_data)
+
+    urls = [f"http://{address}/v2/models/{model_name}/infer" for address in lb.addresses]
 
     # Warmup (reduced for high concurrency)
     warmup_iterations = min(10, max(5, iterations // 20))  # Scale warmup with test size
     print(f"Warming up ({warmup_iterations} iterations)...")
 
+    samples = SampleRecorder()
     warmup_success = 0
     for i in range(warmup_iterations):
         try:
-            req = Request(url)
-            req.add_header('Content-Type', 'application/json')
-            data = json_module.dumps(request_data).encode('utf-8')
-            with urlopen(req, data=data, timeout=30) as response:
-                _ = response.read()
+            req = codec.request(urls[i % len(urls)], request_data)
+            start = time.perf_counter()
+            with urlopen(req, timeout=30) as response:
+                codec.read(response)
+            samples.record(start, time.perf_counter(), warmup=True)
             warmup_success += 1
         except Exception as e:
             if i == 0:  # Only print first error
@@ -424,33 +865,66 @@ def benchmark_http_concurrent(iterations=50, concurrency=8):
 
     print(f"  Warmup complete ({warmup_success}/{warmup_iterations} successful)\n")
 
+    policy = policy or RequestPolicy(max_outstanding=concurrency)
+    meter = meter or CostMeter()
+
     # Worker function
     def one_request():
         try:
-            req = Request(url)
-            req.add_header('Content-Type', 'application/json')
-            data = json_module.dumps(request_data).encode('utf-8')
+            # Binary payloads live in a per-thread buffer, so each worker encodes its own copy
+            encode_start = time.perf_counter()
+            data = codec.encode(next_input(corpus, input_data)[1]) if corpus or codec.binary else request_data
+            codec.phases.add('encode', (time.perf_counter() - encode_start) * 1000)
+            worker = threading.current_thread()
+
+            # Deadline propagated as the socket timeout and Triton's request timeout;
+            # each attempt (retry or hedge) picks its own endpoint and can be cancelled when it loses
+            def attempt(timeout, cancel):
+                with lb.pick(cancel) as address:
+                    req = codec.request(f"http://{address}/v2/models/{model_name}/infer", data, timeout)
+                    with open_request(req, timeout, cancel) as response:
+                        read_start = time.perf_counter()
+                        # Hedges run on a pool thread: read them into their own buffer
+                        body = codec.read(response, reuse=threading.current_thread() is worker)
+                        codec.phases.add('read', (time.perf_counter() - read_start) * 1000)
+                    meter.add_bytes(request_bytes(req), len(body[0]))
+                    return body
 
             start = time.perf_counter()
-            with urlopen(req, data=data, timeout=60) as response:  # Increased timeout for high concurrency
-                _ = response.read()
+            try:
+                body = policy.call(attempt)
+            except Exception:
+                samples.record(start, time.perf_counter(), ok=False)
+                raise
             end = time.perf_counter()
-            return (end - start) * 1000.0
+            samples.record(start, end)
+            output = codec.parse(body)
+            if output is not None:
+                codec.phases.add('parse', (time.perf_counter() - end) * 1000)
+            detections = count_detections(output) if corpus else None
+            return (end - start) * 1000.0, detections
         except Exception as e:
             # Re-raise to be caught by executor
             raise Exception(f"HTTP request failed: {str(e)[:100]}")
 
     latencies = []
+    detection_counts = []
     errors = 0
 
     print(f"Running concurrent benchmark ({iterations} requests, {concurrency} workers)...\n")
+    if metrics:
+        metrics.start()
 
+    meter.start()
+    cpu_start = time.process_time()
     start_time = time.perf_counter()
     with ThreadPoolExecutor(max_workers=concurrency) as ex:
         futures = [ex.submit(one_request) for _ in range(iterations)]
         for i, f in enumerate(as_completed(futures), 1):
             try:
-                latencies.append(f.result())
+                latency_ms, detections = f.result()
+                latencies.append(latency_ms)
+                detection_counts.append(detections)
             except Exception as e:
                 errors += 1
                 if errors == 1:
@@ -462,6 +936,15 @@ def benchmark_http_concurrent(iterations=50, concurrency=8):
 
     end_time = time.perf_counter()
     total_time = end_time - start_time
+    cpu_sec = time.process_time() - cpu_start
+    meter.stop()
+    policy.close()
+
+    def send():
+        data = codec.encode(next_input(corpus, input_data)[1]) if corpus or codec.binary else request_data
+        with urlopen(codec.request(urls[0], data), timeout=30) as response:
+            codec.parse(codec.read(response))
+
 
     if not latencies:
         return None
@@ -474,6 +957,8 @@ def benchmark_http_concurrent(iterations=50, concurrency=8):
         'protocol': 'http',
         'mode': 'concurrent',
         'location': 'internal',
+        'model': model_name,
+        'imgsz': imgsz,
         'iterations': len(latencies),
         'errors': errors,
         'concurrency': concurrency,
@@ -491,10 +976,31 @@ def benchmark_http_concurrent(iterations=50, concurrency=8):
         # Throughput = total requests / total time (actual throughput under load)
         'throughput_fps': len(latencies) / total_time,
         # Also include per-request average
-        'avg_latency_fps': 1000.0 / mean
+        'avg_latency_fps': 1000.0 / mean,
+        'request_policy': policy.report(),
+        'client_cpu': client_cpu(cpu_sec, total_time),
+        'client_codec': codec.describe()
+    }
+    if len(lb) > 1:
+        results['load_balancer'] = lb.report()
+
+    add_corpus_results(results, corpus, latencies, detection_counts)
+    attach(results, samples)
+    return finish_results(results, metrics, meter, send, iterations)
+
+def client_cpu(cpu_sec, wall_sec):
+    """CPU used by this (single, threaded) client process during the measured run
+
+    Near 100% of one core means the client, not the server, may be the
+    bottleneck: the worker threads share one GIL (see multiproc_load.py).
+    """
+    busiest = cpu_sec / wall_sec * 100 if wall_sec else 0.0
+    return {
+        'processes': 1,
+        'cpu_sec': cpu_sec,
+        'busiest_process_pct': busiest,
+        'saturated': busiest > 90,
     }
-
-    return results
 
 def print_results(results):
     """Print benchmark results"""
@@ -512,6 +1018,8 @@ def print_results(results):
     print(f"Iterations: {results['iterations']}")
     if 'concurrency' in results:
         print(f"Concurrency: {results['concurrency']} workers")
+    if 'streams' in results:
+        print(f"Transport: stream ({results['streams']} streams x {results['inflight_per_stream']} in flight)")
     if 'errors' in results and results['errors'] > 0:
         print(f"Errors: {results['errors']}")
     if 'total_time_sec' in results:
@@ -535,6 +1043,26 @@ def print_results(results):
         print(f"  Avg FPS (from latency): {results['avg_latency_fps']:7.2f}")
     print()
 
+    cpu = results.get('client_cpu')
+    if cpu:
+        print(f"Client CPU:")
+        print(f"  Processes: {cpu['processes']}  CPU time: {cpu['cpu_sec']:.2f} s"
+              + (f"  ({cpu['utilization_pct']:.0f}% of {cpu['cpus_available']} CPUs)" if 'utilization_pct' in cpu else ""))
+        print(f"  Busiest process: {cpu['busiest_process_pct']:.0f}% of one core")
+        if cpu['saturated']:
+            print(f"  ⚠ Client saturated: latency/throughput may be client-bound"
+                  + (" (try multiproc_load.py)" if cpu['processes'] == 1 else " (add --processes)"))
+        print()
+
+    print_phases(results.get('client_codec'))
+    print_cost(results.get('client_cost'))
+    print_detection_breakdown(results.get('latency_by_detections'))
+    print_breakdown(results.get('server_metrics'))
+    print_analysis(results.get('steady_state'))
+    print_policy(results.get('request_policy'))
+    print_distribution(results.get('load_balancer'))
+    print_stream_comparison(results)
+
 def save_results(results):
     """Save results to JSON file"""
     try:
@@ -573,29 +1101,81 @@ def auto_detect_protocol():
 
     return None
 
+def parse_args(argv=None):
+    """Parse CLI arguments (positional form kept for benchmark_all_pods.py)"""
+    parser = argparse.ArgumentParser(description="Universal internal Triton benchmark")
+    parser.add_argument('iterations', nargs='?', default='50',
+                        help="number of requests (default: 50)")
+    parser.add_argument('protocol', nargs='?', default='auto',
+                        help="'http', 'grpc' or 'auto' (default: auto)")
+    parser.add_argument('concurrency', nargs='?', default='1',
+                        help="number of concurrent workers (default: 1)")
+    parser.add_argument('--corpus', default=None,
+                        help="directory of real JPEGs to replay instead of random tensors")
+    parser.add_argument('--corpus-order', choices=['sequential', 'shuffle'], default='sequential',
+                        help="corpus replay order (default: sequential)")
+    parser.add_argument('--corpus-seed', type=int, default=0,
+                        help="seed for shuffled corpus replay (default: 0)")
+    parser.add_argument('--model', default=MODEL_NAME,
+                        help=f"Triton model name (default: {MODEL_NAME})")
+    parser.add_argument('--imgsz', type=int, default=640,
+                        help="input resolution of the model (default: 640)")
+    parser.add_argument('--no-server-metrics', dest='server_metrics', action='store_false',
+                        help="do not scrape Triton's metrics port for the queue/compute breakdown")
+    parser.add_argument('--deadline-ms', type=float, default=60000,
+                        help="per-request deadline shared by retries and hedges (default: 60000)")
+    parser.add_argument('--retries', type=int, default=0,
+                        help="retry failed requests up to N times with jittered backoff (default: 0)")
+    parser.add_argument('--hedge', action='store_true',
+                        help="send a duplicate request once the rolling p95 latency has elapsed")
+    parser.add_argument('--hedge-percentile', type=float, default=95,
+                        help="attempt-latency percentile after which to hedge (default: 95)")
+    parser.add_argument('--endpoints', default=None,
+                        help="comma-separated host:port list to balance concurrent load over "
+                             "(default: the local Triton port for the protocol)")
+    parser.add_argument('--lb', choices=POLICIES, default='round-robin',
+                        help="client-side load balancing policy across --endpoints (default: round-robin)")
+    parser.add_argument('--stream', action='store_true',
+                        help="gRPC bidirectional streaming (start_stream/async_stream_infer) instead of unary calls")
+    parser.add_argument('--stream-inflight', type=int, default=None,
+                        help="in-flight requests per stream (default: concurrency, i.e. one stream)")
+    parser.add_argument('--no-unary-compare', dest='unary_compare', action='store_false',
+                        help="with --stream, skip the unary run at the same concurrency")
+    parser.add_argument('--output-format', choices=FORMATS, default='discard',
+                        help="HTTP response handling: discard, json (parse) or binary (binary tensors, "
+                             "reused buffers); default: discard, json with --corpus")
+    parser.add_argument('--alloc-sample', type=float, default=0.0, metavar='RATE',
+                        help="trace Python allocations with tracemalloc for RATE x iterations extra "
+                             "requests after the timed run (default: 0, off)")
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
     # Get parameters
+    args = parse_args()
     iterations = 50
-    protocol = 'auto'
+    protocol = args.protocol.lower()
     concurrency = 1  # Default: sequential (1 worker)
 
-    if len(sys.argv) > 1:
-        try:
-            iterations = int(sys.argv[1])
-        except ValueError:
-            print(f"Invalid iterations: {sys.argv[1]}, using default: 50")
-
-    if len(sys.argv) > 2:
-        protocol = sys.argv[2].lower()
+    try:
+        iterations = int(args.iterations)
+    except ValueError:
+        print(f"Invalid iterations: {args.iterations}, using default: 50")
 
-    if len(sys.argv) > 3:
+    try:
+        concurrency = int(args.concurrency)
+        if concurrency < 1:
+            print(f"Invalid concurrency: {concurrency}, using default: 1")
+            concurrency = 1
+    except ValueError:
+        print(f"Invalid concurrency: {args.concurrency}, using default: 1")
+
+    corpus = None
+    if args.corpus:
         try:
-            concurrency = int(sys.argv[3])
-            if concurrency < 1:
-                print(f"Invalid concurrency: {concurrency}, using default: 1")
-                concurrency = 1
-        except ValueError:
-            print(f"Invalid concurrency: {sys.argv[3]}, using default: 1")
+            corpus = load_corpus(args.corpus, imgsz=args.imgsz, order=args.corpus_order, seed=args.corpus_seed)
+        except Exception as e:
+            print(f"ERROR: Could not load corpus: {e}")
+            sys.exit(1)
 
     # Auto-detect if needed
     if protocol == 'auto':
@@ -618,17 +1198,47 @@ if __name__ == '__main__':
     else:
         print(f"Sequential mode (1 request at a time)\n")
 
+    metrics = MetricsProbe(args.model) if args.server_metrics else None
+    model_args = {'model_name': args.model, 'imgsz': args.imgsz}
+    policy = RequestPolicy(deadline_ms=args.deadline_ms, retries=args.retries,
+                           hedge_percentile=args.hedge_percentile if args.hedge else None,
+                           max_outstanding=concurrency)
+    if concurrency == 1 and (args.retries or args.hedge or args.endpoints):
+        print(f"⚠ --retries/--hedge/--endpoints apply to concurrent mode only (concurrency > 1)\n")
+    lb = LoadBalancer(parse_endpoints(args.endpoints, TRITON_GRPC_URL if protocol == 'grpc' else TRITON_HTTP_URL),
+                      policy=args.lb, error_penalty_ms=args.deadline_ms)
+
+    # Corpus runs count detections, so the output has to be parsed
+    output_format = 'json' if corpus and args.output_format == 'discard' else args.output_format
+    if output_format != 'discard' and protocol != 'http':
+        print(f"⚠ --output-format applies to HTTP only (gRPC outputs are already decoded with np.frombuffer)\n")
+    codec = HttpCodec(output_format)
+    meter = CostMeter(alloc_sample_rate=args.alloc_sample)
+
     # Run benchmark
-    if protocol == 'grpc':
+    if args.stream and protocol != 'grpc':
+        print(f"ERROR: --stream needs the gRPC protocol (got {protocol})")
+        sys.exit(1)
+
+    if args.stream:
+        results = benchmark_grpc_stream(iterations, concurrency, inflight=args.stream_inflight,
+                                        corpus=corpus, metrics=metrics, lb=lb, meter=meter, **model_args)
+        if results and args.unary_compare:
+            unary = benchmark_grpc_concurrent(iterations, concurrency, corpus=corpus, lb=lb, **model_args)
+            compare_unary(results, unary)
+    elif protocol == 'grpc':
         if concurrency > 1:
-            results = benchmark_grpc_concurrent(iterations, concurrency)
+            results = benchmark_grpc_concurrent(iterations, concurrency, corpus=corpus, metrics=metrics,
+                                                policy=policy, lb=lb, meter=meter, **model_args)
         else:
-            results = benchmark_grpc(iterations)
+            results = benchmark_grpc(iterations, corpus=corpus, metrics=metrics, meter=meter, **model_args)
     elif protocol == 'http':
         if concurrency > 1:
-            results = benchmark_http_concurrent(iterations, concurrency)
+            results = benchmark_http_concurrent(iterations, concurrency, corpus=corpus, metrics=metrics,
+                                                policy=policy, lb=lb, codec=codec, meter=meter, **model_args)
         else:
-            results = benchmark_http(iterations)
+            results = benchmark_http(iterations, corpus=corpus, metrics=metrics, codec=codec, meter=meter,
+                                     **model_args)
     else:
         print(f"ERROR: Unknown protocol: {protocol}")
         print("Use 'http' or 'grpc'")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Multi-Model Benchmark Matrix - Runs INSIDE a Triton pod
+Loads each model through Triton's explicit model-control API, benchmarks it
+at every concurrency level, unloads it, and appends every result to a JSONL
+result store as it completes, so a full model x resolution x concurrency
+matrix needs no redeployment.
+
+Triton must run with --model-control-mode=explicit, and every model entry must
+already be in the model repository (a TensorRT plan built for its
+resolution). Resolutions other than 640 use the repository entry
+'<model>_<imgsz>' (e.g. yolov8s_1280); change it with --name-template. The NIM
+initContainers build these entries from their MATRIX_MODELS / MATRIX_IMGSZ
+environment (set by scripts/deploy-all.sh) with scripts/matrix_engines.sh.
+
+Usage:
+  python3 benchmark_matrix.py --models yolov8s,yolov8m,yolov11s [--imgsz 640,1280]
+                              [--concurrency 1,4,8,16,32] [--iterations 200]
+                              [--protocol auto] [--store /tmp/debug/matrix_results.jsonl]
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from urllib.request import Request, urlopen
+
+import benchmark_internal_universal as universal
+from result_schema import BenchmarkRecord, ResultStore
+from triton_metrics import MetricsProbe
+
+TRITON_HTTP_URL = universal.TRITON_HTTP_URL
+DEFAULT_STORE = "/tmp/debug/matrix_results.jsonl"
+LOAD_TIMEOUT_SEC = 600  # TensorRT engines for the large models can take minutes to deserialize
+
+def _post(path, body=None, timeout=LOAD_TIMEOUT_SEC):
+    data = json.dumps(body or {}).encode('utf-8')
+    req = Request(f"http://{TRITON_HTTP_URL}{path}", data=data, method='POST')
+    req.add_header('Content-Type', 'application/json')
+    with urlopen(req, timeout=timeout) as response:
+        raw = response.read()
+    return json.loads(raw) if raw else {}
+
+def repository_index():
+    """Models in the repository with their state ({name: state})"""
+    return {m['name']: m.get('state', '') for m in _post("/v2/repository/index", {'ready': False}, timeout=30)}
+
+def load_model(name, config=None):
+    """Load (or reload) a model; config is an optional config.pbtxt override as a JSON dict"""
+    body = {'parameters': {'config': json.dumps(config)}} if config else None
+    _post(f"/v2/repository/models/{name}/load", body)
+
+def unload_model(name):
+    _post(f"/v2/repository/models/{name}/unload", {'parameters': {'unload_dependents': False}}, timeout=60)
+
+def wait_ready(name, timeout=LOAD_TIMEOUT_SEC):
+    """Poll the model ready endpoint until it returns 200"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urlopen(f"http://{TRITON_HTTP_URL}/v2/models/{name}/ready", timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except Exception:
+            pass
+        time.sleep(1)
+    return False
+
+def run_one(protocol, model_name, imgsz, iterations, concurrency, server_metrics):
+    """One benchmark cell using the universal benchmark functions"""
+    metrics = MetricsProbe(model_name) if server_metrics else None
+    kwargs = {'metrics': metrics, 'model_name': model_name, 'imgsz': imgsz}
+    if protocol == 'grpc':
+        if concurrency > 1:
+            return universal.benchmark_grpc_concurrent(iterations, concurrency, **kwargs)
+        return universal.benchmark_grpc(iterations, **kwargs)
+    if concurrency > 1:
+        return universal.benchmark_http_concurrent(iterations, concurrency, **kwargs)
+    return universal.benchmark_http(iterations, **kwargs)
+
+def failed_record(model, entry, imgsz, protocol, concurrency, deployment, error):
+    return BenchmarkRecord(model=entry, deployment=deployment, protocol=protocol, location='internal',
+                           concurrency=concurrency, status='failed', test_type='matrix',
+                           timestamp=datetime.now().isoformat(),
+                           extra={'base_model': model, 'imgsz': imgsz, 'error': str(error)[:300]})
+
+def run_matrix(models, sizes, concurrencies, iterations, protocol, store, deployment,
+               name_template='{model}_{imgsz}', keep_loaded=False, server_metrics=True):
+    """Benchmark every model x resolution x concurrency cell, streaming records to the store"""
+    try:
+        index = repository_index()
+    except Exception as e:
+        print(f"✗ Repository API not available (is Triton in explicit model-control mode?): {e}")
+        return 0
+    initially_loaded = {name for name, state in index.items() if state == 'READY'}
+
+    cells = len(models) * len(sizes) * len(concurrencies)
+    done = 0
+    print(f"Matrix: {len(models)} models x {len(sizes)} resolutions x {len(concurrencies)} concurrency levels "
+          f"= {cells} runs -> {store.path}\n")
+
+    for model in models:
+        for imgsz in sizes:
+            entry = model if imgsz == 640 else name_template.format(model=model, imgsz=imgsz)
+            print(f"\n{'#'*70}\n# {entry} (imgsz {imgsz})\n{'#'*70}")
+
+            if entry not in index:
+                print(f"✗ {entry} not in model repository (deploy with MATRIX_MODELS/MATRIX_IMGSZ), skipping")
+                for c in concurrencies:
+                    store.append(failed_record(model, entry, imgsz, protocol, c, deployment, 'not in repository'))
+                continue
+
+            try:
+                load_start = time.perf_counter()
+                load_model(entry)
+                if not wait_ready(entry):
+                    raise RuntimeError(f"not ready after {LOAD_TIMEOUT_SEC}s")
+                load_sec = time.perf_counter() - load_start
+                print(f"✓ Loaded {entry} in {load_sec:.1f}s")
+            except Exception as e:
+                print(f"✗ Failed to load {entry}: {e}")
+                for c in concurrencies:
+                    store.append(failed_record(model, entry, imgsz, protocol, c, deployment, e))
+                continue
+
+            try:
+                for c in concurrencies:
+                    results = run_one(protocol, entry, imgsz, iterations, c, server_metrics)
+                    if not results:
+                        store.append(failed_record(model, entry, imgsz, protocol, c, deployment, 'benchmark failed'))
+                        continue
+                    results.update({'base_model': model, 'load_sec': load_sec})
+                    record = BenchmarkRecord.from_result(
+                        results, model=entry, deployment=deployment, concurrency=c,
+                        test_type='matrix', timestamp=datetime.now().isoformat())
+                    store.append(record)
+                    done += 1
+                    print(f"  ✓ {entry} c={c}: mean {record.latency_mean_ms:.2f} ms, "
+                          f"p95 {record.latency_p95_ms:.2f} ms, {record.throughput_fps:.1f} FPS")
+            finally:
+                if not keep_loaded and entry not in initially_loaded:
+                    try:
+                        unload_model(entry)
+                        print(f"✓ Unloaded {entry}")
+                    except Exception as e:
+                        print(f"⚠ Could not unload {entry}: {e}")
+
+    print(f"\n✓ Matrix complete: {done}/{cells} runs succeeded, results in {store.path}")
+    return done
+
+def _list(value, cast=str):
+    return [cast(v.strip()) for v in value.split(',') if v.strip()]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark a model x resolution x concurrency matrix")
+    parser.add_argument('--models', required=True, help='comma-separated Triton model names')
+    parser.add_argument('--imgsz', default='640', help='comma-separated input resolutions (default: 640)')
+    parser.add_argument('--concurrency', default='1,4,8,16,32', help='comma-separated concurrency levels')
+    parser.add_argument('--iterations', type=int, default=200, help='requests per run (default: 200)')
+    parser.add_argument('--protocol', default='auto', help="'http', 'grpc' or 'auto'")
+    parser.add_argument('--deployment', default='triton', help='deployment name recorded with results')
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'JSONL result store (default: {DEFAULT_STORE})')
+    parser.add_argument('--name-template', default='{model}_{imgsz}',
+                        help='repository entry for non-640 resolutions (default: {model}_{imgsz})')
+    parser.add_argument('--keep-loaded', action='store_true', help='do not unload models after benchmarking')
+    parser.add_argument('--no-server-metrics', dest='server_metrics', action='store_false')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    protocol = args.protocol.lower()
+    if protocol == 'auto':
+        protocol = universal.auto_detect_protocol()
+        if not protocol:
+            print("ERROR: Could not detect any available protocol")
+            sys.exit(1)
+
+    done = run_matrix(_list(args.models), _list(args.imgsz, int), _list(args.concurrency, int),
+                      args.iterations, protocol, ResultStore(args.store), args.deployment,
+                      name_template=args.name_template, keep_loaded=args.keep_loaded,
+                      server_metrics=args.server_metrics)
+    sys.exit(0 if done else 1)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Raw vs Top-K Output Benchmark - Runs INSIDE a Triton pod
+Sends the same inputs to the raw engine (yolov8s: output0, 84x8400 FP32) and
+to the yolov8s_topk ensemble (engine + server-side top-K/NMS, see
+scripts/yolo_postprocess.py), and compares response bytes and end-to-end
+latency.
+
+End-to-end includes what the client has to do to get detections: decode
+output0 and run NMS for the raw model, read num_detections for the ensemble.
+HTTP runs use binary tensors for both, so the raw model is not penalised by
+JSON encoding of 705,600 floats.
+
+The ensemble is loaded through the explicit model-control API if it is not
+loaded yet (its composing models load with it), and unloaded afterwards.
+
+Usage:
+  python3 benchmark_topk.py [iterations] [protocol] [concurrency]
+                            [--raw-model yolov8s] [--topk-model <raw-model>_topk]
+                            [--corpus DIR] [--imgsz 640] [--keep-loaded]
+"""
+
+import sys
+import json
+import time
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+import numpy as np
+
+import benchmark_internal_universal as universal
+from benchmark_matrix import repository_index, load_model, unload_model, wait_ready, LOAD_TIMEOUT_SEC
+from image_corpus import load_corpus, count_detections
+from http_codec import HttpCodec
+from latency_analysis import summary
+
+RAW_MODEL = universal.MODEL_NAME
+TOPK_OUTPUTS = ('num_detections', 'detection_boxes', 'detection_scores', 'detection_classes')
+WARMUP = 10
+
+def raw_detections(outputs):
+    return count_detections(outputs['output0'])
+
+def topk_detections(outputs):
+    return int(outputs['num_detections'].reshape(-1)[0])
+
+def http_sender(model_name, output_names):
+    """request(input) -> (outputs, response bytes) over HTTP with binary tensors"""
+    codec = HttpCodec('binary', output_name=output_names[0], outputs=output_names)
+    url = f"http://{universal.TRITON_HTTP_URL}/v2/models/{model_name}/infer"
+
+    def request(input_data):
+        with urlopen(codec.request(url, codec.encode(input_data)), timeout=30) as response:
+            body = codec.read(response)
+        return codec.parse_all(body), len(body[0])
+    return request
+
+def grpc_sender(model_name, output_names):
+    """request(input) -> (outputs, response bytes) over gRPC (one client per worker thread)"""
+    import tritonclient.grpc as grpcclient
+
+    local = threading.local()
+    outputs = [grpcclient.InferRequestedOutput(name) for name in output_names]
+
+    def request(input_data):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = grpcclient.InferenceServerClient(url=universal.TRITON_GRPC_URL, verbose=False)
+        inputs = [grpcclient.InferInput("images", input_data.shape, "FP32")]
+        inputs[0].set_data_from_numpy(input_data)
+        result = client.infer(model_name, inputs, model_version=universal.MODEL_VERSION, outputs=outputs)
+        return {name: result.as_numpy(name) for name in output_names}, result.get_response().ByteSize()
+    return request
+
+def run(protocol, model_name, output_names, decode, iterations, concurrency, corpus, imgsz):
+    """Benchmark one model; latency split into the request and the client-side decode"""
+    make_sender = grpc_sender if protocol == 'grpc' else http_sender
+    send = make_sender(model_name, output_names)
+    input_data = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
+
+    print(f"\n{model_name} ({protocol.upper()}, {iterations} requests, concurrency {concurrency})")
+    for _ in range(WARMUP):
+        send(input_data)
+
+    def one_request(_):
+        request_input = universal.next_input(corpus, input_data)[1]
+        start = time.perf_counter()
+        outputs, size = send(request_input)
+        received = time.perf_counter()
+        detections = decode(outputs)
+        end = time.perf_counter()
+        return (received - start) * 1000, (end - start) * 1000, size, detections
+
+    samples, errors = [], 0
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        futures = [ex.submit(one_request, i) for i in range(iterations)]
+        for f in futures:
+            try:
+                samples.append(f.result())
+            except Exception as e:
+                errors += 1
+                if errors == 1:
+                    print(f"  Error: {e}")
+    total_time = time.perf_counter() - start_time
+    if not samples:
+        return None
+
+    request_ms, e2e_ms, sizes, detections = zip(*samples)
+    results = {
+        'model': model_name,
+        'iterations': len(samples),
+        'errors': errors,
+        'request_latency_ms': summary(request_ms),
+        'end_to_end_latency_ms': summary(e2e_ms),
+        'decode_ms': summary([e - r for r, e in zip(request_ms, e2e_ms)]),
+        'response_bytes': sum(sizes) / len(sizes),
+        'throughput_fps': len(samples) / total_time,
+        'detections_mean': sum(detections) / len(detections),
+    }
+    print(f"  {results['response_bytes']:,.0f} bytes/response | end-to-end p50 "
+          f"{results['end_to_end_latency_ms']['p50']:.2f} ms | {results['throughput_fps']:.1f} FPS")
+    return results
+
+def compare(raw, topk):
+    """Top-K relative to raw output: bytes saved and end-to-end latency/throughput differences"""
+    r, t = raw['end_to_end_latency_ms'], topk['end_to_end_latency_ms']
+    return {
+        'bytes_ratio': raw['response_bytes'] / topk['response_bytes'],
+        'bytes_saved_per_request': raw['response_bytes'] - topk['response_bytes'],
+        'p50_delta_ms': t['p50'] - r['p50'],
+        'p99_delta_ms': t['p99'] - r['p99'],
+        'throughput_ratio': topk['throughput_fps'] / raw['throughput_fps'],
+        'detections_delta': topk['detections_mean'] - raw['detections_mean'],
+    }
+
+def print_comparison(results):
+    print(f"\n{'='*70}")
+    print(f"Raw Output vs Server-Side Top-K ({results['protocol'].upper()}, concurrency {results['concurrency']})")
+    print(f"{'='*70}\n")
+    print(f"  {'':14} {'Bytes/resp':>12} {'Request P50':>12} {'Decode P50':>11} "
+          f"{'E2E P50':>9} {'E2E P99':>9} {'FPS':>9} {'Dets':>6}")
+    for name in ('raw', 'topk'):
+        r = results[name]
+        print(f"  {r['model']:14} {r['response_bytes']:12,.0f} {r['request_latency_ms']['p50']:12.2f} "
+              f"{r['decode_ms']['p50']:11.2f} {r['end_to_end_latency_ms']['p50']:9.2f} "
+              f"{r['end_to_end_latency_ms']['p99']:9.2f} {r['throughput_fps']:9.1f} {r['detections_mean']:6.1f}")
+    c = results['topk_vs_raw']
+    print(f"\n  Response size: {c['bytes_ratio']:.0f}x smaller ({c['bytes_saved_per_request']:,.0f} bytes saved per request)")
+    print(f"  End-to-end: P50 {c['p50_delta_ms']:+.2f} ms | P99 {c['p99_delta_ms']:+.2f} ms | "
+          f"throughput {c['throughput_ratio']:.2f}x (top-K - raw)")
+    if abs(c['detections_delta']) > 0.5:
+        print(f"  ⚠ Detection counts differ by {c['detections_delta']:+.1f} per image "
+              f"(check CONF_THRES/IOU_THRES or TOP_K in the postprocess config)")
+    print()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare raw output0 with the server-side top-K ensemble")
+    parser.add_argument('iterations', nargs='?', type=int, default=200)
+    parser.add_argument('protocol', nargs='?', default='auto', help="'http', 'grpc' or 'auto'")
+    parser.add_argument('concurrency', nargs='?', type=int, default=1)
+    parser.add_argument('--raw-model', default=RAW_MODEL)
+    parser.add_argument('--topk-model', default=None,
+                        help="default: <raw-model>_topk, as the nim-grpc initContainer names it")
+    parser.add_argument('--corpus', default=None, help="directory of JPEGs to replay (default: random tensors)")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--keep-loaded', action='store_true', help="do not unload the ensemble afterwards")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    args.topk_model = args.topk_model or f"{args.raw_model}_topk"
+    protocol = args.protocol.lower()
+    if protocol == 'auto':
+        protocol = universal.auto_detect_protocol()
+        if not protocol:
+            print("ERROR: Could not detect any available protocol")
+            sys.exit(1)
+
+    corpus = load_corpus(args.corpus, imgsz=args.imgsz) if args.corpus else None
+
+    loaded_here = False
+    try:
+        if repository_index().get(args.topk_model) != 'READY':
+            print(f"Loading {args.topk_model}...")
+            load_model(args.topk_model)
+            if not wait_ready(args.topk_model):
+                print(f"✗ {args.topk_model} not ready after {LOAD_TIMEOUT_SEC}s")
+                sys.exit(1)
+            loaded_here = True
+    except Exception as e:
+        print(f"✗ Could not load {args.topk_model} (is it in the model repository?): {e}")
+        sys.exit(1)
+
+    try:
+        run_args = (args.iterations, args.concurrency, corpus, args.imgsz)
+        raw = run(protocol, args.raw_model, ('output0',), raw_detections, *run_args)
+        topk = run(protocol, args.topk_model, TOPK_OUTPUTS, topk_detections, *run_args)
+    finally:
+        if loaded_here and not args.keep_loaded:
+            try:
+                unload_model(args.topk_model)
+            except Exception as e:
+                print(f"⚠ Could not unload {args.topk_model}: {e}")
+
+    if not raw or not topk:
+        print("ERROR: Benchmark failed")
+        sys.exit(1)
+
+    results = {
+        'protocol': protocol,
+        'concurrency': args.concurrency,
+        'imgsz': args.imgsz,
+        'corpus': corpus.describe() if corpus else None,
+        'timestamp': datetime.now().isoformat(),
+        'raw': raw,
+        'topk': topk,
+        'topk_vs_raw': compare(raw, topk),
+    }
+    print_comparison(results)
+
+    results_file = Path("/tmp/debug/topk_results.json")
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_file, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Results saved to: {results_file}")
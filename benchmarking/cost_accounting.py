@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Client Cost Accounting
+What each inference costs the benchmark client: process CPU time, bytes sent
+and received, and (sampled) Python allocations, reported per inference and
+per 1000 inferences under results['client_cost'] for capacity planning
+
+Bytes are body/payload bytes: HTTP request and response bodies, and for gRPC
+the input tensor bytes sent and the serialized response message received.
+Allocations come from tracemalloc (--alloc-sample RATE) in a separate pass
+after the measured run: RATE x iterations extra requests, one at a time, so
+tracing never slows the timed requests and no other thread's allocations are
+counted. Each traced request reports its peak traced bytes and its retained
+blocks: the difference of the block counts of snapshots taken before and
+after it. That is what the request left allocated, not how many allocations
+it made; tracemalloc does not see blocks freed within the request.
+"""
+
+import threading
+import time
+import tracemalloc
+
+PER_INFERENCES = 1000
+
+# Snapshots leave out tracemalloc's own allocations (the previous snapshot)
+OWN_TRACES = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+def trace_request(send):
+    """(peak bytes, retained blocks) of one send() call under tracemalloc"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(OWN_TRACES)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        send()
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot().filter_traces(OWN_TRACES)
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return peak, retained
+
+class CostMeter:
+    """Client resource totals over a measured run"""
+
+    def __init__(self, alloc_sample_rate=0.0):
+        self.alloc_sample_rate = alloc_sample_rate
+        self._lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.alloc_samples = 0
+        self.alloc_peak_bytes = 0
+        self.retained_blocks = 0
+        self.cpu_sec = None
+        self.wall_sec = None
+
+    def start(self):
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    def stop(self):
+        self.cpu_sec = time.process_time() - self._cpu_start
+        self.wall_sec = time.perf_counter() - self._wall_start
+
+    def add_bytes(self, sent=0, received=0):
+        with self._lock:
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def trace_allocations(self, send, iterations):
+        """Untimed pass after stop(): trace send() for alloc_sample_rate x iterations requests"""
+        if not self.alloc_sample_rate or tracemalloc.is_tracing():
+            return
+        count = max(1, round(self.alloc_sample_rate * iterations))
+        print(f"Tracing allocations ({count} requests, untimed)...")
+        for _ in range(count):
+            try:
+                peak, retained = trace_request(send)
+            except Exception as e:
+                print(f"  Warning: traced request failed: {e}")
+                continue
+            self.alloc_samples += 1
+            self.alloc_peak_bytes += peak
+            self.retained_blocks += retained
+        print()
+
+    def report(self, inferences):
+        """Totals plus per-inference and per-1000-inference costs"""
+        report = {
+            'inferences': inferences,
+            'cpu_sec': self.cpu_sec,
+            'wall_sec': self.wall_sec,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'alloc_sample_rate': self.alloc_sample_rate,
+            'alloc_samples': self.alloc_samples,
+        }
+        if not inferences or self.cpu_sec is None:
+            return report
+        report['per_inference'] = {
+            'cpu_ms': self.cpu_sec / inferences * 1000,
+            'bytes_sent': self.bytes_sent / inferences,
+            'bytes_received': self.bytes_received / inferences,
+        }
+        report[f'per_{PER_INFERENCES}_inferences'] = {
+            'cpu_sec': self.cpu_sec / inferences * PER_INFERENCES,
+            'mb_sent': self.bytes_sent / inferences * PER_INFERENCES / 1e6,
+            'mb_received': self.bytes_received / inferences * PER_INFERENCES / 1e6,
+        }
+        if self.alloc_samples:
+            report['per_inference']['alloc_peak_bytes'] = self.alloc_peak_bytes / self.alloc_samples
+            report['per_inference']['retained_blocks'] = self.retained_blocks / self.alloc_samples
+        return report
+
+def print_cost(cost):
+    """Print a results['client_cost'] dict (no-op when absent)"""
+    if not cost or 'per_inference' not in cost:
+        return
+    per, per_k = cost['per_inference'], cost[f'per_{PER_INFERENCES}_inferences']
+    print(f"Client Cost ({cost['inferences']} inferences):")
+    print(f"  Per inference: {per['cpu_ms']:.2f} ms CPU, {per['bytes_sent']:,.0f} B sent, "
+          f"{per['bytes_received']:,.0f} B received")
+    print(f"  Per {PER_INFERENCES}:      {per_k['cpu_sec']:.2f} CPU-s, {per_k['mb_sent']:.2f} MB sent, "
+          f"{per_k['mb_received']:.2f} MB received")
+    if 'alloc_peak_bytes' in per:
+        print(f"  Allocations:   {per['alloc_peak_bytes'] / 1024:,.0f} KiB peak, "
+              f"{per['retained_blocks']:,.0f} blocks retained per request ({cost['alloc_samples']} traced)")
+    print()
+
+def print_server_cost(cost):
+    """Print a results['server_cost'] dict from base-yolo's GET /accounting (no-op when absent)"""
+    if not cost or 'per_inference' not in cost:
+        return
+    per, per_k = cost['per_inference'], cost[f'per_{PER_INFERENCES}_inferences']
+    print(f"Server Cost ({cost['inferences']} inferences, process CPU {cost['process_cpu_pct']:.0f}%):")
+    print(f"  Per inference: {per['process_cpu_ms']:.2f} ms process CPU ({per['request_cpu_ms']:.2f} ms in "
+          f"request threads), {per['bytes_in']:,.0f} B in, {per['bytes_out']:,.0f} B out")
+    print(f"  Per {PER_INFERENCES}:      {per_k['process_cpu_sec']:.2f} CPU-s, {per_k['mb_in']:.2f} MB in, "
+          f"{per_k['mb_out']:.2f} MB out")
+    if 'alloc_peak_bytes_per_request' in cost:
+        print(f"  Allocations:   {cost['alloc_peak_bytes_per_request'] / 1024:,.0f} KiB peak, "
+              f"{cost['retained_blocks_per_request']:,.0f} blocks retained per request ({cost['alloc_samples']} sampled)")
+    print()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Interactive HTML Performance Dashboard
+Builds one self-contained HTML file (inline JS/CSS, no CDN) from the result
+store. Runs are pre-aggregated per model/deployment/protocol/concurrency and
+time bucket, and embedded as base64 typed arrays; filtering and charting
+happen in the browser, so large histories still load quickly.
+
+Usage:
+  python3 dashboard.py <results.jsonl|.json|.csv> [...] [-o dashboard.html]
+"""
+
+import base64
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+from result_schema import load_records, to_arrays
+
+DIMENSIONS = ('model', 'deployment', 'protocol')
+METRICS = ('latency_mean_ms', 'latency_p50_ms', 'latency_p95_ms', 'latency_p99_ms',
+           'throughput_fps', 'error_rate_pct')
+METRIC_LABELS = {
+    'latency_mean_ms': 'Mean latency (ms)',
+    'latency_p50_ms': 'P50 latency (ms)',
+    'latency_p95_ms': 'P95 latency (ms)',
+    'latency_p99_ms': 'P99 latency (ms)',
+    'throughput_fps': 'Throughput (FPS)',
+    'error_rate_pct': 'Error rate (%)',
+}
+
+# Above this many aggregated groups the time bucket is widened (1 -> 7 -> 30 -> 365 days)
+MAX_GROUPS = 20000
+BUCKET_DAYS = (1, 7, 30, 365)
+
+def _b64(values, dtype):
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+def _epoch_days(timestamps):
+    """ISO timestamps -> days since epoch (-1 when missing/unparseable); parses each unique value once"""
+    unique, inverse = np.unique(timestamps, return_inverse=True)
+    days = np.full(len(unique), -1, dtype=np.int32)
+    for i, ts in enumerate(unique):
+        try:
+            parsed = datetime.fromisoformat(str(ts))
+        except ValueError:
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        days[i] = int(parsed.timestamp() // 86400)
+    return days[inverse]
+
+def aggregate(columns):
+    """Group runs by dimensions, concurrency and time bucket; weighted means per metric"""
+    ok = columns['status'] == 'success'
+    columns = {name: values[ok] for name, values in columns.items()}
+    iterations = columns['iterations']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns['error_rate_pct'] = np.where(iterations > 0, np.nan_to_num(columns['errors']) / iterations * 100, np.nan)
+
+    dims = {}
+    codes = []
+    for name in DIMENSIONS:
+        labels, inverse = np.unique(columns[name], return_inverse=True)
+        dims[name] = [str(label) or 'unknown' for label in labels]
+        codes.append(inverse)
+    concurrency = np.nan_to_num(columns['concurrency'], nan=1).astype(np.int64)
+    levels, inverse = np.unique(concurrency, return_inverse=True)
+    dims['concurrency'] = [int(c) for c in levels]
+    codes.append(inverse)
+
+    days = _epoch_days(columns['timestamp'])
+    for bucket_days in BUCKET_DAYS:
+        bucket = np.where(days >= 0, days // bucket_days * bucket_days, -1)
+        keys, group = np.unique(np.stack(codes + [bucket], axis=1), axis=0, return_inverse=True)
+        if len(keys) <= MAX_GROUPS:
+            break
+    group = group.reshape(-1)
+
+    n = len(keys)
+    data = {
+        'dims': dims,
+        'bucket_days': bucket_days,
+        'groups': n,
+        'runs': int(ok.sum()),
+        'columns': {
+            'model': _b64(keys[:, 0], '<u2'),
+            'deployment': _b64(keys[:, 1], '<u2'),
+            'protocol': _b64(keys[:, 2], '<u2'),
+            'concurrency': _b64(keys[:, 3], '<u2'),
+            'day': _b64(keys[:, 4], '<i4'),
+            'runs': _b64(np.bincount(group, minlength=n), '<u4'),
+        },
+    }
+    for metric in METRICS:
+        values = columns[metric]
+        finite = np.isfinite(values)
+        weights = np.bincount(group[finite], minlength=n)
+        sums = np.bincount(group[finite], weights=values[finite], minlength=n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = np.where(weights > 0, sums / weights, np.nan)
+        data['columns'][metric] = _b64(means, '<f4')
+        data['columns'][metric + '_n'] = _b64(weights, '<u4')
+    return data
+
+def build_dashboard(columns, path, deployments=None):
+    """Write the self-contained dashboard for the given result columns"""
+    data = aggregate(columns)
+    data['metrics'] = METRIC_LABELS
+    data['generated'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    data['colors'] = {name: config['color'] for name, config in (deployments or {}).items()}
+    payload = json.dumps(data, separators=(',', ':')).replace('</', '<\\/')
+    with open(path, 'w') as f:
+        f.write(HTML_TEMPLATE.replace('__DATA__', payload))
+    return data
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>YOLO-NIM Performance Dashboard</title>
+<style>
+body { font-family: -apple-system, Segoe UI, Helvetica, Arial, sans-serif; margin: 0; background: #f4f5f7; color: #222; }
+header { background: #1f2d3d; color: #fff; padding: 12px 20px; }
+header h1 { margin: 0; font-size: 20px; }
+header span { font-size: 12px; opacity: 0.8; }
+#filters { display: flex; flex-wrap: wrap; gap: 16px; padding: 12px 20px; background: #fff; border-bottom: 1px solid #ddd; }
+#filters label { font-size: 12px; font-weight: bold; display: block; margin-bottom: 4px; }
+#filters select { min-width: 140px; }
+main { display: grid; grid-template-columns: 1fr 1fr; gap: 16px; padding: 16px 20px; }
+.panel { background: #fff; border: 1px solid #ddd; border-radius: 4px; padding: 10px; }
+.panel h2 { font-size: 14px; margin: 0 0 8px 0; }
+.wide { grid-column: 1 / 3; }
+svg text { font-size: 11px; }
+table { border-collapse: collapse; width: 100%; font-size: 12px; }
+th, td { padding: 4px 8px; border-bottom: 1px solid #eee; text-align: right; }
+th:nth-child(-n+3), td:nth-child(-n+3) { text-align: left; }
+th { cursor: pointer; background: #fafafa; }
+.legend span { display: inline-block; margin-right: 12px; font-size: 12px; }
+.legend i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+</style>
+</head>
+<body>
+<header><h1>YOLO-NIM Performance Dashboard</h1><span id="summary"></span></header>
+<div id="filters"></div>
+<main>
+  <div class="panel"><h2 id="title-conc"></h2><svg id="chart-conc" width="100%" height="320"></svg><div class="legend" id="legend-conc"></div></div>
+  <div class="panel"><h2 id="title-time"></h2><svg id="chart-time" width="100%" height="320"></svg><div class="legend" id="legend-time"></div></div>
+  <div class="panel wide"><h2>Runs by configuration (filtered)</h2><table id="table"></table></div>
+</main>
+<script id="data" type="application/json">__DATA__</script>
+<script>
+(function () {
+  var D = JSON.parse(document.getElementById('data').textContent);
+  var PALETTE = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#F7B267', '#A29BFE', '#636E72', '#E17055'];
+
+  function decode(b64, Type) {
+    var bin = atob(b64), bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+  var types = {model: Uint16Array, deployment: Uint16Array, protocol: Uint16Array, concurrency: Uint16Array,
+               day: Int32Array, runs: Uint32Array};
+  var C = {};
+  Object.keys(D.columns).forEach(function (name) {
+    C[name] = decode(D.columns[name], types[name] || (/_n$/.test(name) ? Uint32Array : Float32Array));
+  });
+  var N = D.groups;
+  var dimNames = ['model', 'deployment', 'protocol', 'concurrency'];
+
+  function color(deployment, i) { return D.colors[deployment] || PALETTE[i % PALETTE.length]; }
+
+  // Filters
+  var filters = document.getElementById('filters'), selects = {};
+  dimNames.forEach(function (dim) {
+    var box = document.createElement('div'), label = document.createElement('label'), sel = document.createElement('select');
+    label.textContent = dim;
+    sel.multiple = true;
+    sel.size = Math.min(6, D.dims[dim].length);
+    D.dims[dim].forEach(function (v, i) {
+      var o = document.createElement('option'); o.value = i; o.textContent = v; o.selected = true; sel.appendChild(o);
+    });
+    sel.onchange = render;
+    box.appendChild(label); box.appendChild(sel); filters.appendChild(box); selects[dim] = sel;
+  });
+  var metricBox = document.createElement('div'), metricLabel = document.createElement('label'), metricSel = document.createElement('select');
+  metricLabel.textContent = 'metric';
+  Object.keys(D.metrics).forEach(function (m) {
+    var o = document.createElement('option'); o.value = m; o.textContent = D.metrics[m]; metricSel.appendChild(o);
+  });
+  metricSel.onchange = render;
+  metricBox.appendChild(metricLabel); metricBox.appendChild(metricSel); filters.appendChild(metricBox);
+
+  function selected(dim) {
+    var keep = new Uint8Array(D.dims[dim].length);
+    Array.prototype.forEach.call(selects[dim].options, function (o) { if (o.selected) keep[o.value] = 1; });
+    return keep;
+  }
+
+  // Weighted mean of metric per (series key, x key) over the filtered groups
+  function aggregate(metric, seriesOf, xOf) {
+    var keep = {}, out = {};
+    dimNames.forEach(function (d) { keep[d] = selected(d); });
+    var values = C[metric], weights = C[metric + '_n'];
+    for (var i = 0; i < N; i++) {
+      if (!keep.model[C.model[i]] || !keep.deployment[C.deployment[i]] || !keep.protocol[C.protocol[i]] ||
+          !keep.concurrency[C.concurrency[i]] || !weights[i] || isNaN(values[i])) continue;
+      var x = xOf(i); if (x === null) continue;
+      var s = seriesOf(i), cell = (out[s] = out[s] || {}), acc = (cell[x] = cell[x] || [0, 0]);
+      acc[0] += values[i] * weights[i]; acc[1] += weights[i];
+    }
+    return out;
+  }
+
+  function lineChart(svg, legend, series, opts) {
+    var width = svg.clientWidth || 600, height = 320, m = {l: 60, r: 15, t: 10, b: 40};
+    var xs = [], ys = [];
+    Object.keys(series).forEach(function (s) { series[s].forEach(function (p) { xs.push(p[0]); ys.push(p[1]); }); });
+    svg.innerHTML = ''; legend.innerHTML = '';
+    if (!xs.length) { svg.innerHTML = '<text x="20" y="30">No data for this selection</text>'; return; }
+    var tx = opts.xLog ? Math.log2 : function (v) { return v; };
+    var x0 = tx(Math.min.apply(null, xs)), x1 = tx(Math.max.apply(null, xs)), y1 = Math.max.apply(null, ys) * 1.05 || 1;
+    if (x0 === x1) { x0 -= 1; x1 += 1; }
+    function px(v) { return m.l + (tx(v) - x0) / (x1 - x0) * (width - m.l - m.r); }
+    function py(v) { return height - m.b - v / y1 * (height - m.t - m.b); }
+    var parts = [];
+    for (var k = 0; k <= 4; k++) {
+      var yv = y1 * k / 4, y = py(yv);
+      parts.push('<line x1="' + m.l + '" x2="' + (width - m.r) + '" y1="' + y + '" y2="' + y + '" stroke="#eee"/>');
+      parts.push('<text x="' + (m.l - 6) + '" y="' + (y + 4) + '" text-anchor="end">' + yv.toFixed(yv < 10 ? 1 : 0) + '</text>');
+    }
+    var ticks = xs.filter(function (v, i) { return xs.indexOf(v) === i; }).sort(function (a, b) { return a - b; });
+    var step = Math.max(1, Math.ceil(ticks.length / 8));
+    ticks.forEach(function (v, i) {
+      if (i % step) return;
+      parts.push('<text x="' + px(v) + '" y="' + (height - m.b + 16) + '" text-anchor="middle">' + opts.xFormat(v) + '</text>');
+    });
+    parts.push('<text x="' + ((width + m.l) / 2) + '" y="' + (height - 6) + '" text-anchor="middle">' + opts.xLabel + '</text>');
+    Object.keys(series).sort().forEach(function (s, i) {
+      var pts = series[s].sort(function (a, b) { return a[0] - b[0]; }), c = color(s, i);
+      parts.push('<polyline fill="none" stroke="' + c + '" stroke-width="2" points="' +
+                 pts.map(function (p) { return px(p[0]) + ',' + py(p[1]); }).join(' ') + '"/>');
+      pts.forEach(function (p) {
+        parts.push('<circle cx="' + px(p[0]) + '" cy="' + py(p[1]) + '" r="3.5" fill="' + c + '"><title>' + s + ': ' +
+                   opts.xFormat(p[0]) + ' -> ' + p[1].toFixed(2) + '</title></circle>');
+      });
+      legend.innerHTML += '<span><i style="background:' + c + '"></i>' + s + '</span>';
+    });
+    svg.innerHTML = parts.join('');
+  }
+
+  function toSeries(agg) {
+    var out = {};
+    Object.keys(agg).forEach(function (s) {
+      out[s] = Object.keys(agg[s]).map(function (x) { var a = agg[s][x]; return [Number(x), a[0] / a[1]]; });
+    });
+    return out;
+  }
+
+  function dayLabel(day) { return new Date(day * 86400000).toISOString().slice(0, 10); }
+
+  var sortKey = 'value', sortDesc = false;
+  function renderTable(metric) {
+    var agg = aggregate(metric, function (i) {
+      return [D.dims.model[C.model[i]], D.dims.deployment[C.deployment[i]], D.dims.protocol[C.protocol[i]]].join('|');
+    }, function (i) { return D.dims.concurrency[C.concurrency[i]]; });
+    var rows = [];
+    Object.keys(agg).forEach(function (s) {
+      Object.keys(agg[s]).forEach(function (c) {
+        var parts = s.split('|'), a = agg[s][c];
+        rows.push({model: parts[0], deployment: parts[1], protocol: parts[2], concurrency: Number(c), value: a[0] / a[1], runs: a[1]});
+      });
+    });
+    rows.sort(function (a, b) {
+      var r = a[sortKey] < b[sortKey] ? -1 : a[sortKey] > b[sortKey] ? 1 : 0; return sortDesc ? -r : r;
+    });
+    var cols = ['model', 'deployment', 'protocol', 'concurrency', 'value', 'runs'];
+    var html = '<tr>' + cols.map(function (c) {
+      return '<th data-key="' + c + '">' + (c === 'value' ? D.metrics[metric] : c) + '</th>';
+    }).join('') + '</tr>';
+    rows.slice(0, 500).forEach(function (r) {
+      html += '<tr>' + cols.map(function (c) {
+        return '<td>' + (c === 'value' ? r.value.toFixed(2) : r[c]) + '</td>';
+      }).join('') + '</tr>';
+    });
+    var table = document.getElementById('table');
+    table.innerHTML = html;
+    Array.prototype.forEach.call(table.querySelectorAll('th'), function (th) {
+      th.onclick = function () {
+        var key = th.getAttribute('data-key'); sortDesc = sortKey === key ? !sortDesc : false; sortKey = key; render();
+      };
+    });
+  }
+
+  function render() {
+    var metric = metricSel.value;
+    var deployment = function (i) { return D.dims.deployment[C.deployment[i]]; };
+    document.getElementById('title-conc').textContent = D.metrics[metric] + ' vs concurrency';
+    lineChart(document.getElementById('chart-conc'), document.getElementById('legend-conc'),
+              toSeries(aggregate(metric, deployment, function (i) { return D.dims.concurrency[C.concurrency[i]]; })),
+              {xLog: true, xLabel: 'Concurrency', xFormat: String});
+    document.getElementById('title-time').textContent = D.metrics[metric] + ' over time (' + D.bucket_days + '-day buckets)';
+    lineChart(document.getElementById('chart-time'), document.getElementById('legend-time'),
+              toSeries(aggregate(metric, deployment, function (i) { return C.day[i] < 0 ? null : C.day[i]; })),
+              {xLog: false, xLabel: 'Date', xFormat: dayLabel});
+    renderTable(metric);
+  }
+
+  document.getElementById('summary').textContent = D.runs + ' runs, ' + N + ' aggregated groups, generated ' + D.generated;
+  render();
+})();
+</script>
+</body>
+</html>
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the self-contained HTML performance dashboard")
+    parser.add_argument('files', nargs='+', help='Result files (.jsonl/.json/.csv)')
+    parser.add_argument('-o', '--output', default='dashboard.html', help='Output HTML file')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    records = load_records(args.files)
+    data = build_dashboard(to_arrays(records), args.output)
+    print(f"✓ Dashboard: {args.output} ({data['runs']} runs, {data['groups']} groups, "
+          f"{data['bucket_days']}-day buckets)")
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Distributed Load Generation
+Coordinator/agent mode for loads one client pod cannot generate (e.g. nim-batching
+at large batch sizes): agents in several pods, or several local processes,
+register with a coordinator, start together and stream histograms back
+
+  1. Agents register; once --agents have registered, each gets its share of
+     the iterations, concurrency and --rate.
+  2. Agents warm up their connections and report ready. When all are ready the
+     coordinator fixes a start time START_DELAY_SEC ahead and every agent starts
+     then (agents correct for clock skew from the coordinator's timestamps).
+  3. While running, agents post their cumulative histogram every second;
+     the coordinator prints merged progress and, when every agent is done,
+     merges the final histograms into the usual results JSON.
+
+Agents also send a heartbeat every HEARTBEAT_INTERVAL_SEC from registration
+on. An agent silent for HEARTBEAT_TIMEOUT_SEC is declared lost: before the
+start the run is aborted (the other agents are told to exit), after it the
+coordinator stops waiting for that agent and reports the run as incomplete.
+
+Each agent runs multiproc_load.generate() (one asyncio loop per agent process).
+
+Usage:
+  # Coordinator (prints the address agents should use)
+  python3 distributed_load.py coordinator [iterations] [protocol] [concurrency] --agents N [--rate R]
+
+  # Agent, in each client pod
+  python3 distributed_load.py agent --coordinator HOST:9500 [--id NAME]
+
+  # Everything on one machine: coordinator plus N local agent processes
+  python3 distributed_load.py coordinator 5000 http 64 --local-agents 4
+
+--endpoints/--lb balance every agent's requests over several Triton endpoints,
+as in multiproc_load.py.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from histogram import Histogram, merge_all
+from load_balancer import POLICIES, parse_endpoints
+from multiproc_load import generate, combine, shard, available_cpus
+from benchmark_internal_universal import (print_results, save_results,
+                                          TRITON_HTTP_URL, TRITON_GRPC_URL, MODEL_NAME)
+
+COORDINATOR_PORT = 9500
+START_DELAY_SEC = 3.0      # lead time between "all agents ready" and the start
+POLL_INTERVAL_SEC = 0.2
+REGISTER_TIMEOUT_SEC = 300
+RUN_TIMEOUT_SEC = 3600
+HEARTBEAT_INTERVAL_SEC = 2.0
+HEARTBEAT_TIMEOUT_SEC = 15.0  # silence after which an agent counts as lost
+
+class Coordinator:
+    """Registration, barrier and histogram collection for one distributed run"""
+
+    def __init__(self, agents, iterations, concurrency, rate, config):
+        self.expected = agents
+        self.config = config
+        self.iterations = shard(iterations, agents)
+        self.concurrency = shard(concurrency, agents)
+        self.rates = [rate * n / iterations for n in self.iterations] if rate else [0.0] * agents
+        self.agents = {}       # agent id -> index
+        self.info = {}         # agent id -> registration details
+        self.ready = set()
+        self.start_at = None
+        self.reports = {}      # agent id -> latest summary
+        self.done = set()
+        self.last_seen = {}    # agent id -> time of its last request
+        self.lost = set()
+        self.aborted = None    # reason, when an agent was lost before the start
+        self._lock = threading.Lock()
+        self.changed = threading.Event()
+
+    def register(self, agent, info):
+        with self._lock:
+            if agent not in self.agents:
+                if len(self.agents) >= self.expected:
+                    return None
+                self.agents[agent] = len(self.agents)
+                self.info[agent] = info
+                self.last_seen[agent] = time.time()
+                print(f"  Agent registered: {agent} ({info.get('host')}, {info.get('cpus')} CPUs) "
+                      f"[{len(self.agents)}/{self.expected}]")
+            return self.agents[agent]
+
+    def assignment(self, agent):
+        with self._lock:
+            if len(self.agents) < self.expected or agent not in self.agents:
+                return None
+            i = self.agents[agent]
+            return dict(self.config, index=i, iterations=self.iterations[i],
+                        concurrency=self.concurrency[i], rate=self.rates[i])
+
+    def mark_ready(self, agent):
+        with self._lock:
+            self.ready.add(agent)
+            if len(self.ready) == self.expected and self.start_at is None:
+                self.start_at = time.time() + START_DELAY_SEC
+                print(f"  All agents ready, starting in {START_DELAY_SEC:.0f} s")
+
+    def report(self, agent, summary, final):
+        with self._lock:
+            self.reports[agent] = summary
+            if final:
+                self.done.add(agent)
+        self.changed.set()
+
+    def touch(self, agent):
+        """Any request from a registered agent counts as a heartbeat"""
+        with self._lock:
+            if agent in self.agents:
+                self.last_seen[agent] = time.time()
+
+    def check_heartbeats(self):
+        """Agents newly declared lost (silent for HEARTBEAT_TIMEOUT_SEC, not done)"""
+        now = time.time()
+        with self._lock:
+            lost = [a for a, seen in self.last_seen.items()
+                    if a not in self.done and a not in self.lost and now - seen > HEARTBEAT_TIMEOUT_SEC]
+            self.lost.update(lost)
+            if lost and self.start_at is None:
+                self.aborted = f"agent {', '.join(lost)} lost before the start"
+        return lost
+
+    def finished(self):
+        with self._lock:
+            return len(self.done | self.lost) == self.expected
+
+    def complete(self):
+        with self._lock:
+            return len(self.done) == self.expected
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.reports)
+
+def _handler(coordinator):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            return json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+
+        def do_POST(self):
+            data = self._body()
+            agent = data.get('agent')
+            coordinator.touch(agent)
+            if self.path == '/heartbeat':
+                return self._reply(200, {})
+            if self.path == '/register':
+                index = coordinator.register(agent, data)
+                if index is None:
+                    return self._reply(409, {'error': 'all agent slots taken'})
+                return self._reply(200, {'index': index})
+            if self.path == '/ready':
+                coordinator.mark_ready(agent)
+                return self._reply(200, {})
+            if self.path == '/report':
+                coordinator.report(agent, data['summary'], data.get('final', False))
+                return self._reply(200, {})
+            self._reply(404, {'error': 'unknown path'})
+
+        def do_GET(self):
+            agent = self.path.partition('agent=')[2]
+            coordinator.touch(agent)
+            if coordinator.aborted:
+                return self._reply(410, {'error': coordinator.aborted})
+            if self.path.startswith('/assignment'):
+                assignment = coordinator.assignment(agent)
+                return self._reply(200, assignment) if assignment else self._reply(204)
+            if self.path.startswith('/start'):
+                # Coordinator clock, so agents can correct their own skew
+                if coordinator.start_at is None:
+                    return self._reply(204)
+                return self._reply(200, {'start_at': coordinator.start_at, 'now': time.time()})
+            self._reply(404, {'error': 'unknown path'})
+
+    return Handler
+
+def _spawn_local_agents(count, port):
+    script = os.path.abspath(__file__)
+    return [subprocess.Popen([sys.executable, script, 'agent', '--coordinator', f"127.0.0.1:{port}",
+                              '--id', f"local-{i}"])
+            for i in range(count)]
+
+def run_coordinator(args):
+    protocol = args.protocol
+    endpoints = parse_endpoints(args.endpoints, args.url or (TRITON_GRPC_URL if protocol == 'grpc' else TRITON_HTTP_URL))
+    agents = args.local_agents or args.agents
+    concurrency = max(agents, args.concurrency)
+    config = {'protocol': protocol, 'endpoints': endpoints, 'lb': args.lb, 'model_name': args.model,
+              'imgsz': args.imgsz, 'timeout': args.timeout}
+    coordinator = Coordinator(agents, args.iterations, concurrency, args.rate, config)
+
+    server = ThreadingHTTPServer(('0.0.0.0', args.port), _handler(coordinator))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"\n{'='*70}")
+    print(f"Distributed {protocol.upper()} Load Test")
+    print(f"{'='*70}\n")
+    print(f"Configuration:")
+    print(f"  Coordinator: {socket.gethostbyname(socket.gethostname())}:{args.port}")
+    print(f"  URL: {', '.join(endpoints)}" + (f" ({args.lb})" if len(endpoints) > 1 else ""))
+    print(f"  Model: {args.model}")
+    print(f"  Total Requests: {args.iterations}")
+    print(f"  Concurrency: {concurrency} in flight across {agents} agents")
+    print(f"  Load: {f'open loop at {args.rate:g} req/s' if args.rate else 'closed loop'}\n")
+
+    local = _spawn_local_agents(args.local_agents, args.port) if args.local_agents else []
+    print(f"Waiting for {agents} agents...")
+
+    deadline = time.time() + REGISTER_TIMEOUT_SEC + RUN_TIMEOUT_SEC
+    last_print = 0.0
+    while not coordinator.finished() and time.time() < deadline:
+        coordinator.changed.wait(1.0)
+        coordinator.changed.clear()
+        if local and all(p.poll() is not None for p in local) and not coordinator.finished():
+            print(f"✗ Local agents exited before finishing")
+            break
+        for agent in coordinator.check_heartbeats():
+            print(f"✗ Agent {agent} lost: no heartbeat for {HEARTBEAT_TIMEOUT_SEC:.0f} s")
+        if coordinator.aborted:
+            print(f"✗ Run aborted: {coordinator.aborted}")
+            # Let waiting agents see the 410 before the server goes away
+            time.sleep(2 * POLL_INTERVAL_SEC + 1)
+            break
+        if coordinator.start_at and time.time() - last_print >= 2.0:
+            last_print = time.time()
+            reports = coordinator.snapshot().values()
+            merged = merge_all(Histogram.from_dict(r['histogram']) for r in reports)
+            errors = sum(r['errors'] for r in reports)
+            p99 = merged.percentile(99)
+            print(f"  Progress: {merged.count}/{args.iterations} - "
+                  f"P99: {p99 or 0:.2f} ms - Errors: {errors} - Agents done: {len(coordinator.done)}/{agents}")
+
+    for p in local:
+        try:
+            p.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            p.kill()
+    server.shutdown()
+    if coordinator.aborted:
+        return None
+
+    reports = []
+    for agent, summary in coordinator.snapshot().items():
+        info = coordinator.info.get(agent, {})
+        reports.append(dict(summary, agent=agent, host=info.get('host'), final=agent in coordinator.done))
+    reports.sort(key=lambda r: coordinator.agents[r['agent']])
+    for r in reports:
+        if r['first_error']:
+            print(f"  Error ({r['agent']}): {r['first_error']}")
+
+    # Local agents (and several agents in one pod) share their host's CPUs: count each host once
+    host_cpus = {info.get('host', agent): info.get('cpus', 1) for agent, info in coordinator.info.items()}
+    results = combine(reports, sum(host_cpus.values())) if reports else None
+    if results is None:
+        return None
+    results.update({'protocol': protocol, 'model': args.model, 'imgsz': args.imgsz, 'concurrency': concurrency,
+                    'client': 'distributed', 'agents': agents, 'target_rate': args.rate or None,
+                    'complete': coordinator.complete(), 'lost_agents': sorted(coordinator.lost)})
+    results['per_agent'] = results.pop('per_process')
+    return results
+
+def _call(coordinator, path, payload=None, timeout=10):
+    """POST payload (or GET when None) to the coordinator; returns (status, json)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = Request(f"http://{coordinator}{path}", data=data)
+    if data is not None:
+        req.add_header('Content-Type', 'application/json')
+    with urlopen(req, timeout=timeout) as response:
+        body = response.read()
+        return response.status, (json.loads(body) if body else None)
+
+def _poll(coordinator, path, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            status, body = _call(coordinator, path)
+            if status == 200:
+                return body
+        except HTTPError as e:
+            if e.code == 410:
+                raise RuntimeError(f"run aborted by coordinator: {json.loads(e.read() or b'{}').get('error')}")
+        except OSError:
+            pass  # coordinator not up yet
+        time.sleep(POLL_INTERVAL_SEC)
+    raise TimeoutError(f"no answer from coordinator {coordinator}{path} within {timeout} s")
+
+def run_agent(args):
+    agent = args.id or f"{socket.gethostname()}-{os.getpid()}"
+    info = {'agent': agent, 'host': socket.gethostname(), 'cpus': available_cpus()}
+    deadline = time.time() + REGISTER_TIMEOUT_SEC
+    while True:
+        try:
+            _call(args.coordinator, '/register', info)
+            break
+        except OSError as e:
+            if time.time() > deadline:
+                raise TimeoutError(f"could not register with {args.coordinator}: {e}")
+            time.sleep(POLL_INTERVAL_SEC)
+
+    # Heartbeats for the whole life of the agent (warmup included), so the coordinator notices a dead one
+    def heartbeat():
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL_SEC)
+            try:
+                _call(args.coordinator, '/heartbeat', {'agent': agent})
+            except OSError:
+                pass
+    threading.Thread(target=heartbeat, name='heartbeat', daemon=True).start()
+
+    work = _poll(args.coordinator, f"/assignment?agent={agent}", REGISTER_TIMEOUT_SEC)
+    print(f"[{agent}] assigned {work['iterations']} requests, {work['concurrency']} in flight"
+          + (f", {work['rate']:.1f} req/s" if work['rate'] else ""))
+
+    skew = [0.0]
+
+    def wait_start():
+        _call(args.coordinator, '/ready', {'agent': agent})
+        _poll(args.coordinator, f"/start?agent={agent}", REGISTER_TIMEOUT_SEC)
+        # Offset of the coordinator clock from ours, from the midpoint of one round trip
+        sent = time.time()
+        _, start = _call(args.coordinator, f"/start?agent={agent}")
+        skew[0] = start['now'] - (sent + time.time()) / 2
+        delay = start['start_at'] - skew[0] - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def to_coordinator_clock(summary):
+        return dict(summary, start_unix=summary['start_unix'] + skew[0], end_unix=summary['end_unix'] + skew[0])
+
+    async def report(summary, final=False):
+        payload = {'agent': agent, 'final': final, 'summary': to_coordinator_clock(summary)}
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _call, args.coordinator, '/report', payload)
+        except OSError as e:
+            print(f"[{agent}] report failed: {e}")
+
+    async def main():
+        summary = await generate(work, work['iterations'], work['concurrency'], work['rate'],
+                                 seed=work['index'], wait_start=wait_start, report=report)
+        await report(summary, final=True)
+        return summary
+
+    summary = asyncio.run(main())
+    print(f"[{agent}] done: {summary['completed']} ok, {summary['errors']} errors, "
+          f"CPU {summary['cpu_pct']:.0f}% of one core")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed Triton load generation (coordinator/agents)")
+    roles = parser.add_subparsers(dest='role', required=True)
+
+    c = roles.add_parser('coordinator', help="assign work, synchronize the start and merge results")
+    c.add_argument('iterations', nargs='?', type=int, default=1000,
+                   help="total number of requests across all agents (default: 1000)")
+    c.add_argument('protocol', nargs='?', choices=['http', 'grpc'], default='http',
+                   help="'http' or 'grpc' (default: http)")
+    c.add_argument('concurrency', nargs='?', type=int, default=32,
+                   help="total in-flight requests across all agents (default: 32)")
+    c.add_argument('--agents', type=int, default=2, help="number of agents to wait for (default: 2)")
+    c.add_argument('--local-agents', type=int, default=0,
+                   help="spawn N agent processes on this machine instead of waiting for remote ones")
+    c.add_argument('--rate', type=float, default=0.0,
+                   help="open-loop target rate in requests/s across all agents (default: closed loop)")
+    c.add_argument('--url', default=None, help="Triton host:port as seen from the agents")
+    c.add_argument('--endpoints', default=None,
+                   help="comma-separated Triton host:port list to balance over, as seen from the agents")
+    c.add_argument('--lb', choices=POLICIES, default='round-robin',
+                   help="client-side load balancing policy across --endpoints (default: round-robin)")
+    c.add_argument('--model', default=MODEL_NAME, help=f"Triton model name (default: {MODEL_NAME})")
+    c.add_argument('--imgsz', type=int, default=640, help="input resolution of the model (default: 640)")
+    c.add_argument('--timeout', type=float, default=60.0, help="per-request timeout in seconds (default: 60)")
+    c.add_argument('--port', type=int, default=COORDINATOR_PORT,
+                   help=f"coordinator port (default: {COORDINATOR_PORT})")
+
+    a = roles.add_parser('agent', help="generate the load assigned by a coordinator")
+    a.add_argument('--coordinator', required=True, help="coordinator host:port")
+    a.add_argument('--id', default=None, help="agent name (default: hostname-pid)")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.role == 'agent':
+        run_agent(args)
+        sys.exit(0)
+
+    results = run_coordinator(args)
+    if results:
+        print_results(results)
+        save_results(results)
+        print(f"\n{'='*70}\n")
+        sys.exit(0 if results['complete'] else 1)
+    print(f"\nBenchmark failed\n")
+    sys.exit(1)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Mergeable Latency Histogram
+Log-bucketed latency histogram (~1% relative error) that load-generator
+processes fill independently and the parent merges, so percentiles over
+millions of requests need neither every sample nor one shared structure
+
+Buckets are sparse {index: count}; bucket i covers
+[MIN_MS * GROWTH^i, MIN_MS * GROWTH^(i+1)). Exact count/sum/min/max are kept
+alongside, so the mean, min and max are not approximated.
+"""
+
+import math
+
+MIN_MS = 0.01
+GROWTH = 1.02  # bucket width: reported percentiles are within ~1% of the true value
+_LOG_GROWTH = math.log(GROWTH)
+
+class Histogram:
+    """Sparse log-bucket latency histogram in milliseconds"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, ms):
+        index = int(math.log(max(ms, MIN_MS) / MIN_MS) / _LOG_GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.min = ms if self.min is None else min(self.min, ms)
+        self.max = ms if self.max is None else max(self.max, ms)
+
+    def merge(self, other):
+        """Add another histogram's counts into this one; returns self"""
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, p):
+        """Value at percentile p (0-100): geometric midpoint of its bucket, clamped to [min, max]"""
+        if not self.count:
+            return None
+        rank = min(self.count - 1, int(self.count * p / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                value = MIN_MS * GROWTH ** (index + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def summary(self):
+        """Same keys as the benchmark clients' latency_ms block"""
+        if not self.count:
+            return {}
+        return {
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean(),
+            'median': self.percentile(50),
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'p999': self.percentile(99.9),
+        }
+
+    def to_dict(self):
+        return {
+            'min_ms': MIN_MS,
+            'growth': GROWTH,
+            'buckets': {str(k): v for k, v in sorted(self.buckets.items())},
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('min_ms', MIN_MS) != MIN_MS or data.get('growth', GROWTH) != GROWTH:
+            raise ValueError("Histogram bucket layout differs; cannot merge")
+        h = cls()
+        h.buckets = {int(k): v for k, v in data['buckets'].items()}
+        h.count = data['count']
+        h.total = data['sum']
+        h.min = data['min']
+        h.max = data['max']
+        return h
+
+def merge_all(histograms):
+    merged = Histogram()
+    for h in histograms:
+        merged.merge(h)
+    return merged
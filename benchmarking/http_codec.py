@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+HTTP Request/Response Codec
+How the HTTP benchmark clients encode inputs and decode outputs, with the
+encode, body-read and parse phases of every request timed on their own
+
+Output formats (--output-format):
+  discard  JSON request, response read and dropped (the original behaviour)
+  json     JSON request, response parsed with json.loads into a numpy array,
+           what a plain client does with the 84x8400 float list
+  binary   Triton binary tensor extension both ways: the input is copied into a
+           per-thread preallocated buffer and sent without JSON encoding, the
+           output is read with readinto() into a per-thread reused buffer and
+           exposed with np.frombuffer (no copy, no per-request allocation)
+
+In binary mode the returned array is a view of the thread's response buffer
+and is overwritten by that thread's next request: use it before then.
+"""
+
+import io
+import json
+import socket
+import threading
+import http.client
+from contextlib import contextmanager
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request
+
+import numpy as np
+
+from latency_analysis import summary
+from request_policy import with_server_timeout
+
+FORMATS = ('discard', 'json', 'binary')
+
+# Triton binary tensor extension header
+HEADER_LENGTH = 'Inference-Header-Content-Length'
+
+DTYPES = {'FP32': np.float32, 'FP16': np.float16, 'INT32': np.int32, 'INT64': np.int64, 'UINT8': np.uint8}
+
+class PhaseTimes:
+    """Thread-safe per-request durations (ms) of named client phases"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases = {}
+
+    def add(self, name, ms):
+        with self._lock:
+            self.phases.setdefault(name, []).append(ms)
+
+    def summary(self):
+        with self._lock:
+            phases = {k: list(v) for k, v in self.phases.items()}
+        return {name: summary(x) for name, x in phases.items()}
+
+class _Buffers(threading.local):
+    """Per-thread pinned input and reusable response buffers"""
+
+    def __init__(self):
+        self.input = None
+        self.response = bytearray()
+
+class HttpCodec:
+    """Builds inference requests and decodes responses for one output format"""
+
+    def __init__(self, output_format='discard', input_name='images', output_name='output0', outputs=None):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format: {output_format} (use one of {', '.join(FORMATS)})")
+        self.format = output_format
+        self.input_name = input_name
+        self.output_name = output_name
+        # Outputs requested as binary tensors (parse() returns output_name, parse_all() all of them)
+        self.outputs = tuple(outputs or (output_name,))
+        self.phases = PhaseTimes()
+        self._buffers = _Buffers()
+
+    @property
+    def binary(self):
+        return self.format == 'binary'
+
+    def encode(self, input_data):
+        """Request payload for one input tensor (binary: copied into this thread's input buffer)"""
+        if not self.binary:
+            return json.dumps({
+                "inputs": [{
+                    "name": self.input_name,
+                    "shape": list(input_data.shape),
+                    "datatype": "FP32",
+                    "data": input_data.flatten().tolist()
+                }]
+            }).encode('utf-8')
+        buffers = self._buffers
+        if buffers.input is None or buffers.input.shape != input_data.shape:
+            buffers.input = np.empty(input_data.shape, dtype=np.float32)
+        np.copyto(buffers.input, input_data, casting='same_kind')
+        return buffers.input
+
+    def request(self, url, payload, timeout_sec=None):
+        """urllib Request for an encoded payload; timeout_sec is sent as Triton's request timeout"""
+        req = Request(url)
+        if not self.binary:
+            req.add_header('Content-Type', 'application/json')
+            req.data = with_server_timeout(payload, timeout_sec) if timeout_sec else payload
+            return req
+
+        header = {
+            "inputs": [{
+                "name": self.input_name,
+                "shape": list(payload.shape),
+                "datatype": "FP32",
+                "parameters": {"binary_data_size": payload.nbytes}
+            }],
+            "outputs": [{"name": name, "parameters": {"binary_data": True}} for name in self.outputs]
+        }
+        if timeout_sec:
+            header["parameters"] = {"timeout": max(1, int(timeout_sec * 1e6))}
+        header = json.dumps(header).encode('utf-8')
+        # Sent as two chunks: the JSON header and a view of the input buffer (no concatenation copy)
+        req.data = [header, memoryview(payload).cast('B')]
+        req.add_header('Content-Type', 'application/octet-stream')
+        req.add_header('Content-Length', str(len(header) + payload.nbytes))
+        req.add_header(HEADER_LENGTH, str(len(header)))
+        return req
+
+    def read(self, response, reuse=True):
+        """Response body and its JSON header length
+
+        Binary bodies are read into this thread's reused buffer; reuse=False
+        reads into a fresh one (for attempts on a shared pool thread, whose
+        buffer another request could overwrite before the caller parses it).
+        """
+        if not self.binary:
+            return response.read(), None
+        length = response.headers.get('Content-Length')
+        if length is None:
+            data = response.read()
+            length = len(data)
+            buffer = self._reserve(length, reuse)
+            buffer[:length] = data
+        else:
+            length = int(length)
+            buffer = self._reserve(length, reuse)
+            view = memoryview(buffer)
+            got = 0
+            while got < length:
+                n = response.readinto(view[got:length])
+                if not n:
+                    raise ConnectionError(f"response ended after {got} of {length} bytes")
+                got += n
+        header_length = int(response.headers.get(HEADER_LENGTH, length))
+        return memoryview(buffer)[:length], header_length
+
+    def _reserve(self, length, reuse=True):
+        if not reuse:
+            return bytearray(length)
+        buffers = self._buffers
+        if len(buffers.response) < length:
+            # Grow once to the largest response seen; later requests reuse it
+            buffers.response = bytearray(length)
+        return buffers.response
+
+    def parse(self, body):
+        """Output tensor of a read() result (None in discard mode)"""
+        if self.format == 'discard':
+            return None
+        outputs = self.parse_all(body)
+        if self.output_name not in outputs:
+            raise KeyError(f"{self.output_name} not in response")
+        return outputs[self.output_name]
+
+    def parse_all(self, body):
+        """{name: array} for every output of a read() result (binary outputs are views of the body)"""
+        data, header_length = body
+        if not self.binary or header_length == len(data):
+            outputs = json.loads(bytes(data) if isinstance(data, memoryview) else data)['outputs']
+            return {o['name']: np.asarray(o['data'], dtype=DTYPES[o['datatype']]).reshape(o['shape'])
+                    for o in outputs}
+        header = json.loads(bytes(data[:header_length]))
+        offset = header_length
+        arrays = {}
+        for output in header['outputs']:
+            dtype = np.dtype(DTYPES[output['datatype']])
+            size = output.get('parameters', {}).get('binary_data_size', 0)
+            arrays[output['name']] = np.frombuffer(data, dtype=dtype, count=size // dtype.itemsize,
+                                                   offset=offset).reshape(output['shape'])
+            offset += size
+        return arrays
+
+    def describe(self):
+        return {'output_format': self.format, 'phases_ms': self.phases.summary()}
+
+@contextmanager
+def open_request(req, timeout, cancel=None):
+    """urlopen() for a Request on its own http.client connection
+
+    cancel (a request_policy.CancelToken) gets a hook that shuts the socket
+    down, which aborts a blocked send or read of a losing hedged attempt.
+    Error statuses raise HTTPError like urlopen().
+    """
+    url = urlsplit(req.full_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    try:
+        conn.connect()
+        if cancel is not None:
+            sock = conn.sock
+            cancel.on_cancel(lambda: sock.shutdown(socket.SHUT_RDWR))
+        path = url.path + (f"?{url.query}" if url.query else '')
+        conn.request(req.get_method(), path, body=req.data, headers=dict(req.header_items()))
+        response = conn.getresponse()
+        if response.status >= 400:
+            raise HTTPError(req.full_url, response.status, response.reason, response.headers,
+                            io.BytesIO(response.read()))
+        yield response
+    finally:
+        conn.close()
+
+def request_bytes(req):
+    """Body bytes of a request built by HttpCodec.request()"""
+    data = req.data
+    return sum(len(chunk) for chunk in data) if isinstance(data, list) else len(data)
+
+def print_phases(codec_report):
+    """Print client read/parse phase times (no-op when absent)"""
+    if not codec_report or not codec_report.get('phases_ms'):
+        return
+    print(f"Client Phases ({codec_report['output_format']} output):")
+    for name, p in codec_report['phases_ms'].items():
+        print(f"  {name:<6} mean {p['mean']:7.3f} ms   p50 {p['p50']:7.3f} ms   p99 {p['p99']:7.3f} ms")
+    print()
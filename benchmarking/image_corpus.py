@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Image Corpus Replay for YOLO Benchmarks
+Replays a directory of real JPEGs instead of random noise tensors
+
+Random noise produces almost no detections, so NMS cost, response size and
+decode cost are unrealistically low. The corpus is decoded once into a
+memory-mapped cache (letterboxed to imgsz x imgsz RGB) that every client
+thread and process shares, and replayed in deterministic or shuffled order.
+
+Usage:
+  python3 image_corpus.py <corpus_dir> [imgsz]
+
+  Builds (or validates) the pre-decoded cache and prints corpus statistics.
+"""
+
+import sys
+import json
+import base64
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from latency_analysis import summary
+
+try:
+    from nms import decode  # copied next to the benchmark scripts in the pods
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'docker' / 'base-yolo'))
+    from nms import decode
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+CACHE_DIR_NAME = '.corpus_cache'
+
+# Detection-count buckets used for the latency breakdown: (label, low, high)
+DETECTION_BUCKETS = [
+    ('0', 0, 0),
+    ('1-4', 1, 4),
+    ('5-9', 5, 9),
+    ('10-19', 10, 19),
+    ('20+', 20, None),
+]
+
+def _decode_image(path):
+    """Decode an image file to an RGB uint8 HWC array (cv2, falling back to PIL)"""
+    try:
+        import cv2
+        img = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError(f"Could not decode {path}")
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    except ImportError:
+        pass
+
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Corpus decoding requires opencv-python or pillow")
+
+    with Image.open(path) as im:
+        return np.asarray(im.convert('RGB'))
+
+def letterbox(img, imgsz=640, pad_value=114):
+    """Resize keeping aspect ratio and pad to imgsz x imgsz (Ultralytics style)"""
+    h, w = img.shape[:2]
+    scale = min(imgsz / h, imgsz / w)
+    new_h, new_w = int(round(h * scale)), int(round(w * scale))
+
+    if (new_h, new_w) != (h, w):
+        try:
+            import cv2
+            img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        except ImportError:
+            from PIL import Image
+            img = np.asarray(Image.fromarray(img).resize((new_w, new_h), Image.BILINEAR))
+
+    out = np.full((imgsz, imgsz, 3), pad_value, dtype=np.uint8)
+    top = (imgsz - new_h) // 2
+    left = (imgsz - new_w) // 2
+    out[top:top + new_h, left:left + new_w] = img
+    return out
+
+class ImageCorpus:
+    """Pre-decoded, memory-mapped image corpus with a shared replay cursor"""
+
+    def __init__(self, corpus_dir, imgsz=640, order='sequential', seed=0):
+        if order not in ('sequential', 'shuffle'):
+            raise ValueError(f"Unknown corpus order: {order} (use 'sequential' or 'shuffle')")
+
+        self.corpus_dir = Path(corpus_dir)
+        self.imgsz = imgsz
+        self.order = order
+        self.seed = seed
+
+        self.files = []
+        self.frames = None
+        self._jpeg_b64 = {}
+        self._cursor = 0
+        self._permutation = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.files)
+
+    def _cache_paths(self):
+        cache_dir = self.corpus_dir / CACHE_DIR_NAME
+        return (cache_dir / f"frames_{self.imgsz}.npy",
+                cache_dir / f"index_{self.imgsz}.json")
+
+    def _signature(self):
+        """Names, sizes and mtimes of the source files (cache invalidation key)"""
+        return [[p.name, p.stat().st_size, int(p.stat().st_mtime)] for p in self.files]
+
+    def load(self):
+        """Open the pre-decoded cache, building it first if missing or stale"""
+        if not self.corpus_dir.is_dir():
+            raise FileNotFoundError(f"Corpus directory not found: {self.corpus_dir}")
+
+        self.files = sorted(p for p in self.corpus_dir.iterdir()
+                            if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+        if not self.files:
+            raise FileNotFoundError(f"No images found in {self.corpus_dir}")
+
+        frames_path, index_path = self._cache_paths()
+        signature = self._signature()
+
+        stale = True
+        if frames_path.exists() and index_path.exists():
+            try:
+                with open(index_path) as f:
+                    stale = json.load(f).get('files') != signature
+            except (OSError, ValueError):
+                stale = True
+
+        if stale:
+            self._build_cache(frames_path, index_path, signature)
+
+        self.frames = np.load(frames_path, mmap_mode='r')
+        self._permutation = self._epoch_permutation(0)
+        return self
+
+    def _build_cache(self, frames_path, index_path, signature):
+        """Decode every image once into a .npy file that is memory-mapped afterwards"""
+        frames_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = frames_path.with_suffix('.tmp.npy')
+
+        shape = (len(self.files), self.imgsz, self.imgsz, 3)
+        frames = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=shape)
+        for i, path in enumerate(self.files):
+            frames[i] = letterbox(_decode_image(path), self.imgsz)
+        frames.flush()
+        del frames
+
+        tmp_path.replace(frames_path)
+        with open(index_path, 'w') as f:
+            json.dump({'imgsz': self.imgsz, 'files': signature}, f)
+
+    def _epoch_permutation(self, epoch):
+        if self.order == 'sequential':
+            return None
+        return np.random.default_rng(self.seed + epoch).permutation(len(self.files))
+
+    def next_index(self):
+        """Next corpus index; the cursor is shared by every thread using this corpus"""
+        with self._lock:
+            position = self._cursor
+            self._cursor += 1
+            epoch, offset = divmod(position, len(self.files))
+            if self.order == 'sequential':
+                return offset
+            if offset == 0 and epoch > 0:
+                self._permutation = self._epoch_permutation(epoch)
+            return int(self._permutation[offset])
+
+    def frame(self, index):
+        """Letterboxed RGB uint8 HWC frame (read-only view into the cache)"""
+        return self.frames[index]
+
+    def nchw_float32(self, index):
+        """Frame as the (1, 3, imgsz, imgsz) float32 [0, 1] tensor Triton expects"""
+        chw = np.ascontiguousarray(self.frames[index].transpose(2, 0, 1))
+        return (chw.astype(np.float32) * (1.0 / 255.0))[np.newaxis]
+
+    def jpeg_b64(self, index):
+        """Original file bytes, base64-encoded for the base-yolo /infer endpoint"""
+        encoded = self._jpeg_b64.get(index)
+        if encoded is None:
+            encoded = base64.b64encode(self.files[index].read_bytes()).decode('ascii')
+            self._jpeg_b64[index] = encoded
+        return encoded
+
+    def describe(self):
+        return {
+            'dir': str(self.corpus_dir),
+            'images': len(self.files),
+            'imgsz': self.imgsz,
+            'order': self.order,
+            'seed': self.seed,
+        }
+
+def count_detections(output0, conf_thres=0.25, iou_thres=0.45):
+    """Count detections in a raw YOLOv8 output0 tensor ([1,] 84, N) after NMS"""
+    out = np.asarray(output0, dtype=np.float32)
+    if out.ndim == 3:
+        out = out[0]
+    return len(decode(out, conf_thres, iou_thres)[1])
+
+def latency_by_detections(latencies, detection_counts):
+    """Latency statistics grouped by detection-count bucket"""
+    breakdown = {}
+    for label, low, high in DETECTION_BUCKETS:
+        bucket = [lat for lat, n in zip(latencies, detection_counts)
+                  if n is not None and n >= low and (high is None or n <= high)]
+        if not bucket:
+            continue
+        breakdown[label] = {'requests': len(bucket), **summary(bucket)}
+    return breakdown
+
+def print_detection_breakdown(breakdown):
+    """Print latency-by-detection-count table"""
+    if not breakdown:
+        return
+    print(f"Latency by detection count (ms):")
+    print(f"  {'Detections':<12} {'Requests':>8} {'Mean':>9} {'P50':>9} {'P95':>9} {'P99':>9}")
+    for label, stats in breakdown.items():
+        print(f"  {label:<12} {stats['requests']:>8} {stats['mean']:>9.2f} "
+              f"{stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['p99']:>9.2f}")
+    print()
+
+def load_corpus(corpus_dir, imgsz=640, order='sequential', seed=0):
+    """Load a corpus and print a one-line summary"""
+    print(f"Loading image corpus from {corpus_dir}...")
+    corpus = ImageCorpus(corpus_dir, imgsz=imgsz, order=order, seed=seed).load()
+    print(f"✓ Corpus ready: {len(corpus)} images ({order} order, cache {corpus.imgsz}px)\n")
+    return corpus
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    imgsz = int(sys.argv[2]) if len(sys.argv) > 2 else 640
+    corpus = load_corpus(sys.argv[1], imgsz=imgsz)
+    print(json.dumps(corpus.describe(), indent=2))
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Latency Time-Series Analysis
+Per-request timestamps for the benchmark clients, automatic steady-state
+detection (MSER-5) and rolling-percentile plots of latency over a run
+
+The clients keep every request (warmup included) as (start offset, latency)
+under results['samples']; analyze() finds where the run settles, so warmup
+effects (CUDA graph capture, TensorRT lazy init, cold caches) are trimmed from
+the statistics instead of relying on a fixed warmup count.
+
+Usage:
+  python3 latency_analysis.py <results.json|results.jsonl> [--plot out.png] [--window N]
+
+  Prints steady-state statistics for every result that has samples and, with
+  --plot, draws latency over time with rolling p50/p95/p99.
+"""
+
+import time
+import json
+import argparse
+import threading
+from pathlib import Path
+
+import numpy as np
+
+# MSER batch size; the truncation point is searched over the first half of the run
+MSER_BATCH = 5
+
+class SampleRecorder:
+    """Thread-safe per-request (start, latency, ok, phase) log for one run"""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.t0_unix = time.time()
+        self._lock = threading.Lock()
+        self._samples = []
+
+    def record(self, start, end, ok=True, warmup=False):
+        """Record one request from perf_counter() start/end"""
+        with self._lock:
+            self._samples.append((start - self.t0, (end - start) * 1000.0, ok, warmup))
+
+    def __len__(self):
+        return len(self._samples)
+
+    def to_dict(self):
+        """Columnar samples ordered by request start time"""
+        with self._lock:
+            samples = sorted(self._samples)
+        return {
+            't0_unix': self.t0_unix,
+            'start_s': [round(s[0], 6) for s in samples],
+            'latency_ms': [round(s[1], 3) for s in samples],
+            'ok': [s[2] for s in samples],
+            'warmup': [s[3] for s in samples],
+        }
+
+def mser(latencies, batch=MSER_BATCH):
+    """MSER-b truncation point: index where the remaining run has the most stable mean
+
+    Batch means b_1..b_m; for each candidate d (first half only) the statistic is
+    SSE(b_d..b_m) / (m - d)^2, and the d that minimizes it marks the end of warmup.
+    """
+    x = np.asarray(latencies, dtype=np.float64)
+    m = len(x) // batch
+    if m < 4:
+        return 0
+    b = x[:m * batch].reshape(m, batch).mean(axis=1)
+
+    # Suffix sums give SSE of every tail in O(m)
+    s1 = np.cumsum(b[::-1])[::-1]
+    s2 = np.cumsum((b * b)[::-1])[::-1]
+    n = np.arange(m, 0, -1, dtype=np.float64)
+    stat = (s2 - s1 * s1 / n) / (n * n)
+    d = int(np.argmin(stat[:m // 2]))
+    return d * batch
+
+def summary(latencies):
+    """min/mean/percentile summary (same keys as the benchmark latency_ms dict)"""
+    x = np.sort(np.asarray(latencies, dtype=np.float64))
+    if x.size == 0:
+        return {}
+    return {
+        'min': float(x[0]),
+        'max': float(x[-1]),
+        'mean': float(x.mean()),
+        'median': float(x[x.size // 2]),
+        'p50': float(x[int(x.size * 0.50)]),
+        'p90': float(x[int(x.size * 0.90)]),
+        'p95': float(x[int(x.size * 0.95)]),
+        'p99': float(x[int(x.size * 0.99)]),
+    }
+
+def analyze(samples):
+    """Steady-state detection over successful requests (warmup included), trimmed statistics"""
+    ok = np.asarray(samples['ok'], dtype=bool)
+    latencies = np.asarray(samples['latency_ms'], dtype=np.float64)[ok]
+    starts = np.asarray(samples['start_s'], dtype=np.float64)[ok]
+    fixed_warmup = int(np.asarray(samples['warmup'], dtype=bool)[ok].sum())
+    if latencies.size == 0:
+        return None
+
+    index = mser(latencies)
+    steady = latencies[index:]
+    return {
+        'method': f'mser{MSER_BATCH}',
+        'requests': int(latencies.size),
+        'steady_state_index': index,
+        'steady_state_start_s': float(starts[index]) if index < starts.size else None,
+        'fixed_warmup_requests': fixed_warmup,
+        # Positive: the fixed warmup was too short by this many requests
+        'warmup_shortfall': max(0, index - fixed_warmup),
+        'warmup_mean_ms': float(latencies[:index].mean()) if index else None,
+        'latency_ms': summary(steady),
+    }
+
+def rolling_percentiles(latencies, window=None, percentiles=(50, 95, 99)):
+    """(request index, {p: values}) over a sliding window, sampled at ~window/10 steps"""
+    x = np.asarray(latencies, dtype=np.float64)
+    if window is None:
+        window = max(10, x.size // 20)
+    window = min(window, x.size)
+    if window == 0:
+        return np.array([]), {p: np.array([]) for p in percentiles}
+    step = max(1, window // 10)
+    windows = np.lib.stride_tricks.sliding_window_view(x, window)[::step]
+    index = np.arange(windows.shape[0]) * step + window - 1
+    values = np.percentile(windows, percentiles, axis=1)
+    return index, dict(zip(percentiles, values))
+
+def print_analysis(analysis):
+    """Print the steady-state summary"""
+    if not analysis:
+        return
+    lat = analysis['latency_ms']
+    print(f"Steady-state analysis ({analysis['method']}):")
+    print(f"  Steady from request: {analysis['steady_state_index']} of {analysis['requests']}"
+          f" (fixed warmup was {analysis['fixed_warmup_requests']})")
+    if analysis['warmup_mean_ms'] is not None:
+        print(f"  Warmup mean:         {analysis['warmup_mean_ms']:7.2f} ms")
+    if analysis['warmup_shortfall']:
+        print(f"  ⚠ Fixed warmup too short by {analysis['warmup_shortfall']} requests")
+    print(f"  Steady mean:         {lat['mean']:7.2f} ms")
+    print(f"  Steady P95:          {lat['p95']:7.2f} ms")
+    print(f"  Steady P99:          {lat['p99']:7.2f} ms")
+    print()
+
+def attach(results, recorder):
+    """Add samples and the steady-state analysis to a results dict"""
+    if not results or not len(recorder):
+        return results
+    results['samples'] = recorder.to_dict()
+    results['steady_state'] = analyze(results['samples'])
+    return results
+
+def plot_run(samples, analysis, path, title='Latency over time', window=None):
+    """Scatter of every request plus rolling percentiles and the detected steady-state start"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    ok = np.asarray(samples['ok'], dtype=bool)
+    starts = np.asarray(samples['start_s'], dtype=np.float64)[ok]
+    latencies = np.asarray(samples['latency_ms'], dtype=np.float64)[ok]
+    warmup = np.asarray(samples['warmup'], dtype=bool)[ok]
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.scatter(starts[~warmup], latencies[~warmup], s=6, alpha=0.35, color='#45B7D1', label='request')
+    ax.scatter(starts[warmup], latencies[warmup], s=6, alpha=0.6, color='#FF6B6B', label='fixed warmup request')
+
+    index, rolling = rolling_percentiles(latencies, window)
+    for (p, values), color in zip(rolling.items(), ('#2d3436', '#e17055', '#d63031')):
+        ax.plot(starts[index], values, color=color, linewidth=2, label=f'rolling p{p}')
+
+    if analysis and analysis['steady_state_start_s'] is not None:
+        ax.axvline(analysis['steady_state_start_s'], color='green', linestyle='--',
+                   label=f"steady state (request {analysis['steady_state_index']})")
+
+    ax.set_xlabel('Time since start (s)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=9, loc='upper right')
+    plt.tight_layout()
+    fig.savefig(path, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+def load_runs(path):
+    """(label, samples) for every result with samples in a results JSON or JSONL store"""
+    path = Path(path)
+    if path.suffix == '.jsonl':
+        with open(path) as f:
+            results = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path) as f:
+            data = json.load(f)
+        results = data if isinstance(data, list) else [data]
+
+    runs = []
+    for r in results:
+        extra = r.get('extra', {})
+        samples = r.get('samples') or extra.get('samples')
+        if samples:
+            label = f"{r.get('deployment', 'run')} {r.get('protocol', '')} c={r.get('concurrency', 1)}".strip()
+            runs.append((label, samples))
+    return runs
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Steady-state and latency-over-time analysis")
+    parser.add_argument('results', help='Results JSON (in-pod or all_results_*) or results.jsonl store')
+    parser.add_argument('--plot', default=None, help='PNG path (one file per run, suffixed when several)')
+    parser.add_argument('--window', type=int, default=None, help='Rolling window in requests (default: 5%% of run)')
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+    runs = load_runs(args.results)
+    if not runs:
+        print(f"No per-request samples in {args.results}")
+        raise SystemExit(1)
+
+    for i, (label, samples) in enumerate(runs):
+        print(f"{'='*70}\n{label}\n{'='*70}")
+        analysis = analyze(samples)
+        print_analysis(analysis)
+        if args.plot:
+            out = Path(args.plot)
+            if len(runs) > 1:
+                out = out.with_name(f"{out.stem}_{i:02d}{out.suffix}")
+            plot_run(samples, analysis, out, title=f"Latency over time: {label}", window=args.window)
+            print(f"✓ Plot saved: {out}\n")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Client-Side Load Balancer
+Spreads benchmark requests over several Triton endpoints (replicas or
+deployments) and reports per-endpoint latency and load distribution
+
+Policies:
+  round-robin        endpoints in turn
+  least-outstanding  endpoint with the fewest in-flight requests
+  p2c                power of two choices: two random endpoints, the less loaded
+                     wins (ties go to the lower latency EWMA)
+
+A failed attempt counts as an error-penalty sample (the request deadline) in
+the endpoint's EWMA, and ejects the endpoint for a backoff that doubles with
+each consecutive failure; ejected endpoints are only picked when every
+endpoint is ejected. Otherwise an endpoint that fails fast looks idle and
+quick, and least-outstanding/p2c would send it most of the load.
+
+Compare a run against the Kubernetes LoadBalancer/Service address (one
+endpoint) with one against the pod IPs behind it (--endpoints, --lb) to see
+whether client routing beats the service on tail latency.
+"""
+
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+from latency_analysis import summary
+
+POLICIES = ('round-robin', 'least-outstanding', 'p2c')
+
+# Weight of the newest sample in the per-endpoint latency EWMA
+EWMA_ALPHA = 0.2
+
+# EWMA sample for a failed attempt (pass the request deadline where known)
+ERROR_PENALTY_MS = 1000.0
+
+# Ejection after a failure: base backoff, doubled per consecutive failure up to the cap
+EJECT_BASE_SEC = 0.5
+EJECT_MAX_SEC = 30.0
+
+def parse_endpoints(spec, default=None):
+    """'host:port,host:port' -> list of endpoints (default when empty)"""
+    endpoints = [e.strip() for e in (spec or '').split(',') if e.strip()]
+    return endpoints or ([default] if default else [])
+
+class Endpoint:
+    """One target address and what the balancer has seen of it"""
+
+    def __init__(self, address):
+        self.address = address
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.latencies = []
+        self.ewma_ms = None
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+class LoadBalancer:
+    """Thread-safe endpoint picker; use `with lb.pick() as endpoint:` around each attempt"""
+
+    def __init__(self, addresses, policy='round-robin', seed=None, error_penalty_ms=ERROR_PENALTY_MS):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown load balancing policy: {policy} (use one of {', '.join(POLICIES)})")
+        if not addresses:
+            raise ValueError("No endpoints to balance over")
+        self.policy = policy
+        self.error_penalty_ms = error_penalty_ms
+        self.endpoints = [Endpoint(a) for a in addresses]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def __len__(self):
+        return len(self.endpoints)
+
+    @property
+    def addresses(self):
+        return [e.address for e in self.endpoints]
+
+    def _choose(self):
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        now = time.perf_counter()
+        candidates = [e for e in self.endpoints if e.ejected_until <= now] or self.endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.policy == 'round-robin':
+            endpoint = candidates[self._next % len(candidates)]
+            self._next += 1
+            return endpoint
+        if self.policy == 'least-outstanding':
+            # Rotate the start so ties do not all land on the first endpoint
+            start = self._next % len(candidates)
+            self._next += 1
+            ordered = candidates[start:] + candidates[:start]
+            return min(ordered, key=lambda e: e.outstanding)
+        a, b = self._rng.sample(candidates, 2)
+        if a.outstanding != b.outstanding:
+            return a if a.outstanding < b.outstanding else b
+        # An endpoint without samples yet counts as average, not as instant
+        known = [e.ewma_ms for e in self.endpoints if e.ewma_ms is not None]
+        neutral = sum(known) / len(known) if known else 0.0
+        ewma_a = neutral if a.ewma_ms is None else a.ewma_ms
+        ewma_b = neutral if b.ewma_ms is None else b.ewma_ms
+        return a if ewma_a <= ewma_b else b
+
+    def acquire(self):
+        with self._lock:
+            endpoint = self._choose()
+            endpoint.outstanding += 1
+            endpoint.max_outstanding = max(endpoint.max_outstanding, endpoint.outstanding)
+            return endpoint
+
+    def release(self, endpoint, latency_ms, ok=True):
+        """ok=None: the attempt was cancelled (a losing hedge) - not an error, but at least this slow"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            if ok is None:
+                sample = latency_ms
+            elif ok:
+                endpoint.latencies.append(latency_ms)
+                endpoint.consecutive_errors = 0
+                sample = latency_ms
+            else:
+                endpoint.errors += 1
+                endpoint.consecutive_errors += 1
+                backoff = min(EJECT_MAX_SEC, EJECT_BASE_SEC * 2 ** (endpoint.consecutive_errors - 1))
+                endpoint.ejected_until = time.perf_counter() + backoff
+                endpoint.ejections += 1
+                sample = max(latency_ms, self.error_penalty_ms)
+            if endpoint.ewma_ms is None:
+                endpoint.ewma_ms = sample
+            else:
+                endpoint.ewma_ms += EWMA_ALPHA * (sample - endpoint.ewma_ms)
+
+    @contextmanager
+    def pick(self, cancel=None):
+        """Yield an endpoint address; its latency and outcome are recorded on exit"""
+        endpoint = self.acquire()
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield endpoint.address
+            ok = True
+        except Exception:
+            if cancel is not None and cancel.cancelled:
+                ok = None
+            raise
+        finally:
+            self.release(endpoint, (time.perf_counter() - start) * 1000.0, ok)
+
+    def report(self):
+        """Per-endpoint share, errors and latency for results['load_balancer']"""
+        with self._lock:
+            total = sum(e.requests for e in self.endpoints) or 1
+            endpoints = [{
+                'endpoint': e.address,
+                'requests': e.requests,
+                'share_pct': e.requests / total * 100,
+                'errors': e.errors,
+                'ejections': e.ejections,
+                'max_outstanding': e.max_outstanding,
+                'latency_ms': summary(e.latencies),
+            } for e in self.endpoints]
+        shares = [e['requests'] for e in endpoints]
+        return {
+            'policy': self.policy,
+            'endpoints': endpoints,
+            # Busiest endpoint's load relative to a perfectly even split
+            'imbalance': max(shares) / (total / len(shares)) if total else 0.0,
+        }
+
+def print_distribution(report):
+    """Print the per-endpoint table of a results dict (no-op for a single endpoint)"""
+    if not report or len(report['endpoints']) < 2:
+        return
+    print(f"Load Balancing ({report['policy']}, imbalance {report['imbalance']:.2f}x):")
+    print(f"  {'Endpoint':<28} {'Requests':>8} {'Share':>7} {'Errors':>6} {'Eject':>5} {'MaxOut':>6} "
+          f"{'Mean':>8} {'P95':>8} {'P99':>8}")
+    for e in report['endpoints']:
+        lat = e['latency_ms']
+        cols = ' '.join(f"{lat[k]:8.2f}" if k in lat else f"{'-':>8}" for k in ('mean', 'p95', 'p99'))
+        print(f"  {e['endpoint']:<28} {e['requests']:>8} {e['share_pct']:6.1f}% {e['errors']:>6} {e['ejections']:>5} "
+              f"{e['max_outstanding']:>6} {cols}")
+    print()
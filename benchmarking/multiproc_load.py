@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Multi-Process Load Generator
+Drives Triton from several client processes, each with its own asyncio event
+loop, so request encoding and response parsing are not serialized on one GIL
+
+The threaded clients in benchmark_internal_universal.py run every request on
+a Python thread of one process; at concurrency 32 that process can saturate a
+core before the GPU does. Here the concurrency (and, with --rate, the target
+request rate) is sharded across --processes workers. Every worker keeps its own
+mergeable latency histogram; the parent merges them and reports each process's
+CPU utilization, so a run where the client itself was the bottleneck is flagged.
+
+Usage:
+  python3 multiproc_load.py [iterations] [protocol] [concurrency] [options]
+
+  iterations: total number of requests across all processes (default: 1000)
+  protocol: 'http' or 'grpc' (default: http)
+  concurrency: total in-flight requests across all processes (default: 32)
+
+Options:
+  --processes N      worker processes (default: one per available CPU, at most concurrency)
+  --rate R           open-loop target rate in requests/s across all processes (default: closed loop)
+  --url HOST:PORT    Triton endpoint (default: local HTTP/gRPC port)
+  --endpoints H:P,H:P  spread the load over several Triton endpoints (replicas/deployments)
+  --lb POLICY        'round-robin' (default), 'least-outstanding' or 'p2c'
+  --model NAME       Triton model to benchmark (default: yolov8s)
+  --imgsz N          model input resolution (default: 640)
+  --timeout SEC      per-request timeout (default: 60)
+
+In open-loop mode latency is measured from each request's scheduled send time,
+so queueing inside the client (coordinated omission) is counted, not hidden.
+
+With --endpoints every process balances its own requests with a
+load_balancer.LoadBalancer; the per-endpoint distributions are merged.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing as mp
+from queue import Empty
+from threading import BrokenBarrierError
+
+import numpy as np
+
+from histogram import Histogram, merge_all
+from load_balancer import LoadBalancer, POLICIES, parse_endpoints
+from benchmark_internal_universal import (http_request_body, print_results, save_results,
+                                          TRITON_HTTP_URL, TRITON_GRPC_URL, MODEL_NAME, MODEL_VERSION)
+
+WARMUP_PER_CONNECTION = 2
+BARRIER_TIMEOUT_SEC = 300
+REPORT_INTERVAL_SEC = 1.0
+# How often the parent checks that workers without a report are still alive
+COLLECT_POLL_SEC = 1.0
+
+# A worker process above this CPU utilization (% of one core) was likely the bottleneck
+SATURATED_PCT = 90
+
+def available_cpus():
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+
+def shard(total, parts):
+    """Split total into `parts` integers that differ by at most one"""
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (Triton's JSON API needs only POST)"""
+
+    def __init__(self, address):
+        host, _, port = address.rpartition(':')
+        self.host = host or address
+        self.port = int(port) if port.isdigit() else 80
+        self.reader = None
+        self.writer = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def post(self, path, body, timeout):
+        try:
+            return await asyncio.wait_for(self._post(path, body), timeout)
+        except BaseException:
+            # Response state unknown: never reuse the connection
+            self.close()
+            raise
+
+    async def _post(self, path, body):
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (f"POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode('latin-1'))
+        self.writer.write(body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            self.close()
+            if reused:
+                # Idle keep-alive connection closed by the server: resend once on a new one
+                return await self._post(path, body)
+            raise ConnectionError("connection closed by server")
+        version, status = status_line.split()[:2]
+        status = int(status)
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b''.join(chunks)
+        else:
+            data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        connection = headers.get('connection', '').lower()
+        if connection == 'close' or (version == b'HTTP/1.0' and connection != 'keep-alive'):
+            self.close()
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {data[:100]!r}")
+        return data
+
+def _balanced(lb, post):
+    """send(timeout, address=None): post to `address` (warmup), else to the endpoint lb picks"""
+    async def send(timeout, address=None):
+        if address is not None:
+            return await post(address, timeout)
+        with lb.pick() as address:
+            return await post(address, timeout)
+    return send
+
+def _http_senders(lb, model_name, input_data, count):
+    body = http_request_body(input_data)
+    path = f"/v2/models/{model_name}/infer"
+    # A sender has one request in flight: one keep-alive connection per endpoint each
+    connections = [{address: HttpConnection(address) for address in lb.addresses} for _ in range(count)]
+
+    def sender(conns):
+        return _balanced(lb, lambda address, timeout: conns[address].post(path, body, timeout))
+
+    return [sender(c) for c in connections], lambda: [c.close() for conns in connections for c in conns.values()]
+
+def _grpc_senders(lb, model_name, input_data, count):
+    import tritonclient.grpc as grpcclient
+    import tritonclient.grpc.aio as grpcaio
+
+    # One channel per endpoint multiplexes all of this process's in-flight requests to it
+    clients = {address: grpcaio.InferenceServerClient(url=address, verbose=False) for address in lb.addresses}
+    inputs = [grpcclient.InferInput("images", input_data.shape, "FP32")]
+    inputs[0].set_data_from_numpy(input_data)
+    outputs = [grpcclient.InferRequestedOutput("output0")]
+
+    async def post(address, timeout):
+        return await clients[address].infer(model_name, inputs, model_version=MODEL_VERSION, outputs=outputs,
+                                            client_timeout=timeout)
+
+    async def close():
+        for client in clients.values():
+            await client.close()
+
+    return [_balanced(lb, post)] * count, close
+
+def _balancer_report(lb):
+    """lb.report() plus a mergeable latency histogram per endpoint"""
+    report = lb.report()
+    for entry, endpoint in zip(report['endpoints'], lb.endpoints):
+        histogram = Histogram()
+        for ms in endpoint.latencies:
+            histogram.record(ms)
+        entry['histogram'] = histogram.to_dict()
+    return report
+
+async def generate(config, iterations, concurrency, rate, seed=0, wait_start=None, report=None):
+    """Warm up, wait for the synchronized start, then drive this generator's share of the load
+
+    wait_start() blocks until every generator is ready to start (run off the
+    event loop); report(summary) is awaited every REPORT_INTERVAL_SEC while
+    the load runs and returns a partial summary. Returns the final summary.
+    """
+    input_data = np.random.default_rng(seed).random((1, 3, config['imgsz'], config['imgsz']), dtype=np.float32)
+    timeout = config['timeout']
+    lb = LoadBalancer(config['endpoints'], policy=config.get('lb', 'round-robin'), seed=seed,
+                      error_penalty_ms=timeout * 1000)
+    make = _grpc_senders if config['protocol'] == 'grpc' else _http_senders
+    senders, close = make(lb, config['model_name'], input_data, concurrency)
+
+    # Warm every connection (to every endpoint) before the synchronized start
+    for send in senders:
+        for address in lb.addresses:
+            for _ in range(WARMUP_PER_CONNECTION):
+                try:
+                    await send(timeout, address)
+                except Exception:
+                    pass
+
+    histogram = Histogram()
+    state = {'errors': 0, 'first_error': None}
+    pool = asyncio.Queue()
+    for send in senders:
+        pool.put_nowait(send)
+
+    async def one(intended):
+        send = await pool.get()
+        try:
+            await send(timeout)
+            histogram.record((time.perf_counter() - intended) * 1000.0)
+        except Exception as e:
+            state['errors'] += 1
+            if state['first_error'] is None:
+                state['first_error'] = f"{type(e).__name__}: {str(e)[:100]}"
+        finally:
+            pool.put_nowait(send)
+
+    if wait_start is not None:
+        await asyncio.get_running_loop().run_in_executor(None, wait_start)
+    start_unix = time.time()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    def summary():
+        wall_sec = time.perf_counter() - start
+        cpu_sec = time.process_time() - cpu_start
+        return {
+            'pid': os.getpid(),
+            'iterations': iterations,
+            'concurrency': concurrency,
+            'rate': rate,
+            'completed': histogram.count,
+            'errors': state['errors'],
+            'first_error': state['first_error'],
+            'start_unix': start_unix,
+            'end_unix': start_unix + wall_sec,
+            'wall_sec': wall_sec,
+            'cpu_sec': cpu_sec,
+            'cpu_pct': cpu_sec / wall_sec * 100 if wall_sec else 0.0,
+            'histogram': histogram.to_dict(),
+        }
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL_SEC)
+            await report(summary())
+
+    progress = asyncio.ensure_future(reporter()) if report is not None else None
+
+    if rate:
+        # Open loop: requests leave on schedule whether or not earlier ones finished
+        interval = 1.0 / rate
+        tasks = []
+        for k in range(iterations):
+            intended = start + k * interval
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(intended)))
+        await asyncio.gather(*tasks)
+    else:
+        # Closed loop: `concurrency` requests in flight at all times
+        tickets = iter(range(iterations))
+
+        async def loop():
+            for _ in tickets:
+                await one(time.perf_counter())
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+
+    final = summary()
+    if len(lb) > 1:
+        final['load_balancer'] = _balancer_report(lb)
+    if progress is not None:
+        progress.cancel()
+    result = close()
+    if asyncio.iscoroutine(result):
+        await result
+    return final
+
+def _worker(index, config, iterations, concurrency, rate, barrier, queue):
+    try:
+        result = asyncio.run(generate(config, iterations, concurrency, rate, seed=index,
+                                      wait_start=lambda: barrier.wait(BARRIER_TIMEOUT_SEC)))
+        queue.put(dict(result, process=index))
+    except Exception as e:
+        barrier.abort()
+        queue.put({'process': index, 'failed': f"{type(e).__name__}: {e}"})
+
+def collect(queue, workers):
+    """One report per worker; a worker that exits without one (killed, crashed) is reported as failed"""
+    reports = {}
+    while len(reports) < len(workers):
+        try:
+            report = queue.get(timeout=COLLECT_POLL_SEC)
+            reports[report['process']] = report
+            continue
+        except Empty:
+            pass
+        dead = [i for i, w in enumerate(workers) if i not in reports and not w.is_alive()]
+        if not dead:
+            continue
+        # A worker flushes its report before exiting: take anything still in the pipe first
+        try:
+            while True:
+                report = queue.get(timeout=0.1)
+                reports[report['process']] = report
+        except Empty:
+            pass
+        for i in dead:
+            if i not in reports:
+                reports[i] = {'process': i, 'failed': f"exited with code {workers[i].exitcode} before reporting"}
+    return list(reports.values())
+
+def run(iterations=1000, protocol='http', concurrency=32, processes=None, rate=0.0, url=None,
+        model_name=MODEL_NAME, imgsz=640, timeout=60.0, endpoints=None, lb='round-robin'):
+    """Run the sharded load test; returns a results dict in the benchmark clients' shape
+
+    endpoints ('host:port,...') spreads the load with the `lb` policy instead of sending it all to url.
+    """
+    processes = max(1, min(processes or available_cpus(), concurrency, iterations))
+    endpoints = parse_endpoints(endpoints, url or (TRITON_GRPC_URL if protocol == 'grpc' else TRITON_HTTP_URL))
+    config = {'protocol': protocol, 'endpoints': endpoints, 'lb': lb, 'model_name': model_name,
+              'imgsz': imgsz, 'timeout': timeout}
+
+    print(f"\n{'='*70}")
+    print(f"Multi-Process {protocol.upper()} Load Test (Inside Pod)")
+    print(f"{'='*70}\n")
+    print(f"Configuration:")
+    print(f"  URL: {', '.join(endpoints)}" + (f" ({lb})" if len(endpoints) > 1 else ""))
+    print(f"  Model: {model_name}")
+    print(f"  Total Requests: {iterations}")
+    print(f"  Concurrency: {concurrency} in flight across {processes} processes")
+    print(f"  Load: {f'open loop at {rate:g} req/s' if rate else 'closed loop'}\n")
+
+    iteration_shards = shard(iterations, processes)
+    concurrency_shards = shard(concurrency, processes)
+    rate_shards = [rate * n / iterations for n in iteration_shards] if rate else [0.0] * processes
+
+    barrier = mp.Barrier(processes + 1)
+    queue = mp.Queue()
+    workers = [mp.Process(target=_worker, args=(i, config, iteration_shards[i], concurrency_shards[i],
+                                                rate_shards[i], barrier, queue), daemon=True)
+               for i in range(processes)]
+    for w in workers:
+        w.start()
+
+    print(f"Warming up ({WARMUP_PER_CONNECTION} requests per connection)...")
+    synchronized = True
+    try:
+        barrier.wait(BARRIER_TIMEOUT_SEC)
+        print(f"Running ({processes} processes)...\n")
+    except BrokenBarrierError:
+        # A worker failed during warmup (it aborts the barrier) or warmup outlasted the timeout
+        synchronized = False
+        print(f"✗ Start barrier broken: a worker failed or warmup took over {BARRIER_TIMEOUT_SEC} s; "
+              f"the run is not synchronized\n")
+
+    reports = collect(queue, workers)
+    for w in workers:
+        w.join(timeout=5)
+        if w.is_alive():
+            w.terminate()
+
+    failed = [r for r in reports if 'failed' in r]
+    for r in failed:
+        print(f"✗ Worker {r['process']} failed: {r['failed']}")
+    reports = sorted((r for r in reports if 'failed' not in r), key=lambda r: r['process'])
+    results = combine(reports, available_cpus())
+    if results is None:
+        for r in reports:
+            if r['first_error']:
+                print(f"  Error (process {r['process']}): {r['first_error']}")
+        return None
+
+    results.update({'protocol': protocol, 'model': model_name, 'imgsz': imgsz, 'concurrency': concurrency,
+                    'client': 'multiprocess', 'processes': processes, 'target_rate': rate or None,
+                    'synchronized': synchronized})
+    return results
+
+def combine(reports, cpus):
+    """Merge generator summaries into the benchmark clients' results shape (None if nothing completed)
+
+    Start/end times must share one clock; cpus is the number of CPUs all
+    generators had between them.
+    """
+    histogram = merge_all(Histogram.from_dict(r['histogram']) for r in reports)
+    if not histogram.count:
+        return None
+
+    total_time = max(r['end_unix'] for r in reports) - min(r['start_unix'] for r in reports)
+    total_cpu = sum(r['cpu_sec'] for r in reports)
+    busiest = max(r['cpu_pct'] for r in reports)
+    latency = histogram.summary()
+
+    results = {
+        'mode': 'concurrent',
+        'location': 'internal',
+        'iterations': histogram.count,
+        'errors': sum(r['errors'] for r in reports),
+        'total_time_sec': total_time,
+        'latency_ms': latency,
+        'throughput_fps': histogram.count / total_time,
+        'avg_latency_fps': 1000.0 / latency['mean'],
+        'histogram': histogram.to_dict(),
+        'client_cpu': {
+            'processes': len(reports),
+            'cpus_available': cpus,
+            'cpu_sec': total_cpu,
+            # Share of all CPUs available to the client
+            'utilization_pct': total_cpu / (total_time * cpus) * 100 if total_time else 0.0,
+            'busiest_process_pct': busiest,
+            'saturated': busiest > SATURATED_PCT,
+        },
+        'per_process': [{k: v for k, v in r.items() if k not in ('histogram', 'load_balancer')} for r in reports],
+    }
+    balancing = combine_balancing(reports)
+    if balancing:
+        results['load_balancer'] = balancing
+    return results
+
+def combine_balancing(reports):
+    """Merge the generators' per-endpoint load balancer reports (None when none balanced)"""
+    balanced = [r['load_balancer'] for r in reports if r.get('load_balancer')]
+    if not balanced:
+        return None
+    endpoints = {}
+    for report in balanced:
+        for e in report['endpoints']:
+            merged = endpoints.setdefault(e['endpoint'], {'endpoint': e['endpoint'], 'requests': 0, 'errors': 0,
+                                                          'ejections': 0, 'max_outstanding': 0,
+                                                          'histogram': Histogram()})
+            for key in ('requests', 'errors', 'ejections'):
+                merged[key] += e[key]
+            # Generators balance independently: the sum of their peaks bounds the combined one
+            merged['max_outstanding'] += e['max_outstanding']
+            merged['histogram'].merge(Histogram.from_dict(e['histogram']))
+    total = sum(e['requests'] for e in endpoints.values()) or 1
+    for e in endpoints.values():
+        e['share_pct'] = e['requests'] / total * 100
+        e['latency_ms'] = e.pop('histogram').summary()
+    shares = [e['requests'] for e in endpoints.values()]
+    return {
+        'policy': balanced[0]['policy'],
+        'endpoints': list(endpoints.values()),
+        'imbalance': max(shares) / (total / len(shares)),
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-process Triton load generator")
+    parser.add_argument('iterations', nargs='?', type=int, default=1000,
+                        help="total number of requests (default: 1000)")
+    parser.add_argument('protocol', nargs='?', choices=['http', 'grpc'], default='http',
+                        help="'http' or 'grpc' (default: http)")
+    parser.add_argument('concurrency', nargs='?', type=int, default=32,
+                        help="total in-flight requests across all processes (default: 32)")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="worker processes (default: available CPUs, at most concurrency)")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="open-loop target rate in requests/s across all processes (default: closed loop)")
+    parser.add_argument('--url', default=None,
+                        help="Triton host:port (default: the local port for the protocol)")
+    parser.add_argument('--endpoints', default=None,
+                        help="comma-separated Triton host:port list to balance over (default: --url)")
+    parser.add_argument('--lb', choices=POLICIES, default='round-robin',
+                        help="client-side load balancing policy across --endpoints (default: round-robin)")
+    parser.add_argument('--model', default=MODEL_NAME,
+                        help=f"Triton model name (default: {MODEL_NAME})")
+    parser.add_argument('--imgsz', type=int, default=640,
+                        help="input resolution of the model (default: 640)")
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help="per-request timeout in seconds (default: 60)")
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args.iterations, args.protocol, max(1, args.concurrency), processes=args.processes,
+                  rate=args.rate, url=args.url, model_name=args.model, imgsz=args.imgsz, timeout=args.timeout,
+                  endpoints=args.endpoints, lb=args.lb)
+    if results:
+        print_results(results)
+        save_results(results)
+        print(f"\n{'='*70}\n")
+        sys.exit(0)
+    print(f"\nBenchmark failed\n")
+    sys.exit(1)
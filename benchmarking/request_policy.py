@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Client Request Policy
+Deadline, retry and hedging policy for the concurrent benchmark clients
+
+Each logical request gets one deadline (--deadline-ms) shared by all of its
+attempts: every attempt's client timeout is the time left, and the same budget
+is sent to Triton as the request 'timeout' parameter so a queued request past
+its deadline can be dropped server-side (models with dynamic batching and
+allow_timeout_override). Failed attempts are retried up to --retries times
+with full-jitter exponential backoff, never past the deadline. With --hedge, a
+duplicate attempt is sent once the request has been outstanding longer than
+the rolling p95 (--hedge-percentile) of attempt latency; the first success wins.
+
+The primary attempt always runs on the caller's thread. Hedges are launched by
+one timer thread onto their own small pool (HEDGE_BUDGET_FRACTION of the
+workers); when every hedge slot is busy the duplicate is skipped rather than
+queued, so hedging can never delay primaries. The losing attempt is cancelled
+through the CancelToken passed to attempt(timeout, cancel): the client
+registers how to abort its call (gRPC CallContext.cancel, HTTP socket shutdown).
+
+Retries, hedges, skipped hedges, hedge wins and cancelled losers are counted
+separately from errors, so a run with --hedge can be compared with one without
+to see what the tail gains and what the duplicate load costs.
+"""
+
+import time
+import heapq
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_DEADLINE_MS = 60000
+DEFAULT_BACKOFF_MS = 50
+MAX_BACKOFF_MS = 2000
+
+# Hedging starts once this many attempt latencies have been seen
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 1000
+# In-flight hedges allowed, as a fraction of the workers (at least one)
+HEDGE_BUDGET_FRACTION = 0.25
+
+# gRPC status codes that a retry cannot fix
+NON_RETRYABLE_GRPC = (
+    'StatusCode.INVALID_ARGUMENT', 'StatusCode.NOT_FOUND', 'StatusCode.UNIMPLEMENTED',
+    'StatusCode.PERMISSION_DENIED', 'StatusCode.UNAUTHENTICATED', 'StatusCode.FAILED_PRECONDITION',
+)
+
+class DeadlineExceeded(Exception):
+    pass
+
+class CancelToken:
+    """Cancellation hook for one attempt; callbacks registered by the client run on cancel()"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.cancelled = False
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass  # the call already finished or its connection is gone
+
+class _Race:
+    """State shared by a primary attempt and its hedge"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.token = CancelToken()  # the hedge's
+        self.done = threading.Event()  # set when the hedge finishes
+        self.closed = False  # primary finished: no hedge may start
+        self.launched = False
+        self.won = False
+        self.result = None
+        self.error = None
+
+class _Timer:
+    """One thread firing callbacks at perf_counter() times (hedge launches)"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = 0
+        self._stopped = False
+        threading.Thread(target=self._run, name='hedge-timer', daemon=True).start()
+
+    def schedule(self, at, callback):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (at, self._seq, callback))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._heap[0][0] - time.perf_counter() if self._heap else None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                _, _, callback = heapq.heappop(self._heap)
+            callback()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+def is_retryable(error):
+    """Transport errors, timeouts, HTTP 5xx/408/429 and transient gRPC codes"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):  # urllib HTTPError
+        return code >= 500 or code in (408, 429)
+    status = getattr(error, 'status', None)
+    if callable(status):  # tritonclient InferenceServerException
+        return status() not in NON_RETRYABLE_GRPC
+    return True
+
+def with_server_timeout(body, timeout_sec):
+    """Triton JSON request body with the remaining deadline as its 'timeout' parameter (us)"""
+    prefix = b'{"parameters":{"timeout":%d},' % max(1, int(timeout_sec * 1e6))
+    return prefix + body[1:]
+
+class RequestPolicy:
+    """Runs attempt(timeout_sec, cancel) under a deadline with bounded retries and optional hedging
+
+    Thread-safe; one policy is shared by all workers of a run.
+    """
+
+    def __init__(self, deadline_ms=DEFAULT_DEADLINE_MS, retries=0, backoff_ms=DEFAULT_BACKOFF_MS,
+                 hedge_percentile=None, max_outstanding=8, seed=None):
+        self.deadline_sec = deadline_ms / 1000.0
+        self.retries = max(0, retries)
+        self.backoff_sec = backoff_ms / 1000.0
+        self.hedge_percentile = hedge_percentile
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=HEDGE_WINDOW)
+        self._hedge_delay = None
+        self.counters = {
+            'requests': 0,
+            'attempts': 0,
+            'retries': 0,
+            'hedges': 0,
+            'hedges_skipped': 0,
+            'hedge_wins': 0,
+            'cancelled': 0,
+            'timeouts': 0,
+            'deadline_exceeded': 0,
+            'failed': 0,
+        }
+        # Hedges only: primaries stay on the caller's thread
+        self._pool = self._timer = self.hedge_budget = None
+        if hedge_percentile:
+            self.hedge_budget = max(1, int(max_outstanding * HEDGE_BUDGET_FRACTION))
+            self._slots = threading.BoundedSemaphore(self.hedge_budget)
+            self._pool = ThreadPoolExecutor(max_workers=self.hedge_budget, thread_name_prefix='hedge')
+            self._timer = _Timer()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def hedge_delay(self):
+        """Seconds before a duplicate is sent (None until enough samples)"""
+        if not self.hedge_percentile:
+            return None
+        with self._lock:
+            if len(self._window) < HEDGE_MIN_SAMPLES:
+                return None
+            window = sorted(self._window)
+        index = min(len(window) - 1, int(len(window) * self.hedge_percentile / 100.0))
+        self._hedge_delay = window[index]
+        return self._hedge_delay
+
+    def _timed(self, attempt, deadline, cancel):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded before attempt")
+        self._count('attempts')
+        start = time.perf_counter()
+        try:
+            result = attempt(remaining, cancel)
+        except Exception as e:
+            if cancel.cancelled:
+                self._count('cancelled')
+            elif isinstance(e, TimeoutError) or 'timed out' in str(e).lower() or 'DEADLINE_EXCEEDED' in str(e):
+                self._count('timeouts')
+            raise
+        with self._lock:
+            self._window.append(time.perf_counter() - start)
+        return result
+
+    def _launch_hedge(self, race, attempt, deadline, primary):
+        """Timer callback: start the hedge if the primary is still out and a slot is free"""
+        with race.lock:
+            if race.closed or deadline - time.perf_counter() <= 0:
+                return
+            if not self._slots.acquire(blocking=False):
+                self._count('hedges_skipped')
+                return
+            race.launched = True
+        self._count('hedges')
+        self._pool.submit(self._run_hedge, race, attempt, deadline, primary)
+
+    def _run_hedge(self, race, attempt, deadline, primary):
+        try:
+            result = self._timed(attempt, deadline, race.token)
+            with race.lock:
+                race.result = result
+                race.won = not race.closed
+            if race.won:
+                self._count('hedge_wins')
+                primary.cancel()
+        except Exception as e:
+            race.error = e
+        finally:
+            self._slots.release()
+            race.done.set()
+
+    def _attempt(self, attempt, deadline):
+        delay = self.hedge_delay()
+        primary = CancelToken()
+        if delay is None:
+            return self._timed(attempt, deadline, primary)
+
+        race = _Race()
+        self._timer.schedule(time.perf_counter() + delay,
+                             lambda: self._launch_hedge(race, attempt, deadline, primary))
+        try:
+            result = self._timed(attempt, deadline, primary)
+        except Exception:
+            with race.lock:
+                race.closed = True
+                launched, won = race.launched, race.won
+            if launched:
+                # Cancelled by the winning hedge, or failed while the hedge may still succeed
+                race.done.wait(max(0.0, deadline - time.perf_counter()))
+                if race.done.is_set() and race.error is None:
+                    if not won:
+                        self._count('hedge_wins')
+                    return race.result
+            raise
+        with race.lock:
+            race.closed = True
+            launched = race.launched
+        if launched:
+            race.token.cancel()
+        return result
+
+    def call(self, attempt):
+        """Result of the first successful attempt; raises the last error when all fail"""
+        self._count('requests')
+        deadline = time.perf_counter() + self.deadline_sec
+        error = None
+        for n in range(self.retries + 1):
+            if n:
+                self._count('retries')
+            try:
+                return self._attempt(attempt, deadline)
+            except Exception as e:
+                error = e
+            remaining = deadline - time.perf_counter()
+            if n == self.retries or remaining <= 0 or not is_retryable(error):
+                break
+            # Full jitter: uniform(0, min(cap, base * 2^n)), bounded by the deadline
+            backoff = self._rng.uniform(0, min(MAX_BACKOFF_MS / 1000.0, self.backoff_sec * 2 ** n))
+            time.sleep(min(backoff, remaining))
+
+        self._count('failed')
+        if deadline - time.perf_counter() <= 0:
+            self._count('deadline_exceeded')
+            if not isinstance(error, DeadlineExceeded):
+                error = DeadlineExceeded(f"deadline {self.deadline_sec * 1000:.0f} ms exceeded: {error}")
+        raise error
+
+    def close(self):
+        if self._pool is not None:
+            self._timer.stop()
+            self._pool.shutdown(wait=False)
+
+    def report(self):
+        """Settings and counters for results['request_policy']"""
+        with self._lock:
+            counters = dict(self.counters)
+        requests = counters['requests'] or 1
+        return {
+            'deadline_ms': self.deadline_sec * 1000,
+            'retries': self.retries,
+            'backoff_ms': self.backoff_sec * 1000,
+            'hedge_percentile': self.hedge_percentile,
+            'hedge_budget': self.hedge_budget,
+            'hedge_delay_ms': round(self._hedge_delay * 1000, 3) if self._hedge_delay else None,
+            'counters': counters,
+            # Requests the server saw on top of one per logical request
+            'extra_load_pct': (counters['attempts'] - counters['requests']) / requests * 100,
+        }
+
+def print_policy(report):
+    """Print the request policy block of a results dict (no-op when absent)"""
+    if not report:
+        return
+    c = report['counters']
+    print(f"Request Policy:")
+    hedge = f"p{report['hedge_percentile']:g}" if report['hedge_percentile'] else 'off'
+    print(f"  Deadline: {report['deadline_ms']:.0f} ms | Retries: {report['retries']} | Hedging: {hedge}")
+    print(f"  Requests: {c['requests']}  Attempts: {c['attempts']}  "
+          f"(+{report['extra_load_pct']:.1f}% load)")
+    print(f"  Retries:  {c['retries']}")
+    if report['hedge_percentile']:
+        delay = f" after {report['hedge_delay_ms']:.1f} ms" if report['hedge_delay_ms'] else ''
+        print(f"  Hedges:   {c['hedges']}{delay} ({c['hedge_wins']} won by the duplicate, "
+              f"{c['cancelled']} losers cancelled)")
+        print(f"  Skipped:  {c['hedges_skipped']} (all {report['hedge_budget']} hedge slots busy)")
+    print(f"  Timeouts: {c['timeouts']}  Deadline exceeded: {c['deadline_exceeded']}  Failed: {c['failed']}")
+    print()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmark Result Schema
+One flat, versioned record shared by every benchmark producer and consumer,
+plus an append-only JSONL result store and a columnar (numpy) loader
+
+The in-pod scripts emit nested result dicts (latency_ms.mean, total_time_sec,
+...); BenchmarkRecord.from_result() converts those, older visualizer-style
+dicts (mean_latency, total_time, status) and aggregated_results.csv rows into
+the same record, so plotting never walks nested dicts.
+
+Usage:
+  python3 result_schema.py <results.json|.jsonl|.csv> [...] [--csv OUT.csv]
+
+  Prints how many records were loaded and the columns available; with --csv
+  also exports them in the aggregated_results.csv layout.
+"""
+
+import sys
+import csv
+import json
+import argparse
+import threading
+from pathlib import Path
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# Column order matches results/benchmarking/aggregated_results.csv
+STRING_FIELDS = ('model', 'deployment', 'protocol', 'mode', 'location', 'test_type', 'timestamp', 'status')
+NUMERIC_FIELDS = (
+    'iterations', 'errors', 'concurrency', 'total_time_sec', 'throughput_fps', 'avg_latency_fps',
+    'latency_mean_ms', 'latency_p50_ms', 'latency_p90_ms', 'latency_p95_ms', 'latency_p99_ms',
+    'latency_min_ms', 'latency_max_ms',
+)
+CSV_FIELDS = ('model', 'deployment', 'protocol', 'mode', 'location', 'iterations', 'errors',
+              'concurrency', 'total_time_sec', 'throughput_fps', 'avg_latency_fps',
+              'latency_mean_ms', 'latency_p50_ms', 'latency_p90_ms', 'latency_p95_ms',
+              'latency_p99_ms', 'latency_min_ms', 'latency_max_ms', 'test_type', 'timestamp')
+
+# Nested in-pod result keys -> record fields
+_LATENCY_KEYS = {
+    'mean': 'latency_mean_ms', 'p50': 'latency_p50_ms', 'p90': 'latency_p90_ms',
+    'p95': 'latency_p95_ms', 'p99': 'latency_p99_ms', 'min': 'latency_min_ms', 'max': 'latency_max_ms',
+}
+# Legacy visualizer dict keys -> record fields
+_LEGACY_KEYS = {
+    'mean_latency': 'latency_mean_ms', 'p95': 'latency_p95_ms', 'p99': 'latency_p99_ms',
+    'total_time': 'total_time_sec',
+}
+
+class BenchmarkRecord:
+    """Flat benchmark result; anything outside the schema lives in `extra`"""
+
+    __slots__ = ('schema_version',) + STRING_FIELDS + NUMERIC_FIELDS + ('extra',)
+
+    def __init__(self, **fields):
+        self.schema_version = fields.pop('schema_version', SCHEMA_VERSION)
+        for name in STRING_FIELDS:
+            setattr(self, name, fields.pop(name, None))
+        for name in NUMERIC_FIELDS:
+            value = fields.pop(name, None)
+            setattr(self, name, float(value) if value not in (None, '') else None)
+        self.extra = fields.pop('extra', None) or {}
+        self.extra.update(fields)
+        if self.status is None:
+            self.status = 'success'
+
+    @classmethod
+    def from_result(cls, result, **overrides):
+        """Convert any known result dict shape (nested, legacy, flat) to a record"""
+        data = dict(result)
+        fields = {}
+
+        latency = data.pop('latency_ms', None)
+        if isinstance(latency, dict):
+            for key, field in _LATENCY_KEYS.items():
+                if key in latency:
+                    fields[field] = latency[key]
+            if 'p50' not in latency and 'median' in latency:
+                fields['latency_p50_ms'] = latency['median']
+
+        for key, field in _LEGACY_KEYS.items():
+            if key in data:
+                fields.setdefault(field, data.pop(key))
+
+        for name in ('schema_version',) + STRING_FIELDS + NUMERIC_FIELDS:
+            if name in data:
+                fields.setdefault(name, data.pop(name))
+
+        extra = data.pop('extra', None) or {}
+        extra.update(data)
+        fields['extra'] = extra
+        fields.update(overrides)
+
+        record = cls(**fields)
+        if record.concurrency is None:
+            record.concurrency = 1.0
+        if record.mode is None:
+            record.mode = 'concurrent' if record.concurrency > 1 else 'sequential'
+        if record.throughput_fps is None and record.latency_mean_ms:
+            if record.total_time_sec and record.iterations and record.concurrency > 1:
+                record.throughput_fps = record.iterations / record.total_time_sec
+            else:
+                record.throughput_fps = 1000.0 / record.latency_mean_ms
+        return record
+
+    @classmethod
+    def from_dict(cls, data):
+        """Load a record written by to_dict()"""
+        version = data.get('schema_version', SCHEMA_VERSION)
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Result schema v{version} is newer than supported v{SCHEMA_VERSION}")
+        return cls.from_result(data)
+
+    def to_dict(self):
+        data = {'schema_version': self.schema_version}
+        for name in STRING_FIELDS + NUMERIC_FIELDS:
+            data[name] = getattr(self, name)
+        if self.extra:
+            data['extra'] = self.extra
+        return data
+
+    def get(self, name, default=None):
+        """Schema field or extra value"""
+        if name in self.__slots__:
+            value = getattr(self, name)
+            return default if value is None else value
+        return self.extra.get(name, default)
+
+    def __repr__(self):
+        return (f"BenchmarkRecord({self.model}/{self.deployment}/{self.protocol} "
+                f"c={self.concurrency:g} mean={self.latency_mean_ms})")
+
+class ResultStore:
+    """Append-only JSONL store of BenchmarkRecords"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """Append one record (flushed immediately so partial runs are kept)"""
+        if not isinstance(record, BenchmarkRecord):
+            record = BenchmarkRecord.from_result(record)
+        line = json.dumps(record.to_dict(), separators=(',', ':'))
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+                f.flush()
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def load(self):
+        return load_records([self.path]) if self.path.exists() else []
+
+    def arrays(self):
+        return to_arrays(self.load())
+
+def _records_from_json(data):
+    if isinstance(data, list):
+        return [BenchmarkRecord.from_result(d) for d in data]
+    if isinstance(data, dict):
+        if 'latency_ms' in data or 'schema_version' in data:
+            return [BenchmarkRecord.from_result(data)]
+        # Legacy visualizer format: {deployment_name: result}
+        return [BenchmarkRecord.from_result(d, deployment=d.get('deployment', name))
+                for name, d in data.items() if isinstance(d, dict)]
+    return []
+
+def load_records(paths):
+    """Load records from .jsonl stores, .json result files and .csv exports"""
+    records = []
+    for path in paths:
+        path = Path(path)
+        if path.suffix == '.jsonl':
+            with open(path) as f:
+                records.extend(BenchmarkRecord.from_dict(json.loads(line)) for line in f if line.strip())
+        elif path.suffix == '.csv':
+            with open(path, newline='') as f:
+                records.extend(BenchmarkRecord.from_result(row) for row in csv.DictReader(f))
+        else:
+            with open(path) as f:
+                records.extend(_records_from_json(json.load(f)))
+    return records
+
+def to_arrays(records):
+    """Columnar view: numeric fields as float64 (NaN if missing), strings as str arrays"""
+    n = len(records)
+    columns = {}
+    for name in NUMERIC_FIELDS:
+        values = np.empty(n, dtype=np.float64)
+        for i, r in enumerate(records):
+            v = getattr(r, name)
+            values[i] = np.nan if v is None else v
+        columns[name] = values
+    for name in STRING_FIELDS:
+        columns[name] = np.array([getattr(r, name) or '' for r in records], dtype=str)
+    return columns
+
+def group_mean(keys, values):
+    """Mean of values per unique key, ignoring NaNs; returns (unique_keys, means)"""
+    finite = np.isfinite(values)
+    keys, values = keys[finite], values[finite]
+    if keys.size == 0:
+        return keys, values
+    unique, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values)
+    counts = np.bincount(inverse)
+    return unique, sums / counts
+
+def write_csv(records, path):
+    """Write records in the aggregated_results.csv layout"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for r in records:
+            row = []
+            for name in CSV_FIELDS:
+                v = getattr(r, name)
+                if name in ('iterations', 'errors', 'concurrency') and v is not None:
+                    v = int(v)
+                row.append('' if v is None else v)
+            writer.writerow(row)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description="Load benchmark results and optionally export them as CSV")
+    parser.add_argument('files', nargs='+', help='Result files (.jsonl/.json/.csv)')
+    parser.add_argument('--csv', default=None, metavar='OUT', help='write the records in the aggregated_results.csv layout')
+    args = parser.parse_args()
+
+    records = load_records(args.files)
+    arrays = to_arrays(records)
+    print(f"Loaded {len(records)} records (schema v{SCHEMA_VERSION})")
+    for name in STRING_FIELDS[:3]:
+        print(f"  {name}: {sorted(set(arrays[name]))}")
+    print(f"  concurrency: {sorted(set(arrays['concurrency'][np.isfinite(arrays['concurrency'])]))}")
+    if args.csv:
+        write_csv(records, args.csv)
+        print(f"Wrote {len(records)} records to {args.csv}")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Triton Metrics Scraper
+Snapshots Triton's Prometheus counters before and after a benchmark run to
+split client latency into queue, compute and transport time
+
+Usage:
+  python3 triton_metrics.py [metrics_url] [model_name]
+
+  Prints the current counter values for the model.
+"""
+
+import sys
+from urllib.request import Request, urlopen
+
+TRITON_METRICS_URL = "127.0.0.1:8002"
+
+# Counters needed for the breakdown (all cumulative since server start)
+COUNTERS = (
+    'nv_inference_request_success',
+    'nv_inference_request_failure',
+    'nv_inference_count',
+    'nv_inference_exec_count',
+    'nv_inference_request_duration_us',
+    'nv_inference_queue_duration_us',
+    'nv_inference_compute_input_duration_us',
+    'nv_inference_compute_infer_duration_us',
+    'nv_inference_compute_output_duration_us',
+)
+
+# Line prefixes checked before any label parsing ("name{" or "name ")
+_PREFIXES = tuple(f"{name}{sep}" for name in COUNTERS for sep in ('{', ' '))
+
+def _parse_labels(label_str):
+    """Parse 'a="x",b="y"' into a dict (Triton label values contain no quotes)"""
+    labels = {}
+    for part in label_str.split('",'):
+        key, _, value = part.partition('="')
+        if key:
+            labels[key.strip(', ')] = value.rstrip('"')
+    return labels
+
+def parse_metrics(lines, model_name=None):
+    """Incrementally parse Prometheus text lines, summing wanted counters per name
+
+    Only lines starting with a wanted metric name are split, so the (large)
+    GPU/CPU gauge sections of the exposition are skipped with one startswith.
+    """
+    totals = dict.fromkeys(COUNTERS, 0.0)
+    for raw in lines:
+        line = raw.decode('utf-8', 'replace') if isinstance(raw, bytes) else raw
+        if not line.startswith(_PREFIXES):
+            continue
+
+        brace = line.find('{')
+        if brace != -1:
+            close = line.rfind('}')
+            name = line[:brace]
+            labels = _parse_labels(line[brace + 1:close])
+            value_str = line[close + 1:].split()[0]
+            if model_name and labels.get('model') != model_name:
+                continue
+        else:
+            name, value_str = line.split()[:2]
+
+        try:
+            totals[name] += float(value_str)
+        except ValueError:
+            continue
+    return totals
+
+def scrape(url=TRITON_METRICS_URL, model_name=None, timeout=5):
+    """Fetch /metrics and return summed counters, streaming the response line by line"""
+    req = Request(f"http://{url}/metrics")
+    with urlopen(req, timeout=timeout) as response:
+        return parse_metrics(response, model_name)
+
+def breakdown(before, after, client_mean_ms=None):
+    """Per-request queue/compute/transport split from two counter snapshots"""
+    delta = {name: after[name] - before[name] for name in COUNTERS}
+    requests = delta['nv_inference_request_success']
+    executions = delta['nv_inference_exec_count']
+    if requests <= 0:
+        return None
+
+    def per_request_ms(name):
+        return delta[name] / requests / 1000.0
+
+    server_ms = per_request_ms('nv_inference_request_duration_us')
+    result = {
+        'requests': int(requests),
+        'failures': int(delta['nv_inference_request_failure']),
+        'inferences': int(delta['nv_inference_count']),
+        'executions': int(executions),
+        'avg_batch_size': delta['nv_inference_count'] / executions if executions else 0.0,
+        'per_request_ms': {
+            'queue': per_request_ms('nv_inference_queue_duration_us'),
+            'compute_input': per_request_ms('nv_inference_compute_input_duration_us'),
+            'compute_infer': per_request_ms('nv_inference_compute_infer_duration_us'),
+            'compute_output': per_request_ms('nv_inference_compute_output_duration_us'),
+            'server_total': server_ms,
+        },
+    }
+    parts = result['per_request_ms']
+    parts['server_other'] = max(0.0, server_ms - parts['queue'] - parts['compute_input']
+                                - parts['compute_infer'] - parts['compute_output'])
+    if client_mean_ms is not None:
+        # Everything outside Triton's request timer: network, (de)serialization, client
+        parts['client_mean'] = client_mean_ms
+        parts['transport'] = max(0.0, client_mean_ms - server_ms)
+    return result
+
+class MetricsProbe:
+    """Snapshot counters after warmup and attach the breakdown to benchmark results"""
+
+    def __init__(self, model_name, url=TRITON_METRICS_URL):
+        self.model_name = model_name
+        self.url = url
+        self.before = None
+
+    def start(self):
+        try:
+            self.before = scrape(self.url, self.model_name)
+        except Exception as e:
+            print(f"⚠ Could not scrape Triton metrics at {self.url}: {e}")
+            self.before = None
+
+    def finish(self, results):
+        if self.before is None or not results:
+            return results
+        try:
+            after = scrape(self.url, self.model_name)
+        except Exception as e:
+            print(f"⚠ Could not scrape Triton metrics at {self.url}: {e}")
+            return results
+
+        server = breakdown(self.before, after, results['latency_ms']['mean'])
+        if server:
+            results['server_metrics'] = server
+        return results
+
+def print_breakdown(server):
+    """Print the queue/compute/transport split"""
+    if not server:
+        return
+    parts = server['per_request_ms']
+    print(f"Server-side breakdown (Triton metrics, per request):")
+    print(f"  Requests:        {server['requests']} ({server['executions']} executions)")
+    print(f"  Avg batch size:  {server['avg_batch_size']:7.2f}")
+    print(f"  Queue:           {parts['queue']:7.2f} ms")
+    print(f"  Compute input:   {parts['compute_input']:7.2f} ms")
+    print(f"  Compute infer:   {parts['compute_infer']:7.2f} ms")
+    print(f"  Compute output:  {parts['compute_output']:7.2f} ms")
+    print(f"  Server other:    {parts['server_other']:7.2f} ms")
+    print(f"  Server total:    {parts['server_total']:7.2f} ms")
+    if 'transport' in parts:
+        print(f"  Transport/client:{parts['transport']:7.2f} ms (client mean {parts['client_mean']:.2f} ms)")
+    print()
+
+if __name__ == '__main__':
+    url = sys.argv[1] if len(sys.argv) > 1 else TRITON_METRICS_URL
+    model = sys.argv[2] if len(sys.argv) > 2 else None
+    for name, value in scrape(url, model).items():
+        print(f"{name:<45} {value:.0f}")
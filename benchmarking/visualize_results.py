@@ -2,9 +2,30 @@
 """
 YOLO-NIM Performance Visualization Suite
 Generates comprehensive comparison graphs across all deployments and concurrency levels
+
+Figures are rendered in a process pool into stable paths (executive/,
+per_model/, per_concurrency/). A manifest of input-data hashes lets unchanged
+figures be skipped on the next run.
+
+Usage:
+  python3 visualize_results.py                          # results.jsonl + all_results_*.json
+  python3 visualize_results.py aggregated_results.csv   # explicit .jsonl/.json/.csv files
+  python3 visualize_results.py --model yolov11m ...     # one model instead of the average
+  python3 visualize_results.py --preview                # 72 DPI into preview/, for quick checks
+  python3 visualize_results.py --force --jobs 4         # re-render everything with 4 workers
+
+Also writes dashboard.html, a self-contained interactive dashboard (see dashboard.py).
 """
 
+import os
+import time
 import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from pathlib import Path
@@ -12,10 +33,19 @@ import numpy as np
 from datetime import datetime
 import seaborn as sns
 
+from result_schema import load_records, to_arrays, group_mean
+from dashboard import build_dashboard
+
 # Configure matplotlib for professional output
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
 
+FULL_DPI = 300
+PREVIEW_DPI = 72
+MANIFEST_NAME = "render_manifest.json"
+# Bump when chart code changes so every figure is re-rendered once
+RENDER_VERSION = 1
+
 # Deployment configurations
 DEPLOYMENTS = {
     'base-yolo': {'color': '#FF6B6B', 'label': 'PyTorch (Baseline)', 'marker': 's'},
@@ -25,85 +55,135 @@ DEPLOYMENTS = {
 }
 
 class BenchmarkVisualizer:
-    def __init__(self, results_dir="/mnt/coecommonfss/llmcore/benchmarking"):
+    def __init__(self, results_dir="/mnt/coecommonfss/llmcore/benchmarking", model=None):
         self.results_dir = Path(results_dir)
-        self.data = {}
+        self.model = model  # None = average across all models in the results
+        self.label = model  # Appended to chart titles
+        self.records = []
+        self.columns = {}
         self.concurrency_levels = []
 
-    def load_results(self):
-        """Load all benchmark results organized by concurrency level"""
+    def load_results(self, paths=None):
+        """Load benchmark records and build per-metric numpy columns
+
+        Reads the results.jsonl store plus any all_results_*.json files (old
+        and new formats), or the explicit paths given (e.g. aggregated_results.csv).
+        """
         print("Loading benchmark results...")
 
-        # Find all all_results_*.json files and sort by timestamp
-        result_files = sorted(self.results_dir.glob("all_results_*.json"))
+        if paths is None:
+            paths = sorted(self.results_dir.glob("all_results_*.json"))
+            store = self.results_dir / "results.jsonl"
+            if store.exists():
+                paths.append(store)
 
-        if not result_files:
+        if not paths:
             print(f"No result files found in {self.results_dir}")
             return False
 
-        print(f"Found {len(result_files)} result files")
+        print(f"Found {len(paths)} result files")
 
-        for result_file in result_files:
+        for path in paths:
             try:
-                with open(result_file) as f:
-                    data = json.load(f)
-
-                # Extract concurrency level from first deployment
-                concurrency = None
-                for deployment in data.values():
-                    if 'concurrency' in deployment:
-                        concurrency = deployment['concurrency']
-                        break
-
-                if concurrency is None:
-                    concurrency = 1  # Default to sequential
+                records = load_records([path])
+                self.records.extend(records)
+                print(f"  Loaded: {Path(path).name} ({len(records)} records)")
+            except Exception as e:
+                print(f"  Error loading {path}: {e}")
 
-                # Store results by concurrency level
-                if concurrency not in self.data:
-                    self.data[concurrency] = {}
-                    self.concurrency_levels.append(concurrency)
+        columns = to_arrays(self.records)
+        if self.model:
+            keep = columns['model'] == self.model
+            columns = {name: values[keep] for name, values in columns.items()}
 
-                # Merge deployment data
-                for deployment_name, deployment_data in data.items():
-                    self.data[concurrency][deployment_name] = deployment_data
+        self.set_columns(columns)
+        if not self.concurrency_levels:
+            print("No successful results to plot")
+            return False
 
-                print(f"  Loaded: {result_file.name} (concurrency={concurrency})")
+        models = self.models()
+        print(f"\nRecords: {len(self.columns['concurrency'])} successful of {len(self.records)}")
+        print(f"Models: {models if models else 'unknown'}{'' if self.model or len(models) < 2 else ' (averaged)'}")
+        print(f"Concurrency levels found: {self.concurrency_levels}")
+        print(f"Deployments found: {sorted(str(d) for d in set(self.columns['deployment']))}\n")
 
-            except Exception as e:
-                print(f"  Error loading {result_file}: {e}")
+        return True
 
-        self.concurrency_levels = sorted(self.concurrency_levels)
-        print(f"\nConcurrency levels found: {self.concurrency_levels}")
-        print(f"Deployments found: {list(self.data[self.concurrency_levels[0]].keys())}\n")
+    @classmethod
+    def from_columns(cls, columns, label=None):
+        """Visualizer over already-loaded columns (used by render workers)"""
+        viz = cls()
+        viz.label = label
+        viz.set_columns(columns)
+        return viz
+
+    def set_columns(self, columns):
+        """Keep successful runs, derive error rate and the concurrency levels"""
+        ok = columns['status'] == 'success'
+        self.columns = {name: values[ok] for name, values in columns.items()}
+        iterations = self.columns['iterations']
+        errors = np.nan_to_num(self.columns['errors'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.columns['error_rate_pct'] = np.where(iterations > 0, errors / iterations * 100, np.nan)
+
+        concurrency = self.columns['concurrency']
+        self.concurrency_levels = [int(c) for c in np.unique(concurrency[np.isfinite(concurrency)])]
+
+    def subset(self, mask):
+        """Columns for the rows selected by a boolean mask"""
+        return {name: values[mask] for name, values in self.columns.items()}
+
+    def models(self):
+        return sorted(str(m) for m in set(self.columns['model']) - {''})
+
+    def title(self, text):
+        """Chart title with the model label (if any) on the first line"""
+        if not self.label:
+            return text
+        first, _, rest = text.partition('\n')
+        return f"{first} ({self.label})" + (f"\n{rest}" if rest else '')
+
+    def series(self, deployment, metric):
+        """(concurrency levels, mean metric per level) for one deployment"""
+        mask = self.columns['deployment'] == deployment
+        return group_mean(self.columns['concurrency'][mask], self.columns[metric][mask])
+
+    def value(self, deployment, concurrency, metric):
+        """Mean metric for one deployment at one concurrency level, or None"""
+        levels, values = self.series(deployment, metric)
+        match = np.nonzero(levels == concurrency)[0]
+        return float(values[match[0]]) if match.size else None
+
+    def plot_metric(self, ax, metric, linewidth=2.5, markersize=10):
+        """One line per deployment of metric vs concurrency"""
+        for deployment_name, config in DEPLOYMENTS.items():
+            concurrencies, values = self.series(deployment_name, metric)
+            if values.size:
+                ax.plot(concurrencies, values,
+                       marker=config['marker'],
+                       color=config['color'],
+                       label=config['label'],
+                       linewidth=linewidth,
+                       markersize=markersize)
 
-        return True
+    def speedups(self, concurrency, deployments):
+        """Baseline mean latency / deployment mean latency (0 when unavailable)"""
+        baseline_latency = self.value('base-yolo', concurrency, 'latency_mean_ms')
+        row = []
+        for deployment in deployments:
+            latency = self.value(deployment, concurrency, 'latency_mean_ms')
+            row.append(baseline_latency / latency if baseline_latency and latency else 0)
+        return row
 
     def create_latency_comparison(self):
         """Create mean latency vs concurrency graph"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        for deployment_name, config in DEPLOYMENTS.items():
-            latencies = []
-            concurrencies = []
-
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        latencies.append(data['mean_latency'])
-                        concurrencies.append(c)
-
-            if latencies:
-                ax.plot(concurrencies, latencies,
-                       marker=config['marker'],
-                       color=config['color'],
-                       label=config['label'],
-                       linewidth=2.5,
-                       markersize=10)
+        self.plot_metric(ax, 'latency_mean_ms')
 
         ax.set_xlabel('Concurrency Level', fontsize=14, fontweight='bold')
         ax.set_ylabel('Mean Latency (ms)', fontsize=14, fontweight='bold')
-        ax.set_title('Inference Latency vs Concurrency\nLower is Better',
+        ax.set_title(self.title('Inference Latency vs Concurrency\nLower is Better'),
                     fontsize=16, fontweight='bold', pad=20)
         ax.legend(fontsize=11, loc='best')
         ax.grid(True, alpha=0.3)
@@ -121,38 +201,12 @@ class BenchmarkVisualizer:
         """Create throughput vs concurrency graph"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        for deployment_name, config in DEPLOYMENTS.items():
-            throughputs = []
-            concurrencies = []
-
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        # Calculate throughput (FPS)
-                        if c == 1:
-                            # Sequential: theoretical FPS
-                            fps = 1000.0 / data['mean_latency']
-                        else:
-                            # Concurrent: actual throughput
-                            total_time = data['total_time']
-                            iterations = data['iterations']
-                            fps = iterations / total_time
-
-                        throughputs.append(fps)
-                        concurrencies.append(c)
-
-            if throughputs:
-                ax.plot(concurrencies, throughputs,
-                       marker=config['marker'],
-                       color=config['color'],
-                       label=config['label'],
-                       linewidth=2.5,
-                       markersize=10)
+        # Sequential runs record 1000/mean latency, concurrent runs iterations/total time
+        self.plot_metric(ax, 'throughput_fps')
 
         ax.set_xlabel('Concurrency Level', fontsize=14, fontweight='bold')
         ax.set_ylabel('Throughput (FPS)', fontsize=14, fontweight='bold')
-        ax.set_title('Inference Throughput vs Concurrency\nHigher is Better',
+        ax.set_title(self.title('Inference Throughput vs Concurrency\nHigher is Better'),
                     fontsize=16, fontweight='bold', pad=20)
         ax.legend(fontsize=11, loc='best')
         ax.grid(True, alpha=0.3)
@@ -168,24 +222,7 @@ class BenchmarkVisualizer:
 
         # Prepare data matrix
         deployments = [d for d in DEPLOYMENTS.keys() if d != 'base-yolo']
-        speedup_matrix = []
-
-        for c in self.concurrency_levels:
-            row = []
-            baseline_latency = self.data[c].get('base-yolo', {}).get('mean_latency', None)
-
-            for deployment in deployments:
-                if baseline_latency and deployment in self.data[c]:
-                    data = self.data[c][deployment]
-                    if data['status'] == 'success':
-                        speedup = baseline_latency / data['mean_latency']
-                        row.append(speedup)
-                    else:
-                        row.append(0)
-                else:
-                    row.append(0)
-
-            speedup_matrix.append(row)
+        speedup_matrix = [self.speedups(c, deployments) for c in self.concurrency_levels]
 
         # Create heatmap
         im = ax.imshow(speedup_matrix, cmap='RdYlGn', aspect='auto', vmin=0, vmax=30)
@@ -208,7 +245,7 @@ class BenchmarkVisualizer:
                                  ha="center", va="center", color="black",
                                  fontweight='bold', fontsize=11)
 
-        ax.set_title('TensorRT Speedup vs PyTorch Baseline\n(Higher is Better)',
+        ax.set_title(self.title('TensorRT Speedup vs PyTorch Baseline\n(Higher is Better)'),
                     fontsize=16, fontweight='bold', pad=20)
 
         # Add colorbar
@@ -222,28 +259,11 @@ class BenchmarkVisualizer:
         """Create P95 latency comparison (SLA planning)"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        for deployment_name, config in DEPLOYMENTS.items():
-            p95_latencies = []
-            concurrencies = []
-
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success' and 'p95' in data:
-                        p95_latencies.append(data['p95'])
-                        concurrencies.append(c)
-
-            if p95_latencies:
-                ax.plot(concurrencies, p95_latencies,
-                       marker=config['marker'],
-                       color=config['color'],
-                       label=config['label'],
-                       linewidth=2.5,
-                       markersize=10)
+        self.plot_metric(ax, 'latency_p95_ms')
 
         ax.set_xlabel('Concurrency Level', fontsize=14, fontweight='bold')
         ax.set_ylabel('P95 Latency (ms)', fontsize=14, fontweight='bold')
-        ax.set_title('95th Percentile Latency vs Concurrency\n(SLA Planning)',
+        ax.set_title(self.title('95th Percentile Latency vs Concurrency\n(SLA Planning)'),
                     fontsize=16, fontweight='bold', pad=20)
         ax.legend(fontsize=11, loc='best')
         ax.grid(True, alpha=0.3)
@@ -261,29 +281,11 @@ class BenchmarkVisualizer:
         """Create error rate comparison"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        for deployment_name, config in DEPLOYMENTS.items():
-            error_rates = []
-            concurrencies = []
-
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        error_rate = (data.get('errors', 0) / data['iterations']) * 100
-                        error_rates.append(error_rate)
-                        concurrencies.append(c)
-
-            if error_rates:
-                ax.plot(concurrencies, error_rates,
-                       marker=config['marker'],
-                       color=config['color'],
-                       label=config['label'],
-                       linewidth=2.5,
-                       markersize=10)
+        self.plot_metric(ax, 'error_rate_pct')
 
         ax.set_xlabel('Concurrency Level', fontsize=14, fontweight='bold')
         ax.set_ylabel('Error Rate (%)', fontsize=14, fontweight='bold')
-        ax.set_title('Error Rate vs Concurrency\n(Lower is Better)',
+        ax.set_title(self.title('Error Rate vs Concurrency\n(Lower is Better)'),
                     fontsize=16, fontweight='bold', pad=20)
         ax.legend(fontsize=11, loc='best')
         ax.grid(True, alpha=0.3)
@@ -304,18 +306,7 @@ class BenchmarkVisualizer:
 
         # 1. Mean Latency
         ax1 = fig.add_subplot(gs[0, 0])
-        for deployment_name, config in DEPLOYMENTS.items():
-            latencies = []
-            concurrencies = []
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        latencies.append(data['mean_latency'])
-                        concurrencies.append(c)
-            if latencies:
-                ax1.plot(concurrencies, latencies, marker=config['marker'],
-                        color=config['color'], label=config['label'], linewidth=2)
+        self.plot_metric(ax1, 'latency_mean_ms', linewidth=2, markersize=6)
         ax1.set_xlabel('Concurrency', fontweight='bold')
         ax1.set_ylabel('Mean Latency (ms)', fontweight='bold')
         ax1.set_title('Mean Latency', fontweight='bold', fontsize=12)
@@ -325,22 +316,7 @@ class BenchmarkVisualizer:
 
         # 2. Throughput
         ax2 = fig.add_subplot(gs[0, 1])
-        for deployment_name, config in DEPLOYMENTS.items():
-            throughputs = []
-            concurrencies = []
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        if c == 1:
-                            fps = 1000.0 / data['mean_latency']
-                        else:
-                            fps = data['iterations'] / data['total_time']
-                        throughputs.append(fps)
-                        concurrencies.append(c)
-            if throughputs:
-                ax2.plot(concurrencies, throughputs, marker=config['marker'],
-                        color=config['color'], label=config['label'], linewidth=2)
+        self.plot_metric(ax2, 'throughput_fps', linewidth=2, markersize=6)
         ax2.set_xlabel('Concurrency', fontweight='bold')
         ax2.set_ylabel('Throughput (FPS)', fontweight='bold')
         ax2.set_title('Throughput', fontweight='bold', fontsize=12)
@@ -351,18 +327,7 @@ class BenchmarkVisualizer:
 
         # 3. P95 Latency
         ax3 = fig.add_subplot(gs[1, 0])
-        for deployment_name, config in DEPLOYMENTS.items():
-            p95s = []
-            concurrencies = []
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success' and 'p95' in data:
-                        p95s.append(data['p95'])
-                        concurrencies.append(c)
-            if p95s:
-                ax3.plot(concurrencies, p95s, marker=config['marker'],
-                        color=config['color'], label=config['label'], linewidth=2)
+        self.plot_metric(ax3, 'latency_p95_ms', linewidth=2, markersize=6)
         ax3.set_xlabel('Concurrency', fontweight='bold')
         ax3.set_ylabel('P95 Latency (ms)', fontweight='bold')
         ax3.set_title('95th Percentile Latency', fontweight='bold', fontsize=12)
@@ -372,19 +337,7 @@ class BenchmarkVisualizer:
 
         # 4. Error Rates
         ax4 = fig.add_subplot(gs[1, 1])
-        for deployment_name, config in DEPLOYMENTS.items():
-            error_rates = []
-            concurrencies = []
-            for c in self.concurrency_levels:
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        error_rate = (data.get('errors', 0) / data['iterations']) * 100
-                        error_rates.append(error_rate)
-                        concurrencies.append(c)
-            if error_rates:
-                ax4.plot(concurrencies, error_rates, marker=config['marker'],
-                        color=config['color'], label=config['label'], linewidth=2)
+        self.plot_metric(ax4, 'error_rate_pct', linewidth=2, markersize=6)
         ax4.set_xlabel('Concurrency', fontweight='bold')
         ax4.set_ylabel('Error Rate (%)', fontweight='bold')
         ax4.set_title('Error Rate', fontweight='bold', fontsize=12)
@@ -396,19 +349,7 @@ class BenchmarkVisualizer:
         ax5 = fig.add_subplot(gs[2, :])
         max_c = max(self.concurrency_levels)
         deployments = [d for d in DEPLOYMENTS.keys() if d != 'base-yolo']
-        speedups = []
-
-        baseline_latency = self.data[max_c].get('base-yolo', {}).get('mean_latency', None)
-        for deployment in deployments:
-            if baseline_latency and deployment in self.data[max_c]:
-                data = self.data[max_c][deployment]
-                if data['status'] == 'success':
-                    speedup = baseline_latency / data['mean_latency']
-                    speedups.append(speedup)
-                else:
-                    speedups.append(0)
-            else:
-                speedups.append(0)
+        speedups = self.speedups(max_c, deployments)
 
         bars = ax5.bar(range(len(deployments)), speedups,
                       color=[DEPLOYMENTS[d]['color'] for d in deployments])
@@ -426,11 +367,104 @@ class BenchmarkVisualizer:
                     f'{speedup:.1f}x',
                     ha='center', va='bottom', fontweight='bold', fontsize=11)
 
-        fig.suptitle('YOLO-NIM Performance Comparison Summary',
+        fig.suptitle(self.title('YOLO-NIM Performance Comparison Summary'),
                     fontsize=18, fontweight='bold', y=0.995)
 
         return fig
 
+    def create_speedup_vs_concurrency(self):
+        """Create speedup vs PyTorch baseline per deployment across concurrency levels"""
+        fig, ax = plt.subplots(figsize=(12, 7))
+
+        deployments = [d for d in DEPLOYMENTS.keys() if d != 'base-yolo']
+        speedup_matrix = np.array([self.speedups(c, deployments) for c in self.concurrency_levels])
+
+        for j, deployment in enumerate(deployments):
+            config = DEPLOYMENTS[deployment]
+            valid = speedup_matrix[:, j] > 0 if speedup_matrix.size else []
+            if np.any(valid):
+                ax.plot(np.array(self.concurrency_levels)[valid], speedup_matrix[valid, j],
+                       marker=config['marker'],
+                       color=config['color'],
+                       label=config['label'],
+                       linewidth=2.5,
+                       markersize=10)
+
+        ax.axhline(y=1, color='gray', linestyle='--', alpha=0.5)
+        ax.set_xlabel('Concurrency Level', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Speedup vs PyTorch', fontsize=14, fontweight='bold')
+        ax.set_title(self.title('TensorRT Speedup vs Concurrency\n(Higher is Better)'),
+                    fontsize=16, fontweight='bold', pad=20)
+        ax.legend(fontsize=11, loc='best')
+        ax.grid(True, alpha=0.3)
+        ax.set_xscale('log', base=2)
+
+        plt.tight_layout()
+        return fig
+
+    def create_model_comparison(self, metric='latency_mean_ms'):
+        """Create grouped bars of one metric per model and deployment"""
+        fig, ax = plt.subplots(figsize=(14, 7))
+
+        models = self.models()
+        width = 0.8 / len(DEPLOYMENTS)
+        x = np.arange(len(models))
+
+        for i, (deployment_name, config) in enumerate(DEPLOYMENTS.items()):
+            values = []
+            for model in models:
+                mask = (self.columns['model'] == model) & (self.columns['deployment'] == deployment_name)
+                column = self.columns[metric][mask]
+                column = column[np.isfinite(column)]
+                values.append(column.mean() if column.size else 0)
+            ax.bar(x + (i - (len(DEPLOYMENTS) - 1) / 2) * width, values, width,
+                  color=config['color'], label=config['label'])
+
+        is_latency = metric.startswith('latency')
+        ax.set_xticks(x)
+        ax.set_xticklabels(models)
+        ax.set_ylabel('Mean Latency (ms)' if is_latency else 'Throughput (FPS)',
+                     fontsize=14, fontweight='bold')
+        ax.set_title(self.title(f"{'Latency' if is_latency else 'Throughput'} by Model\n"
+                                f"{'Lower' if is_latency else 'Higher'} is Better"),
+                    fontsize=16, fontweight='bold', pad=20)
+        ax.legend(fontsize=11, loc='best')
+        ax.grid(True, alpha=0.3, axis='y')
+        if is_latency:
+            ax.set_yscale('log')
+
+        plt.tight_layout()
+        return fig
+
+    def figure_jobs(self):
+        """(relative path, builder, kwargs, columns, title label) for every figure"""
+        jobs = [
+            ("executive/01_summary_dashboard.png", 'create_comparative_summary', {}, self.columns, self.label),
+            ("executive/02_latency_comparison.png", 'create_latency_comparison', {}, self.columns, self.label),
+            ("executive/03_throughput_comparison.png", 'create_throughput_comparison', {}, self.columns, self.label),
+            ("executive/04_speedup_heatmap.png", 'create_speedup_heatmap', {}, self.columns, self.label),
+            ("executive/05_p95_comparison.png", 'create_p95_comparison', {}, self.columns, self.label),
+            ("executive/06_error_rate_comparison.png", 'create_error_rate_comparison', {}, self.columns, self.label),
+        ]
+
+        models = self.models()
+        if len(models) > 1:
+            for model in models:
+                columns = self.subset(self.columns['model'] == model)
+                jobs.append((f"per_model/{model}_latency_vs_concurrency.png", 'create_latency_comparison', {}, columns, model))
+                jobs.append((f"per_model/{model}_throughput_vs_concurrency.png", 'create_throughput_comparison', {}, columns, model))
+                jobs.append((f"per_model/{model}_speedup_vs_base.png", 'create_speedup_vs_concurrency', {}, columns, model))
+
+        if models:
+            for c in self.concurrency_levels:
+                columns = self.subset(self.columns['concurrency'] == c)
+                jobs.append((f"per_concurrency/concurrency_{c:02d}_latency.png", 'create_model_comparison',
+                             {'metric': 'latency_mean_ms'}, columns, f"C={c}"))
+                jobs.append((f"per_concurrency/concurrency_{c:02d}_throughput.png", 'create_model_comparison',
+                             {'metric': 'throughput_fps'}, columns, f"C={c}"))
+
+        return jobs
+
     def generate_text_report(self):
         """Generate comprehensive text analysis"""
         report = []
@@ -439,6 +473,8 @@ class BenchmarkVisualizer:
         report.append("="*80)
         report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         report.append(f"Concurrency Levels Tested: {self.concurrency_levels}")
+        report.append(f"Model: {self.model or 'all (averaged per deployment/concurrency)'}")
+        report.append(f"Runs: {len(self.columns['concurrency'])}")
         report.append("")
 
         # Best performers at each concurrency
@@ -453,13 +489,10 @@ class BenchmarkVisualizer:
             best_latency = None
             best_latency_name = None
             for deployment_name in DEPLOYMENTS.keys():
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        latency = data['mean_latency']
-                        if best_latency is None or latency < best_latency:
-                            best_latency = latency
-                            best_latency_name = deployment_name
+                latency = self.value(deployment_name, c, 'latency_mean_ms')
+                if latency is not None and (best_latency is None or latency < best_latency):
+                    best_latency = latency
+                    best_latency_name = deployment_name
 
             if best_latency_name:
                 report.append(f"  Lowest Latency: {best_latency_name} ({best_latency:.2f} ms)")
@@ -468,16 +501,10 @@ class BenchmarkVisualizer:
             best_throughput = None
             best_throughput_name = None
             for deployment_name in DEPLOYMENTS.keys():
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        if c == 1:
-                            fps = 1000.0 / data['mean_latency']
-                        else:
-                            fps = data['iterations'] / data['total_time']
-                        if best_throughput is None or fps > best_throughput:
-                            best_throughput = fps
-                            best_throughput_name = deployment_name
+                fps = self.value(deployment_name, c, 'throughput_fps')
+                if fps is not None and (best_throughput is None or fps > best_throughput):
+                    best_throughput = fps
+                    best_throughput_name = deployment_name
 
             if best_throughput_name:
                 report.append(f"  Highest Throughput: {best_throughput_name} ({best_throughput:.1f} FPS)")
@@ -521,96 +548,122 @@ class BenchmarkVisualizer:
             report.append("-" * 60)
 
             for deployment_name in DEPLOYMENTS.keys():
-                if deployment_name in self.data[c]:
-                    data = self.data[c][deployment_name]
-                    if data['status'] == 'success':
-                        mean_lat = data['mean_latency']
-                        p95 = data.get('p95', 0)
+                mean_lat = self.value(deployment_name, c, 'latency_mean_ms')
+                if mean_lat is None:
+                    continue
+                p95 = self.value(deployment_name, c, 'latency_p95_ms') or 0
+                fps = self.value(deployment_name, c, 'throughput_fps') or 0
+                error_pct = self.value(deployment_name, c, 'error_rate_pct') or 0
 
-                        if c == 1:
-                            fps = 1000.0 / mean_lat
-                        else:
-                            fps = data['iterations'] / data['total_time']
-
-                        errors = data.get('errors', 0)
-                        error_pct = (errors / data['iterations']) * 100
-
-                        report.append(f"{deployment_name:<20} {mean_lat:<12.2f} {p95:<12.2f} "
-                                    f"{fps:<12.1f} {error_pct:<8.1f}%")
+                report.append(f"{deployment_name:<20} {mean_lat:<12.2f} {p95:<12.2f} "
+                            f"{fps:<12.1f} {error_pct:<8.1f}%")
 
         return "\n".join(report)
 
-    def save_all_visualizations(self, output_dir=None):
-        """Generate and save all visualizations"""
+    def save_all_visualizations(self, output_dir=None, preview=False, jobs=None, force=False):
+        """Render all figures in a process pool, skipping those whose input data is unchanged"""
         if output_dir is None:
             output_dir = self.results_dir / "visualizations"
 
         output_dir = Path(output_dir)
-        output_dir.mkdir(exist_ok=True)
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-        print("\nGenerating visualizations...")
-
-        # 1. Latency comparison
-        print("  - Latency vs Concurrency...")
-        fig = self.create_latency_comparison()
-        fig.savefig(output_dir / f"latency_comparison_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 2. Throughput comparison
-        print("  - Throughput vs Concurrency...")
-        fig = self.create_throughput_comparison()
-        fig.savefig(output_dir / f"throughput_comparison_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 3. Speedup heatmap
-        print("  - Speedup Heatmap...")
-        fig = self.create_speedup_heatmap()
-        fig.savefig(output_dir / f"speedup_heatmap_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 4. P95 comparison
-        print("  - P95 Latency...")
-        fig = self.create_p95_comparison()
-        fig.savefig(output_dir / f"p95_comparison_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 5. Error rate comparison
-        print("  - Error Rates...")
-        fig = self.create_error_rate_comparison()
-        fig.savefig(output_dir / f"error_rate_comparison_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 6. Summary dashboard
-        print("  - Summary Dashboard...")
-        fig = self.create_comparative_summary()
-        fig.savefig(output_dir / f"summary_dashboard_{timestamp}.png",
-                   dpi=300, bbox_inches='tight')
-        plt.close(fig)
-
-        # 7. Text report
-        print("  - Text Report...")
+        if preview:
+            output_dir = output_dir / "preview"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        dpi = PREVIEW_DPI if preview else FULL_DPI
+
+        manifest_file = output_dir / MANIFEST_NAME
+        manifest = {}
+        if manifest_file.exists() and not force:
+            try:
+                manifest = json.loads(manifest_file.read_text())
+            except ValueError:
+                manifest = {}
+        if manifest.get('version') != RENDER_VERSION:
+            manifest = {'version': RENDER_VERSION, 'figures': {}}
+        figures = manifest['figures']
+
+        print(f"\nGenerating visualizations ({dpi} DPI)...")
+        started = time.perf_counter()
+
+        pending = []
+        skipped = 0
+        for path, builder, kwargs, columns, label in self.figure_jobs():
+            digest = data_hash(columns, builder, kwargs, label, dpi)
+            if figures.get(path) == digest and (output_dir / path).exists():
+                skipped += 1
+                continue
+            pending.append((str(output_dir / path), builder, kwargs, columns, label, dpi, path, digest))
+
+        workers = jobs or os.cpu_count() or 1
+        workers = max(1, min(workers, len(pending)))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(render_figure, job[:6]) for job in pending]
+                results = dict(future.result() for future in as_completed(futures))
+        else:
+            results = dict(render_figure(job[:6]) for job in pending)
+
+        for job in pending:
+            figures[job[6]] = job[7]
+            print(f"  - {job[6]} ({results[job[0]]:.1f}s)")
+        manifest_file.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+        # Text report is cheap; always regenerated
         report = self.generate_text_report()
-        report_file = output_dir / f"performance_analysis_{timestamp}.txt"
+        report_file = output_dir / "performance_analysis.txt"
         with open(report_file, 'w') as f:
             f.write(report)
 
-        print(f"\n✓ All visualizations saved to: {output_dir}")
-        print(f"  - 6 PNG graphs (300 DPI)")
+        # Interactive dashboard over every model (not just the --model filter)
+        dashboard_file = output_dir / "dashboard.html"
+        build_dashboard(to_arrays(self.records) if self.records else self.columns,
+                        dashboard_file, DEPLOYMENTS)
+
+        elapsed = time.perf_counter() - started
+        print(f"\n✓ Visualizations in: {output_dir}")
+        print(f"  - {len(pending)} figures rendered ({workers} workers), {skipped} unchanged and skipped")
         print(f"  - 1 text report")
-        print(f"\nFiles:")
-        for f in sorted(output_dir.glob(f"*_{timestamp}.*")):
-            print(f"  - {f.name}")
+        print(f"  - 1 interactive dashboard ({dashboard_file.name})")
+        print(f"  - {elapsed:.1f}s total")
 
         return output_dir
 
 
+def data_hash(columns, *params):
+    """Stable hash of the chart input columns and render parameters"""
+    h = hashlib.sha1()
+    for name in sorted(columns):
+        values = columns[name]
+        h.update(name.encode())
+        h.update(values.dtype.str.encode())
+        h.update(np.ascontiguousarray(values).tobytes())
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+def render_figure(job):
+    """Process-pool worker: build one figure from its columns and save it"""
+    path, builder, kwargs, columns, label, dpi = job
+    start = time.perf_counter()
+    viz = BenchmarkVisualizer.from_columns(columns, label)
+    fig = getattr(viz, builder)(**kwargs)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path, time.perf_counter() - start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render benchmark comparison charts")
+    parser.add_argument('files', nargs='*',
+                        help='Result files (.jsonl/.json/.csv); default: results dir store and all_results_*.json')
+    parser.add_argument('--model', default=None, help='Only plot this model (default: average across models)')
+    parser.add_argument('--output-dir', default=None, help='Output directory (default: <results dir>/visualizations)')
+    parser.add_argument('--preview', action='store_true',
+                        help=f'Fast {PREVIEW_DPI} DPI render into <output dir>/preview')
+    parser.add_argument('--jobs', type=int, default=None, help='Render worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Ignore the manifest and re-render every figure')
+    return parser.parse_args()
+
 def main():
     """Main execution"""
     print("="*80)
@@ -618,28 +671,32 @@ def main():
     print("="*80)
     print()
 
+    args = parse_args()
+
     # Initialize visualizer
-    viz = BenchmarkVisualizer()
+    viz = BenchmarkVisualizer(model=args.model)
 
     # Load results
-    if not viz.load_results():
+    if not viz.load_results(args.files or None):
         print("ERROR: No benchmark results found!")
         print("Please run benchmarks first using benchmark_all_pods.py")
         return 1
 
     # Generate all visualizations
-    output_dir = viz.save_all_visualizations()
+    output_dir = viz.save_all_visualizations(args.output_dir, preview=args.preview,
+                                             jobs=args.jobs, force=args.force)
 
     print("\n" + "="*80)
     print("VISUALIZATION COMPLETE!")
     print("="*80)
     print(f"\nOpen the files in: {output_dir}")
     print("\nRecommended viewing order:")
-    print("  1. summary_dashboard_*.png     - Overview of all metrics")
-    print("  2. speedup_heatmap_*.png       - TensorRT advantage visualization")
-    print("  3. latency_comparison_*.png    - Latency trends")
-    print("  4. throughput_comparison_*.png - Throughput analysis")
-    print("  5. performance_analysis_*.txt  - Detailed text report")
+    print("  1. executive/01_summary_dashboard.png   - Overview of all metrics")
+    print("  2. executive/04_speedup_heatmap.png     - TensorRT advantage visualization")
+    print("  3. executive/02_latency_comparison.png  - Latency trends")
+    print("  4. per_model/, per_concurrency/         - Per-model and per-concurrency detail")
+    print("  5. performance_analysis.txt             - Detailed text report")
+    print("  6. dashboard.html                       - Interactive, filterable dashboard")
     print()
 
     return 0
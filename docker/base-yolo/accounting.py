@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Per-request cost accounting for the base-yolo server
+CPU time, bytes in/out and sampled Python allocations of every request,
+summed over a window that GET /accounting reports per inference and per 1000
+inferences, for capacity planning
+
+CPU is counted two ways: each request thread's own CPU (time.thread_time),
+and the process CPU over the window (time.process_time), which also covers
+PyTorch / ONNX Runtime worker threads and background benchmark jobs.
+Allocations come from tracemalloc, switched on only for sampled requests (one
+at a time), so they include whatever other threads allocated meanwhile.
+Retained blocks are the difference of the block counts of snapshots taken at
+the start and end of the request: what it left allocated, not how many
+allocations it made. The window starts when the model is
+ready (server.load_model), so loading and warmup CPU are not counted.
+"""
+import random
+import threading
+import time
+import tracemalloc
+
+PER_INFERENCES = 1000
+
+# Snapshots leave out tracemalloc's own allocations (the start snapshot)
+OWN_TRACES = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+class CostAccounting:
+    """Window totals of request cost; begin()/end() around each request"""
+
+    def __init__(self, alloc_sample_rate=0.0, seed=None):
+        self.alloc_sample_rate = alloc_sample_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sampling = False
+        self.reset()
+
+    def reset(self):
+        """Start a new window"""
+        with self._lock:
+            self.window_start = time.perf_counter()
+            self.cpu_start = time.process_time()
+            self.requests = 0
+            self.inferences = 0
+            self.request_cpu_sec = 0.0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.alloc_samples = 0
+            self.alloc_peak_bytes = 0
+            self.retained_blocks = 0
+
+    def begin(self):
+        """Token for end(): the thread's CPU clock and the start snapshot of a traced request"""
+        start = None
+        if self.alloc_sample_rate and self._rng.random() < self.alloc_sample_rate:
+            with self._lock:
+                # One sample at a time, and never stop a trace someone else started
+                if not self._sampling and not tracemalloc.is_tracing():
+                    self._sampling = True
+                    tracemalloc.start()
+                    start = tracemalloc.take_snapshot().filter_traces(OWN_TRACES)
+        return time.thread_time(), start
+
+    def end(self, token, bytes_in=0, bytes_out=0):
+        """Record a finished request; returns its thread CPU seconds"""
+        cpu_start, start = token
+        cpu_sec = time.thread_time() - cpu_start
+        sampled = start is not None
+        peak = retained = 0
+        if sampled:
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot().filter_traces(OWN_TRACES)
+            tracemalloc.stop()
+            retained = sum(stat.count_diff for stat in snapshot.compare_to(start, 'filename'))
+        with self._lock:
+            self.requests += 1
+            self.request_cpu_sec += cpu_sec
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            if sampled:
+                self._sampling = False
+                self.alloc_samples += 1
+                self.alloc_peak_bytes += peak
+                self.retained_blocks += retained
+        return cpu_sec
+
+    def add_inferences(self, n=1):
+        with self._lock:
+            self.inferences += n
+
+    def report(self):
+        """Window totals and resources per inference / per 1000 inferences"""
+        with self._lock:
+            window_sec = time.perf_counter() - self.window_start
+            process_cpu_sec = time.process_time() - self.cpu_start
+            report = {
+                'window_sec': window_sec,
+                'requests': self.requests,
+                'inferences': self.inferences,
+                'process_cpu_sec': process_cpu_sec,
+                'process_cpu_pct': process_cpu_sec / window_sec * 100 if window_sec else 0.0,
+                'request_cpu_sec': self.request_cpu_sec,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'alloc_sample_rate': self.alloc_sample_rate,
+                'alloc_samples': self.alloc_samples,
+            }
+            if self.alloc_samples:
+                report['alloc_peak_bytes_per_request'] = self.alloc_peak_bytes / self.alloc_samples
+                report['retained_blocks_per_request'] = self.retained_blocks / self.alloc_samples
+        n = report['inferences']
+        if n:
+            report['per_inference'] = {
+                'process_cpu_ms': process_cpu_sec / n * 1000,
+                'request_cpu_ms': report['request_cpu_sec'] / n * 1000,
+                'bytes_in': report['bytes_in'] / n,
+                'bytes_out': report['bytes_out'] / n,
+            }
+            report[f'per_{PER_INFERENCES}_inferences'] = {
+                'process_cpu_sec': process_cpu_sec / n * PER_INFERENCES,
+                'request_cpu_sec': report['request_cpu_sec'] / n * PER_INFERENCES,
+                'mb_in': report['bytes_in'] / n * PER_INFERENCES / 1e6,
+                'mb_out': report['bytes_out'] / n * PER_INFERENCES / 1e6,
+            }
+        return report
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Inference backends for the base-yolo server
+Every backend takes BGR frames and returns per-image detections plus per-stage
+timings, so the server, result cache and stream endpoints do not depend on
+which runtime is serving the model
+
+  ultralytics  YOLO(model_path) on PyTorch (GPU when available)
+  onnxruntime  The model.onnx exported by convert_model.py on ONNX Runtime (CPU),
+               with IO binding into preallocated buffers, numpy NMS and a
+               cached optimized graph
+"""
+import hashlib
+import os
+import platform
+import threading
+import time
+
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+from nms import decode
+from profiles import ExecutionProfile
+from startup import phase
+
+BACKENDS = ('ultralytics', 'onnxruntime')
+
+# Ultralytics NMS defaults
+MAX_DETECTIONS = 300
+LETTERBOX_FILL = 114
+
+class UltralyticsBackend:
+    """PyTorch YOLO through Ultralytics predict() under an execution profile
+
+    The serving backend (primary) applies the profile's process-wide torch
+    settings; extra instances (benchmark job threads) share them, and other
+    profiles are benchmarked in their own process (profile_worker.py).
+    """
+
+    name = 'ultralytics'
+
+    def __init__(self, model_path, tracker=None, profile=None, primary=True):
+        with phase(tracker, 'imports'):
+            import torch
+            from ultralytics import YOLO
+
+        self.torch = torch
+        self.model_path = model_path
+        self.profile = profile or ExecutionProfile('default')
+        with phase(tracker, 'weights_load'):
+            self.model = YOLO(model_path)
+        with phase(tracker, 'device_move'):
+            # First CUDA call also creates the context
+            self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            self.model.to(self.device)
+        if primary:
+            self.profile.apply_torch(torch, self.device)
+        else:
+            self.profile.resolve_device(self.device)
+        self._channels_last_done = False
+
+    def predict(self, images, **params):
+        """(detections per image, {stage: ms}) for one frame or a list of frames"""
+        with self.profile.inference_context(self.torch):
+            results = self.model(images, half=self.profile.half, **params)
+        if self.profile.channels_last and not self._channels_last_done and self.model.predictor is not None:
+            # The predictor fuses Conv+BN on its first call, creating new weights;
+            # convert after that so the fused weights are the ones in NHWC
+            self.model.predictor.model.to(memory_format=self.torch.channels_last)
+            self._channels_last_done = True
+        stages = {}
+        if results:
+            # speed is ms per image, averaged over the batch
+            for stage in ('preprocess', 'inference', 'postprocess'):
+                stages[stage] = results[0].speed.get(stage, 0.0) * len(results)
+
+        start = time.perf_counter()
+        detections = [self.extract(r) for r in results]
+        stages['extract'] = (time.perf_counter() - start) * 1000
+        return detections, stages
+
+    @staticmethod
+    def extract(result):
+        """Convert one Ultralytics result to JSON-serializable detections"""
+        detections = []
+        for box in result.boxes:
+            detections.append({
+                'bbox': box.xyxy[0].cpu().numpy().tolist(),
+                'confidence': float(box.conf[0]),
+                'class': int(box.cls[0])
+            })
+        return detections
+
+    def describe(self):
+        return {'backend': self.name, 'device': self.device, 'model_path': self.model_path,
+                'profile': self.profile.name}
+
+def letterbox_into(img, out, imgsz):
+    """Resize with unchanged aspect ratio and pad into out (3, imgsz, imgsz) float32 RGB [0, 1]
+
+    Returns (gain, pad_x, pad_y) to map boxes back to the original frame.
+    """
+    h, w = img.shape[:2]
+    gain = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    pad_x, pad_y = (imgsz - new_w) // 2, (imgsz - new_h) // 2
+
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_FILL, dtype=np.uint8)
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = img
+    # BGR HWC uint8 -> RGB CHW float32, written straight into the bound input buffer
+    np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), 1 / 255.0, out=out, casting='unsafe')
+    return gain, pad_x, pad_y
+
+def postprocess(pred, conf, iou, gain, pad_x, pad_y, shape):
+    """Decode one (4 + classes, anchors) YOLOv8 output to detections in frame coordinates"""
+    boxes, scores, cls = decode(pred, conf, iou, MAX_DETECTIONS)
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / gain).clip(0, shape[1])
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / gain).clip(0, shape[0])
+    return [{'bbox': b.tolist(), 'confidence': float(s), 'class': int(c)}
+            for b, s, c in zip(boxes, scores, cls)]
+
+class _Buffers:
+    """Preallocated input/output arrays for one batch size, bound once to an IOBinding"""
+
+    def __init__(self, session, batch, imgsz, output_shape, ort, io_binding):
+        self.input = np.zeros((batch, 3, imgsz, imgsz), dtype=np.float32)
+        self.output = np.empty((batch,) + tuple(output_shape[1:]), dtype=np.float32)
+        self.binding = None
+        if io_binding:
+            # OrtValues wrap the numpy memory: inputs are read and outputs written in place
+            self.binding = session.io_binding()
+            self.binding.bind_ortvalue_input(session.get_inputs()[0].name,
+                                             ort.OrtValue.ortvalue_from_numpy(self.input))
+            self.binding.bind_ortvalue_output(session.get_outputs()[0].name,
+                                              ort.OrtValue.ortvalue_from_numpy(self.output))
+
+class OnnxRuntimeBackend:
+    """YOLOv8 ONNX model on ONNX Runtime with IO binding and numpy postprocessing"""
+
+    name = 'onnxruntime'
+
+    def __init__(self, model_path, imgsz=640, intra_op_threads=0, inter_op_threads=1,
+                 io_binding=True, cache_dir=None, providers=None, tracker=None, profile=None):
+        with phase(tracker, 'imports'):
+            import onnxruntime as ort
+
+        self.ort = ort
+        self.model_path = model_path
+        # Only the profile's thread counts apply to ONNX Runtime (see create_backend)
+        self.profile = profile or ExecutionProfile('default')
+        self.profile.resolve_device('cpu')
+        self.profile.applied['applies'] = 'threads only'
+        self.imgsz = imgsz
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.io_binding = io_binding
+        self.providers = providers or ['CPUExecutionProvider']
+        self.device = 'cuda' if 'CUDAExecutionProvider' in self.providers else 'cpu'
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads  # 0 = one per physical core
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = (ort.ExecutionMode.ORT_PARALLEL if inter_op_threads > 1
+                                  else ort.ExecutionMode.ORT_SEQUENTIAL)
+
+        self.optimized_path = None
+        self.optimized_cached = False
+        load_path = model_path
+        tmp_path = None
+        if cache_dir:
+            self.optimized_path = self._optimized_path(cache_dir)
+            if os.path.isfile(self.optimized_path):
+                # Already optimized for this model, ORT version and CPU: skip graph optimization
+                load_path = self.optimized_path
+                self.optimized_cached = True
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+            else:
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                tmp_path = f"{self.optimized_path}.tmp{os.getpid()}"
+                options.optimized_model_filepath = tmp_path
+        else:
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        start = time.perf_counter()
+        try:
+            with phase(tracker, 'weights_load'):
+                self.session = ort.InferenceSession(load_path, sess_options=options, providers=self.providers)
+            self.load_ms = (time.perf_counter() - start) * 1000
+            if tmp_path and os.path.isfile(tmp_path):
+                os.replace(tmp_path, self.optimized_path)
+        finally:
+            # A failed load can leave a partial optimized model behind: never cache it
+            if tmp_path and os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+
+        self.input_name = self.session.get_inputs()[0].name
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        # Static-batch exports take fixed-size chunks; dynamic exports take the whole list
+        self.static_batch = batch_dim if isinstance(batch_dim, int) else None
+        self._output_shapes = {}
+        # Free buffers per batch size; a call checks one out so concurrent calls never share
+        # bound memory (thread-locals would be rebuilt per request: Werkzeug starts a thread per connection)
+        self._pool = {}
+        self._pool_lock = threading.Lock()
+        self.buffers_created = 0
+
+    def _optimized_path(self, cache_dir):
+        """Cache file keyed by model content, ORT version and CPU (ORT_ENABLE_ALL layouts are CPU specific)"""
+        h = hashlib.sha256()
+        with open(self.model_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        h.update(f"{self.ort.__version__}|{platform.machine()}|{platform.processor()}|{self.providers}".encode())
+        os.makedirs(cache_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(self.model_path))[0]
+        return os.path.join(cache_dir, f"{stem}.{h.hexdigest()[:16]}.ort.onnx")
+
+    @contextmanager
+    def _buffers(self, batch):
+        """Check out a free buffer set for `batch` (a new one when all are in use); returned on exit"""
+        with self._pool_lock:
+            free = self._pool.setdefault(batch, [])
+            buf = free.pop() if free else None
+        if buf is None:
+            if batch not in self._output_shapes:
+                # Dynamic output dims (anchors) are only known after one run
+                probe = np.zeros((batch, 3, self.imgsz, self.imgsz), dtype=np.float32)
+                self._output_shapes[batch] = self.session.run(None, {self.input_name: probe})[0].shape
+            buf = _Buffers(self.session, batch, self.imgsz, self._output_shapes[batch], self.ort, self.io_binding)
+            with self._pool_lock:
+                self.buffers_created += 1
+        try:
+            yield buf
+        finally:
+            with self._pool_lock:
+                self._pool[batch].append(buf)
+
+    def _run(self, buf):
+        if buf.binding is not None:
+            self.session.run_with_iobinding(buf.binding)
+        else:
+            buf.output[...] = self.session.run(None, {self.input_name: buf.input})[0]
+        return buf.output
+
+    def predict(self, images, conf=0.25, iou=0.7):
+        """(detections per image, {stage: ms}) for one frame or a list of frames"""
+        if isinstance(images, np.ndarray) and images.ndim == 3:
+            images = [images]
+        stages = {'preprocess': 0.0, 'inference': 0.0, 'postprocess': 0.0}
+        chunk = self.static_batch or len(images)
+        detections = []
+        for i in range(0, len(images), chunk):
+            frames = images[i:i + chunk]
+            with self._buffers(chunk) as buf:
+                start = time.perf_counter()
+                letterboxes = [letterbox_into(img, buf.input[j], self.imgsz) for j, img in enumerate(frames)]
+                t1 = time.perf_counter()
+                output = self._run(buf)
+                t2 = time.perf_counter()
+                for j, img in enumerate(frames):
+                    detections.append(postprocess(output[j], conf, iou, *letterboxes[j], img.shape))
+                t3 = time.perf_counter()
+
+            stages['preprocess'] += (t1 - start) * 1000
+            stages['inference'] += (t2 - t1) * 1000
+            stages['postprocess'] += (t3 - t2) * 1000
+        return detections, stages
+
+    def describe(self):
+        return {
+            'backend': self.name,
+            'device': self.device,
+            'model_path': self.model_path,
+            'profile': self.profile.name,
+            'providers': self.providers,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            'io_binding': self.io_binding,
+            'buffers_created': self.buffers_created,
+            'optimized_model': self.optimized_path,
+            'optimized_model_cached': self.optimized_cached,
+            'session_load_ms': round(self.load_ms, 1),
+        }
+
+def create_backend(name, model_path, tracker=None, profile=None, primary=True):
+    """Backend selected by INFERENCE_BACKEND, configured from the environment
+
+    ORT_*_THREADS, when set, override the execution profile's thread counts.
+    """
+    profile = profile or ExecutionProfile('default')
+    if name == 'ultralytics':
+        return UltralyticsBackend(model_path, tracker=tracker, profile=profile, primary=primary)
+    if name == 'onnxruntime':
+        onnx_path = os.getenv("ONNX_MODEL_PATH", os.path.splitext(model_path)[0] + '.onnx')
+        return OnnxRuntimeBackend(
+            onnx_path,
+            imgsz=int(os.getenv("ONNX_IMGSZ", "640")),
+            intra_op_threads=int(os.getenv("ORT_INTRA_OP_THREADS", profile.intra_op_threads or 0)),
+            inter_op_threads=int(os.getenv("ORT_INTER_OP_THREADS", profile.inter_op_threads or 1)),
+            io_binding=os.getenv("ORT_IO_BINDING", "1") == "1",
+            cache_dir=os.getenv("ORT_OPTIMIZED_MODEL_DIR", "/tmp/ort-cache") or None,
+            providers=[p.strip() for p in os.getenv("ORT_PROVIDERS", "CPUExecutionProvider").split(',')],
+            tracker=tracker,
+            profile=profile,
+        )
+    raise ValueError(f"Unknown INFERENCE_BACKEND: {name} (use one of {', '.join(BACKENDS)})")
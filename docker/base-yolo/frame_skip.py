@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Perceptual near-duplicate frame skipping for video streams
+Consecutive frames from fixed cameras often differ only by sensor noise;
+frames whose downsampled signature is close to the last inferred frame reuse
+its detections instead of running the model again
+"""
+import threading
+import time
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+SIGNATURE_SIZE = 16
+
+def frame_signature(img, size=SIGNATURE_SIZE):
+    """Downsampled grayscale signature in [0, 1] (size x size float32)"""
+    gray = img.mean(axis=2, dtype=np.float32) if img.ndim == 3 else img.astype(np.float32)
+    if cv2 is not None:
+        small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA)
+    else:
+        # Block mean over the largest crop divisible by size
+        h, w = gray.shape
+        bh, bw = max(1, h // size), max(1, w // size)
+        small = gray[:bh * size, :bw * size].reshape(size, bh, size, bw).mean(axis=(1, 3))
+    return small * (1.0 / 255.0)
+
+def signature_distance(a, b):
+    """Mean absolute difference between two signatures (0 = identical, 1 = black vs. white)"""
+    return float(np.abs(a - b).mean())
+
+class FrameSkipper:
+    """Per-stream skip decision state and skip/inference statistics"""
+
+    def __init__(self, threshold=0.02, max_stale_frames=30, max_stale_ms=1000.0):
+        self.threshold = threshold
+        self.max_stale_frames = max_stale_frames  # 0 = unbounded
+        self.max_stale_ms = max_stale_ms          # 0 = unbounded
+
+        self.lock = threading.Lock()
+        self.last_signature = None
+        self.last_params = None
+        self.last_detections = None
+        self.last_inferred_at = None
+        self.frames_since_inference = 0
+        self.last_seen = time.monotonic()
+
+        self.frames = 0
+        self.inferred = 0
+        self.skipped = 0
+        self.infer_time_ms = 0.0
+        self.skip_time_ms = 0.0
+
+    def check(self, signature, params=None):
+        """Return (reuse_detections, distance) for a new frame's signature"""
+        self.last_seen = time.monotonic()
+        if self.last_signature is None or params != self.last_params:
+            return False, None
+
+        distance = signature_distance(signature, self.last_signature)
+        if distance > self.threshold:
+            return False, distance
+        if self.max_stale_frames and self.frames_since_inference >= self.max_stale_frames:
+            return False, distance
+        if self.max_stale_ms and (time.monotonic() - self.last_inferred_at) * 1000 >= self.max_stale_ms:
+            return False, distance
+        return True, distance
+
+    def record_inference(self, signature, detections, elapsed_ms, params=None):
+        self.last_signature = signature
+        self.last_params = params
+        self.last_detections = detections
+        self.last_inferred_at = time.monotonic()
+        self.frames_since_inference = 0
+        self.frames += 1
+        self.inferred += 1
+        self.infer_time_ms += elapsed_ms
+
+    def record_skip(self, elapsed_ms):
+        self.frames_since_inference += 1
+        self.frames += 1
+        self.skipped += 1
+        self.skip_time_ms += elapsed_ms
+
+    def stale_ms(self):
+        if self.last_inferred_at is None:
+            return 0.0
+        return (time.monotonic() - self.last_inferred_at) * 1000
+
+    def stats(self):
+        """Skip ratio and FPS with skipping vs. running the model on every frame"""
+        avg_infer_ms = self.infer_time_ms / self.inferred if self.inferred else 0.0
+        busy_ms = self.infer_time_ms + self.skip_time_ms
+        baseline_fps = 1000.0 / avg_infer_ms if avg_infer_ms else 0.0
+        effective_fps = self.frames * 1000.0 / busy_ms if busy_ms else 0.0
+        return {
+            'threshold': self.threshold,
+            'max_stale_frames': self.max_stale_frames,
+            'max_stale_ms': self.max_stale_ms,
+            'frames': self.frames,
+            'inferred': self.inferred,
+            'skipped': self.skipped,
+            'skip_ratio': self.skipped / self.frames if self.frames else 0.0,
+            'avg_infer_ms': avg_infer_ms,
+            'avg_skip_ms': self.skip_time_ms / self.skipped if self.skipped else 0.0,
+            'baseline_fps': baseline_fps,
+            'effective_fps': effective_fps,
+            'fps_gain': effective_fps / baseline_fps if baseline_fps else 0.0,
+        }
+
+class StreamRegistry:
+    """FrameSkipper per stream ID, dropping streams idle past a timeout"""
+
+    def __init__(self, idle_timeout_sec=300.0, **skipper_defaults):
+        self.idle_timeout_sec = idle_timeout_sec
+        self.skipper_defaults = skipper_defaults
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def get(self, stream_id, **overrides):
+        """Existing skipper for stream_id, or a new one (overrides apply on creation)"""
+        with self._lock:
+            self._expire()
+            skipper = self._streams.get(stream_id)
+            if skipper is None:
+                settings = {**self.skipper_defaults,
+                            **{k: v for k, v in overrides.items() if v is not None}}
+                skipper = FrameSkipper(**settings)
+                self._streams[stream_id] = skipper
+            return skipper
+
+    def find(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def remove(self, stream_id):
+        with self._lock:
+            return self._streams.pop(stream_id, None)
+
+    def _expire(self):
+        now = time.monotonic()
+        idle = [sid for sid, s in self._streams.items()
+                if now - s.last_seen > self.idle_timeout_sec]
+        for sid in idle:
+            del self._streams[sid]
+
+    def __len__(self):
+        return len(self._streams)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Background benchmark jobs for the base-yolo server
+/benchmark runs as a job on its own thread instead of inside the request
+handler: clients get a job id, poll or stream progress with a partial latency
+histogram, and can cancel. A job yields to serving traffic (waits while
+/infer-style requests are in flight), and one job can sweep execution
+profiles, batch sizes and inference thread counts
+
+Each job thread gets its own predictor, never the serving backend:
+predictors are not thread-safe, so threads sharing one would race (or, under
+INFERENCE_LOCK, be serialized and measure nothing). A ServingGate holds job
+calls back while request inference is running or waiting. It never makes a
+request wait, but a call already running is not interrupted: a request can
+share the CPU with at most one in-flight call per job thread.
+"""
+import bisect
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+QUEUED, RUNNING, DONE, CANCELLED, FAILED = 'queued', 'running', 'done', 'cancelled', 'failed'
+FINISHED = (DONE, CANCELLED, FAILED)
+
+# Log-spaced latency buckets (ms): 0.5 ms .. ~60 s, ~10% wide
+HISTOGRAM_BOUNDS_MS = tuple(round(0.5 * 1.1 ** i, 3) for i in range(124))
+YIELD_SLEEP_SEC = 0.002
+
+def percentiles(latencies):
+    """min/mean/percentile summary of latencies in ms (jobs and /stream/video)"""
+    x = sorted(latencies)
+    if not x:
+        return {}
+    n = len(x)
+    return {
+        'min': x[0],
+        'max': x[-1],
+        'mean': sum(x) / n,
+        'p50': x[int(n * 0.50)],
+        'p90': x[int(n * 0.90)],
+        'p95': x[int(n * 0.95)],
+        'p99': x[min(n - 1, int(n * 0.99))],
+    }
+
+class LatencyHistogram:
+    """Fixed log-bucket histogram; non-empty buckets as [upper bound ms, count]"""
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+
+    def to_list(self):
+        bounds = HISTOGRAM_BOUNDS_MS + ('inf',)
+        return [[bounds[i], c] for i, c in enumerate(self.counts) if c]
+
+class BenchmarkJob:
+    """One benchmark run over every (profile, batch size, threads) configuration
+
+    A profile of None means the serving profile as it is.
+    """
+
+    def __init__(self, iterations=100, warmup=10, batch_sizes=(1,), threads=(1,), profiles=(None,)):
+        self.id = uuid.uuid4().hex[:12]
+        self.iterations = iterations
+        self.warmup = warmup
+        self.configs = [(p, b, t) for p in profiles for b in batch_sizes for t in threads]
+        self.state = QUEUED
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.results = []
+        self.cancel_event = threading.Event()
+
+        # Progress of the configuration being measured
+        self.current = None
+        self.completed = 0
+        self.latencies = []
+        self.histogram = None
+        self.config_start = None
+        self.yield_ms = 0.0
+
+        self._cond = threading.Condition()
+        self.version = 0
+
+    def _changed(self):
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+
+    def wait_update(self, version, timeout):
+        """Block until the job changes past `version` (or timeout); returns the new version"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def cancel(self):
+        self.cancel_event.set()
+        self._changed()
+
+    def status(self):
+        with self._cond:
+            progress = None
+            if self.current is not None:
+                elapsed = time.perf_counter() - self.config_start
+                progress = {
+                    'profile': self.current[0],
+                    'batch_size': self.current[1],
+                    'threads': self.current[2],
+                    'completed': self.completed,
+                    'iterations': self.iterations,
+                    'elapsed_sec': round(elapsed, 3),
+                    'yield_ms': round(self.yield_ms, 1),
+                    'latency_ms': percentiles(self.latencies),
+                    'histogram': self.histogram.to_list(),
+                }
+            return {
+                'job_id': self.id,
+                'state': self.state,
+                'error': self.error,
+                'configs': [{'profile': p, 'batch_size': b, 'threads': t} for p, b, t in self.configs],
+                'configs_done': len(self.results),
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+                'progress': progress,
+                'results': list(self.results),
+            }
+
+def run_config(job, predictors, frames, profile, batch, threads, gate):
+    """Measure one (profile, batch size, threads) configuration; returns its result dict
+
+    predictors holds one predict function per thread.
+    """
+    inputs = frames[0] if batch == 1 else [frames[i % len(frames)] for i in range(batch)]
+    for predict in predictors[:threads]:
+        for _ in range(job.warmup):
+            with gate.background(job.cancel_event) as waited:
+                if waited is None:
+                    return None
+                predict(inputs)
+
+    with job._cond:
+        job.current = (profile, batch, threads)
+        job.completed = 0
+        job.latencies = []
+        job.histogram = LatencyHistogram()
+        job.config_start = time.perf_counter()
+        job.yield_ms = 0.0
+    job._changed()
+
+    tickets = itertools.count()
+    last_notify = [time.perf_counter()]
+    errors = []
+
+    def worker(predict):
+        try:
+            measure(predict)
+        except Exception as e:
+            errors.append(e)
+            job.cancel_event.set()
+
+    def measure(predict):
+        while not job.cancel_event.is_set() and next(tickets) < job.iterations:
+            # Serving traffic first: wait while requests are being inferred
+            with gate.background(job.cancel_event) as waited:
+                if waited is None:
+                    break
+                start = time.perf_counter()
+                predict(inputs)
+                ms = (time.perf_counter() - start) * 1000
+            with job._cond:
+                job.yield_ms += waited
+                job.completed += 1
+                job.latencies.append(ms)
+                job.histogram.observe(ms)
+                notify = time.perf_counter() - last_notify[0] > 0.25
+                if notify:
+                    last_notify[0] = time.perf_counter()
+            if notify:
+                job._changed()
+
+    workers = [threading.Thread(target=worker, args=(p,), daemon=True) for p in predictors[:threads]]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    if errors:
+        raise errors[0]
+
+    with job._cond:
+        total_sec = time.perf_counter() - job.config_start
+        # Time spent yielding is not benchmark time
+        busy_sec = max(total_sec - job.yield_ms / 1000 / threads, 1e-9)
+        result = {
+            'profile': profile,
+            'batch_size': batch,
+            'threads': threads,
+            'iterations': job.completed,
+            'images': job.completed * batch,
+            'total_time_sec': total_sec,
+            'yield_ms': job.yield_ms,
+            'fps': job.completed * batch / busy_sec,
+            'calls_per_sec': job.completed / busy_sec,
+            'latency_ms': percentiles(job.latencies),
+            'histogram': job.histogram.to_list(),
+            'complete': job.completed >= job.iterations,
+        }
+        job.current = None
+    return result
+
+class ServingGate:
+    """Serving calls run freely; background calls wait until no serving call is in progress
+
+    Serving calls never wait on background ones: the gate only decides when a
+    background call may start.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._serving = 0
+
+    @contextmanager
+    def serving(self):
+        with self._cond:
+            self._serving += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._serving -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def background(self, cancel=None):
+        """Yields the ms spent waiting, or None if `cancel` was set while waiting"""
+        start = time.perf_counter()
+        with self._cond:
+            while self._serving and not (cancel is not None and cancel.is_set()):
+                self._cond.wait(YIELD_SLEEP_SEC * 50)
+            acquired = not self._serving
+        if not acquired:
+            yield None
+            return
+        yield (time.perf_counter() - start) * 1000
+
+class JobManager:
+    """Runs benchmark jobs one at a time on a worker thread; keeps the last `history` jobs
+
+    profile_scope(name, count) is a context manager yielding `count` predict
+    functions for an execution profile (None: the serving one), one per job
+    thread, set up before and torn down after its configurations.
+    """
+
+    def __init__(self, profile_scope, frames, gate=None, history=20):
+        self.profile_scope = profile_scope
+        self.frames = frames
+        self.gate = gate or ServingGate()
+        self.history = history
+        self.jobs = OrderedDict()
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        threading.Thread(target=self._loop, name='benchmark-jobs', daemon=True).start()
+
+    def submit(self, job):
+        with self._lock:
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                oldest = next(iter(self.jobs.values()))
+                if oldest.state not in FINISHED:
+                    break
+                self.jobs.popitem(last=False)
+            self._queue.append(job)
+        self._wake.set()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [{'job_id': j.id, 'state': j.state, 'created': j.created} for j in self.jobs.values()]
+
+    def _loop(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                job = self._queue.popleft() if self._queue else None
+                if not self._queue:
+                    self._wake.clear()
+            if job is not None:
+                self._run(job)
+
+    def _run(self, job):
+        if job.cancel_event.is_set():
+            job.state = CANCELLED
+            job.finished = time.time()
+            job._changed()
+            return
+        job.state = RUNNING
+        job.started = time.time()
+        job._changed()
+        try:
+            profiles = list(OrderedDict.fromkeys(p for p, _, _ in job.configs))
+            for profile in profiles:
+                if job.cancel_event.is_set():
+                    break
+                count = max(t for p, _, t in job.configs if p == profile)
+                with self.profile_scope(profile, count) as predictors:
+                    for p, batch, threads in job.configs:
+                        if p != profile:
+                            continue
+                        result = run_config(job, predictors, self.frames, profile, batch, threads, self.gate)
+                        if result is not None:
+                            with job._cond:
+                                job.results.append(result)
+                        if job.cancel_event.is_set():
+                            break
+            job.state = CANCELLED if job.cancel_event.is_set() else DONE
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+        job.finished = time.time()
+        job._changed()
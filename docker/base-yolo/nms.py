@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+YOLOv8 output decode and non-maximum suppression, shared by the onnxruntime
+backend (backends.py), the Triton top-K post-processing model
+(scripts/yolo_postprocess.py, which nim-grpc installs with a copy of this file
+beside its model.py) and the benchmark clients' detection counts
+(benchmarking/image_corpus.py, copied into the pods with the other helpers)
+Numpy only, so it imports in Triton's Python backend as well as in the server
+"""
+import numpy as np
+
+# Ultralytics NMS defaults
+MAX_NMS_CANDIDATES = 30000
+MAX_WH = 7680  # class offset for batched per-class NMS
+
+def nms(boxes, scores, iou_thres):
+    """Greedy non-maximum suppression; indices of kept boxes, highest score first"""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_thres]
+    return np.asarray(keep, dtype=np.int64)
+
+def decode(pred, conf, iou, max_det=None):
+    """One (4 + classes, anchors) output -> (boxes xyxy, scores, classes) after the
+    confidence filter and class-aware NMS, highest score first, at most max_det rows"""
+    class_scores = pred[4:]
+    cls = class_scores.argmax(axis=0)
+    scores = class_scores[cls, np.arange(class_scores.shape[1])]
+    mask = scores > conf
+    if not mask.any():
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+    xywh, cls, scores = pred[:4, mask].T, cls[mask], scores[mask]
+    if len(scores) > MAX_NMS_CANDIDATES:
+        top = scores.argsort()[::-1][:MAX_NMS_CANDIDATES]
+        xywh, cls, scores = xywh[top], cls[top], scores[top]
+
+    boxes = np.empty((len(xywh), 4), dtype=np.float32)
+    boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+    boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+    # Per-class NMS in one pass by shifting each class to its own region
+    keep = nms(boxes + (cls * MAX_WH)[:, None], scores, iou)[:max_det]
+    return boxes[keep], scores[keep], cls[keep]
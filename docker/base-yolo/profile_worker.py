@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Execution profile worker for base-yolo benchmark jobs
+Torch thread counts and the other profile settings are process-wide, so a
+benchmark job measuring a profile other than the serving one runs that
+profile's backend in this child process instead of switching the server's
+settings under live /infer traffic
+
+Protocol: pickled messages over the child's stdin/stdout (its own prints go to stderr)
+  parent -> child  (backend, model_path, profile, frames, params), then one
+                   batch size per predict call; None to exit
+  child -> parent  ('ok', describe()) once loaded, then ('ok', None) or
+                   ('error', message) per call
+
+The child builds each call's inputs from its copy of the frames exactly as
+jobs.run_config does, so only the batch size crosses the pipe per call.
+"""
+import os
+import pickle
+import subprocess
+import sys
+
+class ProfileWorker:
+    """Backend for one execution profile in a child process; predict() blocks until the call is done"""
+
+    def __init__(self, backend, model_path, profile, frames, params=None):
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.process = subprocess.Popen([sys.executable, os.path.join(here, 'profile_worker.py')],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=here)
+        try:
+            self._send((backend, model_path, profile, list(frames), params or {}))
+            self.info = self._recv()
+        except Exception:
+            self.close()
+            raise
+
+    def _send(self, message):
+        pickle.dump(message, self.process.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        self.process.stdin.flush()
+
+    def _recv(self):
+        try:
+            status, payload = pickle.load(self.process.stdout)
+        except EOFError:
+            raise RuntimeError(f"profile worker exited (code {self.process.poll()})")
+        if status != 'ok':
+            raise RuntimeError(f"profile worker: {payload}")
+        return payload
+
+    def predict(self, inputs):
+        self._send(len(inputs) if isinstance(inputs, list) else 1)
+        self._recv()
+
+    def close(self):
+        try:
+            self._send(None)
+            self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+
+def main():
+    # Keep the protocol stream to ourselves: library prints go to stderr
+    out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    inp = sys.stdin.buffer
+
+    def reply(status, payload=None):
+        pickle.dump((status, payload), out, protocol=pickle.HIGHEST_PROTOCOL)
+        out.flush()
+
+    from backends import create_backend
+    from profiles import ExecutionProfile
+
+    backend_name, model_path, profile, frames, params = pickle.load(inp)
+    try:
+        # Primary: this process is the profile's, so its process-wide settings apply
+        backend = create_backend(backend_name, model_path, profile=ExecutionProfile(profile))
+    except Exception as e:
+        reply('error', f"{type(e).__name__}: {e}")
+        return 1
+    reply('ok', backend.describe())
+
+    while True:
+        try:
+            batch = pickle.load(inp)
+        except EOFError:
+            return 0
+        if batch is None:
+            return 0
+        inputs = frames[0] if batch == 1 else [frames[i % len(frames)] for i in range(batch)]
+        try:
+            backend.predict(inputs, **params)
+            reply('ok')
+        except Exception as e:
+            reply('error', f"{type(e).__name__}: {e}")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Execution profiles for the base-yolo server
+Named bundles of PyTorch / ONNX Runtime execution settings (inference mode,
+thread counts, channels-last, half precision, cuDNN autotuning), so the
+baseline NIMs are compared against is tuned the same way every time
+
+  default     Library defaults (the untuned reference)
+  latency     One request at a time as fast as possible: all CPU threads per call,
+              FP16 + channels-last + cuDNN autotuning on CUDA
+  throughput  Many concurrent requests/batches: few threads per call, more
+              inter-op parallelism, FP16 + channels-last on CUDA
+  cpu-max     CPU-only serving: all threads, channels-last (oneDNN NHWC kernels),
+              FP32, denormals flushed
+"""
+import os
+from contextlib import nullcontext
+
+# Thread counts: int = absolute, float = fraction of the CPUs available to the container
+PROFILES = {
+    'default': {
+        'inference_mode': False, 'half': False, 'channels_last': False, 'cudnn_benchmark': False,
+        'intra_op_threads': None, 'inter_op_threads': None, 'flush_denormal': False,
+    },
+    'latency': {
+        'inference_mode': True, 'half': True, 'channels_last': True, 'cudnn_benchmark': True,
+        'intra_op_threads': 1.0, 'inter_op_threads': 1, 'flush_denormal': False,
+    },
+    'throughput': {
+        'inference_mode': True, 'half': True, 'channels_last': True, 'cudnn_benchmark': True,
+        'intra_op_threads': 0.25, 'inter_op_threads': 2, 'flush_denormal': False,
+    },
+    'cpu-max': {
+        'inference_mode': True, 'half': False, 'channels_last': True, 'cudnn_benchmark': False,
+        'intra_op_threads': 1.0, 'inter_op_threads': 1, 'flush_denormal': True,
+    },
+}
+
+def available_cpus():
+    """CPUs this container may use: cgroup CPU limit if set, else the affinity mask"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if quota > 0:
+                cpus = min(cpus, max(1, quota // period))
+        except (OSError, ValueError):
+            pass
+    return cpus
+
+def _resolve_threads(value, cpus):
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return max(1, int(cpus * value))
+    return value
+
+class ExecutionProfile:
+    """Resolved settings of one profile for this container"""
+
+    def __init__(self, name='default', cpus=None):
+        if name not in PROFILES:
+            raise ValueError(f"Unknown EXECUTION_PROFILE: {name} (use one of {', '.join(PROFILES)})")
+        settings = PROFILES[name]
+        self.name = name
+        self.cpus = cpus or available_cpus()
+        self.inference_mode = settings['inference_mode']
+        self.half = settings['half']
+        self.channels_last = settings['channels_last']
+        self.cudnn_benchmark = settings['cudnn_benchmark']
+        self.flush_denormal = settings['flush_denormal']
+        self.intra_op_threads = _resolve_threads(settings['intra_op_threads'], self.cpus)
+        self.inter_op_threads = _resolve_threads(settings['inter_op_threads'], self.cpus)
+        self.applied = {}
+
+    def resolve_device(self, device):
+        """FP16 only where it helps: CUDA"""
+        self.half = self.half and device == 'cuda'
+
+    def apply_torch(self, torch, device):
+        """Process-wide torch settings; call once at startup before any inference"""
+        self.resolve_device(device)
+        if self.intra_op_threads:
+            torch.set_num_threads(self.intra_op_threads)
+        if self.inter_op_threads:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                # Only settable before the first inter-op parallel work
+                self.applied['inter_op_threads'] = 'ignored (already started)'
+        if device == 'cuda':
+            torch.backends.cudnn.benchmark = self.cudnn_benchmark
+        if self.flush_denormal:
+            torch.set_flush_denormal(True)
+        self.applied['torch_threads'] = torch.get_num_threads()
+
+    def inference_context(self, torch):
+        return torch.inference_mode() if self.inference_mode else nullcontext()
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'cpus': self.cpus,
+            'inference_mode': self.inference_mode,
+            'half': self.half,
+            'channels_last': self.channels_last,
+            'cudnn_benchmark': self.cudnn_benchmark,
+            'flush_denormal': self.flush_denormal,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            **self.applied,
+        }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Content-hash result cache for the base-yolo server
+Returns cached detections for repeated frames (static cameras, retried uploads)
+without paying for another forward pass
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Rough per-entry memory estimate used for the byte bound
+ENTRY_OVERHEAD_BYTES = 256
+DETECTION_BYTES = 160
+
+def frame_digest(img):
+    """Fast content hash of a decoded frame (xxh3 if available, else blake2b)"""
+    data = memoryview(img).cast('B') if img.flags['C_CONTIGUOUS'] else img.tobytes()
+    shape = repr((img.shape, str(img.dtype))).encode()
+    if xxhash is not None:
+        h = xxhash.xxh3_128()
+    else:
+        h = hashlib.blake2b(digest_size=16)
+    h.update(shape)
+    h.update(data)
+    return h.hexdigest()
+
+class ResultCache:
+    """Bounded LRU cache with TTL expiry and hit/miss counters"""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl_sec=300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, detections)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(img, model_id, **params):
+        """Cache key: frame content hash plus model and threshold parameters"""
+        param_str = ','.join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{frame_digest(img)}|{model_id}|{param_str}"
+
+    def get(self, key):
+        """Cached detections for key, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, detections = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+                self._bytes -= size
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return detections
+
+    def put(self, key, detections):
+        """Store detections, evicting least-recently-used entries past the bounds"""
+        size = ENTRY_OVERHEAD_BYTES + DETECTION_BYTES * len(detections)
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_sec if self.ttl_sec > 0 else None
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (expires_at, size, detections)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_sec': self.ttl_sec,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'hash': 'xxh3_128' if xxhash is not None else 'blake2b',
+            }
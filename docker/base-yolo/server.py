@@ -3,36 +3,376 @@
 Base PyTorch YOLO Inference Server
 Provides baseline performance metrics for comparison with TensorRT NIMs
 """
-from flask import Flask, request, jsonify
-import torch
-from ultralytics import YOLO
-import numpy as np
 import time
+# Startup clock starts before the heavy imports so they show up as a phase
+STARTUP_T0 = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify
+import numpy as np
 import cv2
 from io import BytesIO
 import base64
+import itertools
+import json
 import os
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
+
+from backends import BACKENDS, create_backend
+from result_cache import ResultCache
+from frame_skip import StreamRegistry, frame_signature
+from video_stream import UploadPipe, VideoPipeline
+from metrics import Registry, StageTimer
+from jobs import BenchmarkJob, JobManager, ServingGate, FINISHED
+from profiles import ExecutionProfile, PROFILES
+from profile_worker import ProfileWorker
+from startup import StartupTracker, warmup
+from accounting import CostAccounting
+
+startup = StartupTracker(t0=STARTUP_T0)
+startup.add('server_imports', (time.perf_counter() - STARTUP_T0) * 1000)
 
 app = Flask(__name__)
 
-# Load model
-print("Loading YOLOv8s model...")
-model_path = os.getenv("MODEL_PATH", "yolov8s.pt")
-print(f"Model path: {model_path}")
+# Synthetic input: requests without an image are served from a pool of
+# pre-generated frames so baseline samples measure inference, not RNG cost.
+# Select per request with the X-Synthetic-Input header ('pool' or 'random').
+SYNTHETIC_INPUT_MODES = ('pool', 'random')
+SYNTHETIC_INPUT_DEFAULT = os.getenv("SYNTHETIC_INPUT_MODE", "pool")
+SYNTHETIC_POOL_SIZE = int(os.getenv("SYNTHETIC_POOL_SIZE", "16"))
+if SYNTHETIC_INPUT_DEFAULT not in SYNTHETIC_INPUT_MODES:
+    print(f"Unknown SYNTHETIC_INPUT_MODE={SYNTHETIC_INPUT_DEFAULT}, using 'pool'")
+    SYNTHETIC_INPUT_DEFAULT = 'pool'
+
+# Result cache for repeated frames (disabled when RESULT_CACHE_SIZE=0).
+# Only posted images are cached; synthetic inputs always run the model.
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "0")),
+    max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    ttl_sec=float(os.getenv("RESULT_CACHE_TTL_SEC", "300")),
+)
+
+# Streaming inference with perceptual near-duplicate frame skipping
+streams = StreamRegistry(
+    idle_timeout_sec=float(os.getenv("STREAM_IDLE_TIMEOUT_SEC", "300")),
+    threshold=float(os.getenv("FRAME_SKIP_THRESHOLD", "0.02")),
+    max_stale_frames=int(os.getenv("FRAME_SKIP_MAX_STALE_FRAMES", "30")),
+    max_stale_ms=float(os.getenv("FRAME_SKIP_MAX_STALE_MS", "1000")),
+)
+
+# Pipelined video ingestion (/stream/video)
+VIDEO_BATCH_SIZE = int(os.getenv("VIDEO_BATCH_SIZE", "4"))
+VIDEO_QUEUE_SIZE = int(os.getenv("VIDEO_QUEUE_SIZE", "16"))
+VIDEO_ROOT = os.path.realpath(os.getenv("VIDEO_ROOT", "/data/videos"))
+VIDEO_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Background /benchmark jobs: a job call already running when a request
+# arrives is not interrupted, so the batch size bounds what a request can
+# share the CPU with
+BENCHMARK_MAX_BATCH_SIZE = int(os.getenv("BENCHMARK_MAX_BATCH_SIZE", "8"))
+# Every job thread loads its own model copy next to the serving one
+BENCHMARK_MAX_MODEL_COPIES = int(os.getenv("BENCHMARK_MAX_MODEL_COPIES", "4"))
+
+# Instrumentation: Prometheus /metrics and per-stage Server-Timing headers.
+# INFERENCE_LOCK=1 serializes model calls (Ultralytics predictors are not
+# thread-safe); queue_wait then measures time spent waiting for the model.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+INFERENCE_LOCK = os.getenv("INFERENCE_LOCK", "0") == "1"
+
+registry = Registry()
+REQUESTS = registry.counter('yolo_requests_total', 'HTTP requests by endpoint and status',
+                            ('endpoint', 'status'))
+REQUEST_SECONDS = registry.histogram('yolo_request_duration_seconds',
+                                     'Server-side request duration', ('endpoint',))
+STAGE_SECONDS = registry.histogram('yolo_stage_duration_seconds',
+                                   'Time spent per request stage', ('stage',))
+INFLIGHT = registry.gauge('yolo_inflight_requests', 'Requests currently being handled')
+QUEUE_DEPTH = registry.gauge('yolo_inference_queue_depth', 'Requests waiting for the model')
+SERVING_INFERENCE = registry.gauge('yolo_serving_inference_inflight',
+                                   'Model calls in progress for requests (benchmark jobs excluded)')
+STREAM_FRAMES = registry.counter('yolo_stream_frames_total', 'Streaming frames by outcome',
+                                 ('outcome',))
+registry.counter('yolo_result_cache_lookups_total', 'Result cache lookups by result', ('result',),
+                 callback=lambda: {('hit',): result_cache.hits, ('miss',): result_cache.misses})
+registry.counter('yolo_result_cache_evictions_total', 'Result cache LRU evictions',
+                 callback=lambda: result_cache.evictions)
+registry.gauge('yolo_result_cache_entries', 'Result cache entries',
+               callback=lambda: result_cache.stats()['entries'])
+model_lock = threading.Lock() if INFERENCE_LOCK else None
+
+# Cost accounting: CPU, bytes and sampled tracemalloc allocations per request,
+# reported per inference by GET /accounting (reset with POST /accounting/reset)
+accounting = CostAccounting(alloc_sample_rate=float(os.getenv("ACCOUNTING_ALLOC_SAMPLE_RATE", "0")))
+REQUEST_CPU_SECONDS = registry.counter('yolo_request_cpu_seconds_total',
+                                       'CPU time of request handler threads', ('endpoint',))
+REQUEST_BYTES = registry.counter('yolo_request_bytes_total', 'Request/response body bytes',
+                                 ('endpoint', 'direction'))
+INFERENCES = registry.counter('yolo_inferences_total', 'Frames run through the model for requests')
+registry.counter('yolo_process_cpu_seconds_total', 'CPU time of the server process (all threads)',
+                 callback=time.process_time)
 
-model = YOLO(model_path)
-model.to('cuda' if torch.cuda.is_available() else 'cpu')
-print(f"Model loaded on {'GPU' if torch.cuda.is_available() else 'CPU'}")
+# Ultralytics predict() defaults, used when a request does not override them
+DEFAULT_PREDICT_PARAMS = {'conf': 0.25, 'iou': 0.7}
+
+# Inference backend: 'ultralytics' (PyTorch) or 'onnxruntime' (model.onnx on CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "ultralytics").lower()
+if INFERENCE_BACKEND not in BACKENDS:
+    print(f"Unknown INFERENCE_BACKEND={INFERENCE_BACKEND}, using 'ultralytics'")
+    INFERENCE_BACKEND = 'ultralytics'
+
+# Execution profile: inference mode, threads, channels-last, FP16 (see profiles.py)
+EXECUTION_PROFILE = os.getenv("EXECUTION_PROFILE", "default").lower()
+if EXECUTION_PROFILE not in PROFILES:
+    print(f"Unknown EXECUTION_PROFILE={EXECUTION_PROFILE}, using 'default'")
+    EXECUTION_PROFILE = 'default'
+
+# Startup warmup: every batch size the server will see (single /infer frames and
+# /stream/video batches) runs WARMUP_ITERATIONS times before /health/ready passes
+WARMUP_BATCH_SIZES = sorted({int(b) for b in os.getenv("WARMUP_BATCH_SIZES", f"1,{VIDEO_BATCH_SIZE}").split(',')
+                             if b.strip() and int(b) > 0})
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "3"))
+
+# Probe endpoints answer while the model loads; everything else gets 503 until ready
+STARTUP_ENDPOINTS = {'health', 'health_live', 'health_ready', 'startup_report', 'metrics'}
+# Probes and accounting reads are left out of the per-request cost
+UNACCOUNTED_ENDPOINTS = STARTUP_ENDPOINTS | {'accounting_report', 'accounting_reset'}
+registry.gauge('yolo_ready', 'Model loaded and warmed up (1) or not (0)',
+               callback=lambda: 1 if startup.ready else 0)
+registry.gauge('yolo_startup_phase_seconds', 'Time spent in each startup phase', ('phase',),
+               callback=lambda: {(k,): v / 1000 for k, v in startup.report()['phases_ms'].items()})
+
+with startup.phase('synthetic_pool'):
+    _pool_rng = np.random.default_rng(0)
+    synthetic_pool = [_pool_rng.integers(0, 255, (640, 640, 3), dtype=np.uint8)
+                      for _ in range(max(1, SYNTHETIC_POOL_SIZE))]
+synthetic_cursor = itertools.count()
+print(f"Synthetic input pool: {len(synthetic_pool)} frames (default mode: {SYNTHETIC_INPUT_DEFAULT})")
+
+MODEL_PATH = os.getenv("MODEL_PATH", "yolov8s.pt")
+model_path = MODEL_PATH
+backend = None
+DEVICE = None
+
+def load_model():
+    """Startup pipeline (background thread): imports, weights load, device move, warmup"""
+    global backend, model_path, DEVICE
+    try:
+        print(f"Loading YOLOv8s model: {model_path} (backend: {INFERENCE_BACKEND}, profile: {EXECUTION_PROFILE})")
+        loaded = create_backend(INFERENCE_BACKEND, model_path, tracker=startup,
+                                profile=ExecutionProfile(EXECUTION_PROFILE))
+        print(f"Model loaded on {loaded.device.upper()}: {loaded.describe()}")
+
+        print(f"Warming up batch sizes {WARMUP_BATCH_SIZES} x {WARMUP_ITERATIONS}...")
+        warmup(lambda inputs: loaded.predict(inputs, **DEFAULT_PREDICT_PARAMS), synthetic_pool,
+               WARMUP_BATCH_SIZES, WARMUP_ITERATIONS, startup)
+
+        backend, model_path, DEVICE = loaded, loaded.model_path, loaded.device
+        # Cost accounting covers serving only, not the load and warmup above
+        accounting.reset()
+        startup.mark_ready()
+    except Exception as e:
+        startup.mark_failed(e)
+
+threading.Thread(target=load_model, name='model-loader', daemon=True).start()
+
+@contextmanager
+def profile_predictors(name, count):
+    """`count` predict functions for benchmarking an execution profile, one per job thread
+
+    Jobs never call the serving backend: for the serving profile (or None)
+    every thread gets its own backend instance. Profile settings such as torch
+    threads are process-wide, so another profile runs in ProfileWorker child
+    processes, one per thread, and never changes what live requests run with.
+    """
+    name = name or backend.profile.name
+    with ExitStack() as stack:
+        if name == backend.profile.name:
+            others = [create_backend(INFERENCE_BACKEND, MODEL_PATH, profile=ExecutionProfile(name), primary=False)
+                      for _ in range(count)]
+            yield [lambda inputs, other=other: other.predict(inputs, **DEFAULT_PREDICT_PARAMS)[0]
+                   for other in others]
+            return
+        workers = []
+        for _ in range(count):
+            worker = ProfileWorker(INFERENCE_BACKEND, MODEL_PATH, name, synthetic_pool, DEFAULT_PREDICT_PARAMS)
+            stack.callback(worker.close)
+            workers.append(worker)
+        yield [worker.predict for worker in workers]
+
+# Background /benchmark job calls start only while no request inference is in progress
+serving_gate = ServingGate()
+benchmark_jobs = JobManager(
+    profile_scope=profile_predictors,
+    frames=synthetic_pool,
+    gate=serving_gate,
+    history=int(os.getenv("BENCHMARK_JOB_HISTORY", "20")),
+)
+
+def synthetic_frame(mode):
+    """Frame for requests without an image: next pooled frame or fresh random noise"""
+    if mode == 'random':
+        return np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+    return synthetic_pool[next(synthetic_cursor) % len(synthetic_pool)]
+
+def run_model(inputs, timer=None, **params):
+    """Run the backend on one frame or a list of frames; detections per frame
+
+    Records queue wait and the backend's per-stage timings. Calls count as
+    serving inference, which background benchmark jobs yield to.
+    """
+    frames = len(inputs) if isinstance(inputs, list) else 1
+    accounting.add_inferences(frames)
+    INFERENCES.inc(amount=frames)
+    with serving_gate.serving():
+        SERVING_INFERENCE.inc()
+        try:
+            return _run_model(inputs, timer, **params)
+        finally:
+            SERVING_INFERENCE.dec()
+
+def _run_model(inputs, timer=None, **params):
+    wait_start = time.perf_counter()
+    if model_lock is not None:
+        QUEUE_DEPTH.inc()
+        model_lock.acquire()
+        QUEUE_DEPTH.dec()
+    try:
+        queue_ms = (time.perf_counter() - wait_start) * 1000
+        detections, stages = backend.predict(inputs, **params)
+    finally:
+        if model_lock is not None:
+            model_lock.release()
+
+    if timer is not None:
+        if model_lock is not None:
+            timer.add('queue_wait', queue_ms)
+        for stage, ms in stages.items():
+            timer.add(stage, ms)
+    return detections
+
+def predict_params(data):
+    """Threshold overrides from the request body ('conf', 'iou')"""
+    return {k: float(data[k]) for k in DEFAULT_PREDICT_PARAMS if data.get(k) is not None}
+
+def decode_image(image_data):
+    """Decode a base64-encoded image to a BGR array (None if undecodable)"""
+    img_bytes = base64.b64decode(image_data)
+    nparr = np.frombuffer(img_bytes, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+@app.before_request
+def _start_request_timer():
+    g.timer = StageTimer()
+    INFLIGHT.inc()
+    if request.endpoint not in UNACCOUNTED_ENDPOINTS:
+        g.cost = accounting.begin()
+
+@app.before_request
+def _require_ready():
+    if not startup.ready and request.endpoint not in STARTUP_ENDPOINTS:
+        response = jsonify({'error': f"Model not ready ({startup.state})", 'startup': startup.report()})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+@app.after_request
+def _finish_request_timer(response):
+    timer = g.get('timer')
+    if timer is None:
+        return response
+    total_ms = timer.elapsed_ms()
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUESTS.inc(endpoint, str(response.status_code))
+    REQUEST_SECONDS.observe(total_ms / 1000, endpoint)
+    cost = g.pop('cost', None)
+    if cost is not None:
+        # Streamed bodies (/stream/video NDJSON) are not counted in bytes out or request CPU
+        bytes_in = request.content_length or 0
+        bytes_out = 0 if response.is_streamed else (response.calculate_content_length() or 0)
+        REQUEST_CPU_SECONDS.inc(endpoint, amount=accounting.end(cost, bytes_in, bytes_out))
+        REQUEST_BYTES.inc(endpoint, 'in', amount=bytes_in)
+        REQUEST_BYTES.inc(endpoint, 'out', amount=bytes_out)
+    for stage, ms in timer.stages.items():
+        STAGE_SECONDS.observe(ms / 1000, stage)
+    if SERVER_TIMING and timer.stages:
+        response.headers['Server-Timing'] = timer.server_timing(total_ms)
+    return response
+
+@app.teardown_request
+def _end_request(exc):
+    INFLIGHT.dec()
+    cost = g.pop('cost', None)
+    if cost is not None:
+        # Request failed before after_request: still close its allocation sample
+        accounting.end(cost)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics"""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/accounting', methods=['GET'])
+def accounting_report():
+    """CPU, bytes and allocations per inference since the last reset"""
+    return jsonify(accounting.report())
+
+@app.route('/accounting/reset', methods=['POST'])
+def accounting_reset():
+    """Start a new accounting window (returns the one that ended)"""
+    report = accounting.report()
+    accounting.reset()
+    return jsonify(report)
 
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
+    """Health check endpoint (503 until the model is loaded and warmed up)"""
+    if not startup.ready:
+        return jsonify({
+            'status': startup.state,
+            'deployment': 'base-pytorch',
+            'startup': startup.report()
+        }), 503
     return jsonify({
         'status': 'healthy',
         'deployment': 'base-pytorch',
-        'device': 'cuda' if torch.cuda.is_available() else 'cpu'
+        'device': DEVICE,
+        'backend': backend.describe(),
+        'profile': backend.profile.describe(),
+        'startup': startup.report(),
+        'synthetic_input': {'default': SYNTHETIC_INPUT_DEFAULT, 'pool_size': len(synthetic_pool)},
+        'result_cache': result_cache.stats()
     })
 
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    """Liveness: the process serves requests; fails only if startup failed"""
+    if startup.state == 'failed':
+        return jsonify({'status': 'failed', 'error': startup.error}), 500
+    return jsonify({'status': 'alive', 'state': startup.state})
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: model loaded and warmed up for every WARMUP_BATCH_SIZES entry"""
+    if not startup.ready:
+        return jsonify({'status': startup.state}), 503
+    return jsonify({'status': 'ready', 'ready_ms': startup.report()['ready_ms']})
+
+@app.route('/startup', methods=['GET'])
+def startup_report():
+    """Time spent in each startup phase and per-batch-size warmup timings"""
+    return jsonify(startup.report())
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Result cache hit/miss metrics"""
+    return jsonify(result_cache.stats())
+
+@app.route('/cache/clear', methods=['POST'])
+def cache_clear():
+    """Drop all cached results"""
+    result_cache.clear()
+    return jsonify(result_cache.stats())
+
 @app.route('/infer', methods=['POST'])
 def infer():
     """Single inference endpoint"""
@@ -40,75 +380,313 @@ def infer():
         data = request.json or {}
         image_data = data.get('image')
 
-        # Decode image or use random test image
+        # Decode image or use a synthetic test image
         if image_data:
-            img_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(img_bytes, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            with g.timer.stage('decode'):
+                img = decode_image(image_data)
+            input_source = 'image'
         else:
-            # Random test image
-            img = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+            input_source = request.headers.get('X-Synthetic-Input', SYNTHETIC_INPUT_DEFAULT).lower()
+            if input_source not in SYNTHETIC_INPUT_MODES:
+                return jsonify({'error': f"Unknown X-Synthetic-Input: {input_source} "
+                                         f"(use one of {', '.join(SYNTHETIC_INPUT_MODES)})"}), 400
+            img = synthetic_frame(input_source)
+
+        if img is None:
+            return jsonify({'error': 'Could not decode image'}), 400
+
+        params = predict_params(data)
+
+        # Result cache lookup (posted images only, unless bypassed per request)
+        cache_key = None
+        if (result_cache.enabled and input_source == 'image'
+                and request.headers.get('X-Result-Cache', '').lower() != 'bypass'):
+            start = time.time()
+            with g.timer.stage('cache_lookup'):
+                cache_key = ResultCache.make_key(img, model_path, **{**DEFAULT_PREDICT_PARAMS, **params})
+                cached = result_cache.get(cache_key)
+            if cached is not None:
+                return jsonify({
+                    'detections': cached,
+                    'latency_ms': (time.time() - start) * 1000,
+                    'cache_hit': True,
+                    'input_source': input_source,
+                    'deployment': 'base-pytorch',
+                    'device': DEVICE
+                })
 
         # Inference
         start = time.time()
-        results = model(img)
+        detections = run_model(img, g.timer, **params)[0]
         latency = (time.time() - start) * 1000
 
-        # Extract detections
-        detections = []
-        for r in results:
-            boxes = r.boxes
-            for box in boxes:
-                detections.append({
-                    'bbox': box.xyxy[0].cpu().numpy().tolist(),
-                    'confidence': float(box.conf[0]),
-                    'class': int(box.cls[0])
-                })
+        if cache_key is not None:
+            result_cache.put(cache_key, detections)
+
+        with g.timer.stage('serialize'):
+            return jsonify({
+                'detections': detections,
+                'latency_ms': latency,
+                'cache_hit': False,
+                'input_source': input_source,
+                'deployment': 'base-pytorch',
+                'device': DEVICE
+            })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _optional(data, key, cast):
+    value = data.get(key)
+    return cast(value) if value is not None else None
+
+@app.route('/stream/<stream_id>/infer', methods=['POST'])
+def stream_infer(stream_id):
+    """Streaming inference: near-duplicate frames reuse the last detections"""
+    try:
+        data = request.json or {}
+        if not data.get('image'):
+            return jsonify({'error': "Streaming inference requires an 'image'"}), 400
+
+        with g.timer.stage('decode'):
+            img = decode_image(data['image'])
+        if img is None:
+            return jsonify({'error': 'Could not decode image'}), 400
+
+        params = predict_params(data)
+
+        # Skip settings are fixed when the stream is first seen
+        skipper = streams.get(
+            stream_id,
+            threshold=_optional(data, 'skip_threshold', float),
+            max_stale_frames=_optional(data, 'max_stale_frames', int),
+            max_stale_ms=_optional(data, 'max_stale_ms', float),
+        )
+
+        with skipper.lock:
+            start = time.time()
+            with g.timer.stage('signature'):
+                signature = frame_signature(img)
+                reuse, distance = skipper.check(signature, params)
+            if reuse:
+                detections = skipper.last_detections
+                latency = (time.time() - start) * 1000
+                skipper.record_skip(latency)
+                STREAM_FRAMES.inc('skipped')
+            else:
+                detections = run_model(img, g.timer, **params)[0]
+                latency = (time.time() - start) * 1000
+                skipper.record_inference(signature, detections, latency, params)
+                STREAM_FRAMES.inc('inferred')
+
+            stats = skipper.stats()
+            frames_since_inference = skipper.frames_since_inference
+            stale_ms = skipper.stale_ms()
 
         return jsonify({
             'detections': detections,
             'latency_ms': latency,
+            'skipped': reuse,
+            'distance': distance,
+            'frames_since_inference': frames_since_inference,
+            'stale_ms': stale_ms,
+            'stream': {
+                'id': stream_id,
+                'skip_ratio': stats['skip_ratio'],
+                'effective_fps': stats['effective_fps'],
+                'fps_gain': stats['fps_gain'],
+            },
             'deployment': 'base-pytorch',
-            'device': 'cuda' if torch.cuda.is_available() else 'cpu'
+            'device': DEVICE
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/benchmark', methods=['POST'])
-def benchmark():
-    """Internal benchmarking endpoint"""
-    iterations = request.args.get('iterations', 100, type=int)
+@app.route('/stream/<stream_id>/stats', methods=['GET'])
+def stream_stats(stream_id):
+    """Skip ratio and effective FPS for a stream"""
+    skipper = streams.find(stream_id)
+    if skipper is None:
+        return jsonify({'error': f"Unknown stream: {stream_id}"}), 404
+    with skipper.lock:
+        return jsonify({'id': stream_id, **skipper.stats()})
 
-    latencies = []
-    img = np.random.randint(0, 255, (640, 640, 3), dtype=np.uint8)
+@app.route('/stream/<stream_id>', methods=['DELETE'])
+def stream_close(stream_id):
+    """Close a stream and return its final statistics"""
+    skipper = streams.remove(stream_id)
+    if skipper is None:
+        return jsonify({'error': f"Unknown stream: {stream_id}"}), 404
+    with skipper.lock:
+        return jsonify({'id': stream_id, **skipper.stats()})
 
-    # Warmup
-    for _ in range(10):
-        model(img)
+@app.route('/stream/video', methods=['POST'])
+def stream_video():
+    """Pipelined video inference; streams per-frame detections back as NDJSON"""
+    batch_size = request.args.get('batch_size', VIDEO_BATCH_SIZE, type=int)
+    queue_size = request.args.get('queue_size', VIDEO_QUEUE_SIZE, type=int)
+    max_frames = request.args.get('max_frames', None, type=int)
+    stride = request.args.get('stride', 1, type=int)
+    params = predict_params(request.args)
 
-    # Benchmark
-    start_time = time.time()
-    for _ in range(iterations):
-        start = time.time()
-        model(img)
-        latencies.append((time.time() - start) * 1000)
+    # Source: a file under VIDEO_ROOT, or the (possibly chunked) request body, decoded
+    # as it arrives through a pipe (?spool=1 writes it to a temp file first, for
+    # containers that need seeking such as MP4s with the index at the end)
+    tmp_path = upload = None
+    path = request.args.get('path')
+    if path:
+        source = os.path.realpath(os.path.join(VIDEO_ROOT, path))
+        if not source.startswith(VIDEO_ROOT + os.sep) or not os.path.isfile(source):
+            return jsonify({'error': f"Video not found under {VIDEO_ROOT}: {path}"}), 404
+    else:
+        chunk = request.stream.read(VIDEO_UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return jsonify({'error': "Post a video body or pass ?path=<file under VIDEO_ROOT>"}), 400
+        if request.args.get('spool', '0') == '1':
+            fd, tmp_path = tempfile.mkstemp(suffix='.video')
+            with os.fdopen(fd, 'wb') as f:
+                while chunk:
+                    f.write(chunk)
+                    chunk = request.stream.read(VIDEO_UPLOAD_CHUNK_BYTES)
+            source = tmp_path
+        else:
+            upload = UploadPipe(request.stream.read, chunk, VIDEO_UPLOAD_CHUNK_BYTES)
+            source = upload.path
 
-    total_time = time.time() - start_time
+    def infer_batch(frames):
+        timer = StageTimer()
+        detections = run_model(frames, timer, **params)
+        for stage, ms in timer.stages.items():
+            STAGE_SECONDS.observe(ms / 1000, stage)
+        return detections
 
-    return jsonify({
-        'iterations': iterations,
-        'total_time_sec': total_time,
-        'fps': iterations / total_time,
-        'latency_ms': {
-            'min': min(latencies),
-            'max': max(latencies),
-            'mean': sum(latencies) / len(latencies),
-            'p95': sorted(latencies)[int(len(latencies) * 0.95)]
-        },
+    pipeline = VideoPipeline(source, infer_batch, batch_size=batch_size, queue_size=queue_size,
+                             max_frames=max_frames, stride=stride)
+
+    def generate():
+        for item in pipeline.run():
+            yield json.dumps(item) + '\n'
+
+    def cleanup():
+        # Runs when the response is closed, even if streaming never started
+        if upload:
+            upload.close()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.call_on_close(cleanup)
+    return response
+
+def _int_list(value):
+    return [int(v) for v in str(value).split(',') if v.strip()]
+
+def _legacy_benchmark_body(job):
+    """Blocking-mode response: the first configuration in the original /benchmark shape"""
+    status = job.status()
+    first = status['results'][0] if status['results'] else {}
+    return {
+        'job_id': job.id,
+        'state': status['state'],
+        'iterations': first.get('iterations', 0),
+        'total_time_sec': first.get('total_time_sec', 0.0),
+        'fps': first.get('fps', 0.0),
+        'latency_ms': first.get('latency_ms', {}),
+        'results': status['results'],
         'deployment': 'base-pytorch',
-        'device': 'cuda' if torch.cuda.is_available() else 'cpu'
+        'backend': INFERENCE_BACKEND,
+        'profile': first.get('profile', EXECUTION_PROFILE),
+        'device': DEVICE
+    }
+
+@app.route('/benchmark', methods=['POST'])
+def benchmark():
+    """Start a background benchmark job (202 + job id); ?wait=1 blocks until it finishes
+
+    Parameters (query string or JSON body): iterations per configuration,
+    warmup, and the comma-separated sweeps profiles (default: the serving
+    profile), batch_sizes and threads.
+    """
+    data = {**(request.get_json(silent=True) or {}), **request.args.to_dict()}
+    profiles = [p.strip().lower() for p in str(data.get('profiles', backend.profile.name)).split(',') if p.strip()]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        return jsonify({'error': f"Unknown profiles: {', '.join(unknown)} (use {', '.join(PROFILES)})"}), 400
+    try:
+        job = BenchmarkJob(
+            iterations=int(data.get('iterations', 100)),
+            warmup=int(data.get('warmup', 10)),
+            batch_sizes=_int_list(data.get('batch_sizes', '1')),
+            threads=_int_list(data.get('threads', '1')),
+            profiles=profiles,
+        )
+    except ValueError as e:
+        return jsonify({'error': f"Invalid benchmark parameters: {e}"}), 400
+    if job.iterations < 1 or not job.configs or min(min(b, t) for _, b, t in job.configs) < 1:
+        return jsonify({'error': 'iterations, batch_sizes and threads must be positive'}), 400
+    if max(b for _, b, _ in job.configs) > BENCHMARK_MAX_BATCH_SIZE:
+        return jsonify({'error': f"batch_sizes above BENCHMARK_MAX_BATCH_SIZE={BENCHMARK_MAX_BATCH_SIZE}"}), 400
+    if max(t for _, _, t in job.configs) > BENCHMARK_MAX_MODEL_COPIES:
+        return jsonify({'error': f"threads above BENCHMARK_MAX_MODEL_COPIES={BENCHMARK_MAX_MODEL_COPIES} "
+                                 f"(each job thread loads its own model copy)"}), 400
+    benchmark_jobs.submit(job)
+
+    if str(data.get('wait', '0')).lower() in ('1', 'true'):
+        version = 0
+        while job.state not in FINISHED:
+            version = job.wait_update(version, 1.0)
+        return jsonify(_legacy_benchmark_body(job))
+
+    response = jsonify({
+        'job_id': job.id,
+        'state': job.state,
+        'configs': job.status()['configs'],
+        'status_url': f"/benchmark/{job.id}",
+        'events_url': f"/benchmark/{job.id}/events",
     })
+    response.headers['Location'] = f"/benchmark/{job.id}"
+    return response, 202
+
+@app.route('/benchmark', methods=['GET'])
+def benchmark_list():
+    """Recent benchmark jobs"""
+    return jsonify({'jobs': benchmark_jobs.list()})
+
+@app.route('/benchmark/<job_id>', methods=['GET'])
+def benchmark_status(job_id):
+    """Job state, progress of the running configuration (partial histogram) and finished results"""
+    job = benchmark_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown benchmark job: {job_id}"}), 404
+    return jsonify(job.status())
+
+@app.route('/benchmark/<job_id>/events', methods=['GET'])
+def benchmark_events(job_id):
+    """NDJSON progress stream: one status line per update until the job finishes"""
+    job = benchmark_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown benchmark job: {job_id}"}), 404
+
+    def generate():
+        version = -1
+        while True:
+            version = job.wait_update(version, 1.0)
+            status = job.status()
+            yield json.dumps(status) + '\n'
+            if status['state'] in FINISHED:
+                break
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/benchmark/<job_id>', methods=['DELETE'])
+def benchmark_cancel(job_id):
+    """Cancel a queued or running job; finished configurations are kept"""
+    job = benchmark_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown benchmark job: {job_id}"}), 404
+    job.cancel()
+    return jsonify({'job_id': job.id, 'state': job.state, 'cancelling': job.state not in FINISHED})
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup pipeline tracking for the base-yolo server
+Times each startup phase (imports, weights load, device move, warmup) and
+holds the liveness/readiness state behind /health/live and /health/ready
+"""
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+STARTING, READY, FAILED = 'starting', 'ready', 'failed'
+
+class StartupTracker:
+    """Ordered phase durations (ms) and the ready/failed state of one server start"""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.started_at = time.time() - (time.perf_counter() - self.t0)
+        self.phases = {}
+        self.warmup = {}
+        self.state = STARTING
+        self.error = None
+        self.ready_ms = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def add(self, name, ms):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+            print(f"  startup: {name} {self.phases[name]:.0f} ms")
+
+    def mark_ready(self):
+        self.ready_ms = (time.perf_counter() - self.t0) * 1000
+        self.state = READY
+        self._ready.set()
+        print(f"✓ Ready after {self.ready_ms:.0f} ms: "
+              + ', '.join(f"{k} {v:.0f} ms" for k, v in self.phases.items()))
+
+    def mark_failed(self, error):
+        self.state = FAILED
+        self.error = str(error)
+        print(f"✗ Startup failed: {error}")
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def report(self):
+        with self._lock:
+            phases = {k: round(v, 1) for k, v in self.phases.items()}
+        return {
+            'state': self.state,
+            'started_at': self.started_at,
+            'uptime_sec': round(time.perf_counter() - self.t0, 1),
+            'ready_ms': round(self.ready_ms, 1) if self.ready_ms is not None else None,
+            'phases_ms': phases,
+            'warmup_ms': self.warmup,
+            'error': self.error,
+        }
+
+def phase(tracker, name):
+    """tracker.phase(name), or a no-op when there is no tracker"""
+    return tracker.phase(name) if tracker is not None else nullcontext()
+
+def warmup(predict, frames, batch_sizes, iterations, tracker=None):
+    """Run predict over every expected batch size so first requests never pay lazy init
+
+    Records first-call and last-call ms per batch size: a first call far above
+    the last shows what the warmup saved (cuDNN autotuning, allocator growth,
+    ONNX Runtime buffer setup).
+    """
+    with phase(tracker, 'warmup'):
+        for batch in batch_sizes:
+            inputs = frames[0] if batch == 1 else [frames[i % len(frames)] for i in range(batch)]
+            times = []
+            for _ in range(max(1, iterations)):
+                start = time.perf_counter()
+                predict(inputs)
+                times.append((time.perf_counter() - start) * 1000)
+            if tracker is not None:
+                tracker.warmup[str(batch)] = {'first_ms': round(times[0], 1), 'last_ms': round(times[-1], 1)}
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Pipelined video ingestion for the base-yolo server
+A producer thread decodes frames into a bounded queue while the consumer
+batches them into the model, so decode and inference overlap. The bounded
+queue provides backpressure: when inference (or the client reading results)
+falls behind, decoding blocks instead of buffering the whole video.
+
+Uploaded videos reach the decoder through a named pipe (UploadPipe) that a
+feeder thread fills from the request body, so decoding starts with the first
+chunk instead of after the whole upload has been spooled to disk.
+"""
+import errno
+import fcntl
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+import cv2
+
+from jobs import percentiles
+
+_END = object()
+
+class UploadPipe:
+    """Named pipe fed from a request body by a thread; path is the decoder's source
+
+    The decoder reads the video as it arrives, so the container must be
+    readable without seeking: MKV, AVI, MPEG-TS, WebM and faststart or
+    fragmented MP4 are, an MP4 with its index at the end may not be (upload
+    it with ?spool=1 instead).
+    """
+
+    def __init__(self, read, first_chunk=b'', chunk_bytes=1024 * 1024):
+        self._read = read
+        self._first = first_chunk
+        self.chunk_bytes = chunk_bytes
+        self._dir = tempfile.mkdtemp(prefix='upload-')
+        self.path = os.path.join(self._dir, 'video')
+        os.mkfifo(self.path)
+        self._stop = threading.Event()
+        self._opened = False
+        self.bytes_fed = 0
+        self._feeder = threading.Thread(target=self._feed, name='video-upload', daemon=True)
+        self._feeder.start()
+
+    def _open(self):
+        """Write end of the pipe, once the decoder has opened it (None if closed first)"""
+        while not self._stop.is_set():
+            try:
+                fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+            except OSError as e:
+                if e.errno != errno.ENXIO:  # ENXIO: no reader yet
+                    raise
+                time.sleep(0.01)
+                continue
+            fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_NONBLOCK)
+            self._opened = True
+            return os.fdopen(fd, 'wb')
+        return None
+
+    def _feed(self):
+        out = None
+        try:
+            out = self._open()
+            chunk = self._first
+            while out is not None and chunk and not self._stop.is_set():
+                out.write(chunk)
+                self.bytes_fed += len(chunk)
+                chunk = self._read(self.chunk_bytes)
+        except (BrokenPipeError, OSError, ValueError):
+            pass  # decoder stopped early (max_frames, error) or the client went away
+        finally:
+            if out is not None:
+                try:
+                    out.close()
+                except OSError:
+                    pass
+
+    def close(self):
+        self._stop.set()
+        self._feeder.join(timeout=1)
+        if not self._opened:
+            # A decoder still opening the pipe would block forever: give it an empty stream
+            try:
+                os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError:
+                pass
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+class VideoPipeline:
+    """Decode frames on a producer thread and run batched inference on them"""
+
+    def __init__(self, source, infer_batch, batch_size=4, queue_size=16,
+                 max_frames=None, stride=1):
+        self.source = source
+        self.infer_batch = infer_batch  # list of frames -> list of detections per frame
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(self.batch_size, queue_size)
+        self.max_frames = max_frames
+        self.stride = max(1, stride)
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._producer = None
+        self.decode_error = None
+
+        self.frames_decoded = 0
+        self.decode_time_ms = 0.0
+        self.producer_blocked_ms = 0.0
+        self.queue_high_water = 0
+
+    def _produce(self):
+        """Producer thread: decode frames and enqueue (index, decoded_at, frame)"""
+        cap = cv2.VideoCapture(self.source)
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {self.source}")
+
+            index = 0
+            while not self._stop.is_set():
+                if self.max_frames is not None and self.frames_decoded >= self.max_frames:
+                    break
+
+                start = time.perf_counter()
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                if index % self.stride:
+                    index += 1
+                    continue
+                decoded_at = time.perf_counter()
+                self.decode_time_ms += (decoded_at - start) * 1000
+                self.frames_decoded += 1
+
+                # Blocking put with a timeout so a stopped pipeline never deadlocks
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put((index, decoded_at, frame), timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                self.producer_blocked_ms += (time.perf_counter() - decoded_at) * 1000
+                self.queue_high_water = max(self.queue_high_water, self._queue.qsize())
+                index += 1
+        except Exception as e:
+            self.decode_error = str(e)
+        finally:
+            cap.release()
+            self._put_end()
+
+    def _put_end(self):
+        while True:
+            try:
+                self._queue.put(_END, timeout=0.1)
+                return
+            except queue.Full:
+                if self._stop.is_set():
+                    self._drain()
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _next_batch(self):
+        """First frame blocking, then whatever is already queued up to batch_size"""
+        item = self._queue.get()
+        if item is _END:
+            return [], True
+
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self):
+        """Yield one result dict per frame, then a final summary dict"""
+        self._producer = threading.Thread(target=self._produce, name='video-decoder', daemon=True)
+        started = time.perf_counter()
+        self._producer.start()
+
+        latencies = []
+        batches = 0
+        frames_out = 0
+        infer_time_ms = 0.0
+
+        try:
+            done = False
+            while not done:
+                batch, done = self._next_batch()
+                if not batch:
+                    break
+
+                infer_start = time.perf_counter()
+                detections = self.infer_batch([frame for _, _, frame in batch])
+                infer_end = time.perf_counter()
+                infer_time_ms += (infer_end - infer_start) * 1000
+                batches += 1
+
+                for (index, decoded_at, _), frame_detections in zip(batch, detections):
+                    latency = (time.perf_counter() - decoded_at) * 1000
+                    latencies.append(latency)
+                    frames_out += 1
+                    yield {
+                        'frame': index,
+                        'detections': frame_detections,
+                        'batch_size': len(batch),
+                        'frame_latency_ms': latency,
+                    }
+        finally:
+            self._stop.set()
+            self._drain()
+            self._producer.join(timeout=5)
+
+        elapsed = time.perf_counter() - started
+        yield {
+            'summary': True,
+            'frames': frames_out,
+            'duration_sec': elapsed,
+            'sustained_fps': frames_out / elapsed if elapsed > 0 else 0.0,
+            'frame_latency_ms': percentiles(latencies),
+            'batches': batches,
+            'avg_batch_size': frames_out / batches if batches else 0.0,
+            'decode_ms_per_frame': self.decode_time_ms / self.frames_decoded if self.frames_decoded else 0.0,
+            'infer_ms_per_frame': infer_time_ms / frames_out if frames_out else 0.0,
+            'producer_blocked_ms': self.producer_blocked_ms,
+            'queue_size': self.queue_size,
+            'queue_high_water': self.queue_high_water,
+            'error': self.decode_error,
+        }
@@ -17,27 +17,63 @@ fi
 echo "✓ kubectl configured"
 echo ""
 
+# NIM initContainers build TensorRT engines through scripts/engine_cache.py (and the
+# model matrix through scripts/matrix_engines.sh), mounted from a ConfigMap; engines
+# are cached on FSS across pod restarts
+engine_cache_configmap() {
+    kubectl create configmap engine-cache-script -n "$1" --from-file=../scripts/engine_cache.py \
+        --from-file=../scripts/matrix_engines.sh \
+        --dry-run=client -o yaml | kubectl apply -f -
+}
+
+# Extra engines for benchmark_matrix.py, built by the initContainers through the same cache:
+#   MATRIX_MODELS=yolov8m,yolov11s MATRIX_IMGSZ=640,1280 ./deploy-all.sh
+matrix_engines() {
+    if [ -n "${MATRIX_MODELS}" ]; then
+        kubectl set env "deployment/$2" -n "$1" -c tensorrt-converter \
+            MATRIX_MODELS="${MATRIX_MODELS}" MATRIX_IMGSZ="${MATRIX_IMGSZ:-640}"
+    fi
+}
+
 # Deploy base-yolo
 echo "1/4 Deploying base-yolo (PyTorch baseline)..."
 kubectl apply -f ../kubernetes/base-yolo/deployment.yaml
+# Server code is mounted from a ConfigMap generated from docker/base-yolo/*.py
+CODE_ARGS=""
+for f in ../docker/base-yolo/*.py; do
+    CODE_ARGS="$CODE_ARGS --from-file=$f"
+done
+kubectl create configmap base-pytorch-code -n yolo-base $CODE_ARGS \
+    --dry-run=client -o yaml | kubectl apply -f -
+kubectl rollout restart deployment/yolo-base-pytorch -n yolo-base
 echo "✓ base-yolo deployed"
 echo ""
 
 # Deploy nim-binary
 echo "2/4 Deploying nim-binary (TensorRT HTTP)..."
 kubectl apply -f ../kubernetes/nim-binary/deployment.yaml
+engine_cache_configmap yolo-nim-binary
+matrix_engines yolo-nim-binary yolo-nim-binary
 echo "✓ nim-binary deployed"
 echo ""
 
 # Deploy nim-grpc
 echo "3/4 Deploying nim-grpc (TensorRT gRPC)..."
 kubectl apply -f ../kubernetes/nim-grpc/deployment.yaml
+engine_cache_configmap yolo-nim-grpc
+matrix_engines yolo-nim-grpc yolo-nim-grpc
+# Python backend model of the yolov8s_topk ensemble, with the NMS it shares with base-yolo
+kubectl create configmap postprocess-model -n yolo-nim-grpc --from-file=../scripts/yolo_postprocess.py \
+    --from-file=../docker/base-yolo/nms.py \
+    --dry-run=client -o yaml | kubectl apply -f -
 echo "✓ nim-grpc deployed"
 echo ""
 
 # Deploy nim-batching
 echo "4/4 Deploying nim-batching (TensorRT batching)..."
 kubectl apply -f ../kubernetes/nim-batching/deployment.yaml
+engine_cache_configmap yolo-nim-batching
+matrix_engines yolo-nim-batching yolo-nim-batching
 echo "✓ nim-batching deployed"
 echo ""
 
@@ -48,7 +84,8 @@ echo ""
 echo "Check status:"
 echo "  kubectl get pods -A | grep yolo"
 echo ""
-echo "Wait for pods to be ready (NIMs take 5-10 min for TensorRT conversion):"
+echo "Wait for pods to be ready (NIMs take 5-10 min for the first TensorRT conversion,"
+echo "under a minute once the engine is in the FSS engine cache):"
 echo "  kubectl wait --for=condition=ready pod -l app=yolo-base -n yolo-base --timeout=300s"
 echo "  kubectl wait --for=condition=ready pod -l app=yolo-nim-binary -n yolo-nim-binary --timeout=600s"
 echo "  kubectl wait --for=condition=ready pod -l app=yolo-nim-grpc-inference -n yolo-nim-grpc --timeout=600s"
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+TensorRT Engine Cache - Runs in the NIM initContainers
+Content-addressed cache of trtexec engines on the shared FSS volume, so a pod
+start only builds an engine when no pod has built it before.
+
+The cache key is the SHA-256 of the ONNX file, the build flags and the GPU /
+TensorRT signature (GPU name, compute capability, driver, TensorRT version):
+an engine is only reused on the hardware and software it was built for.
+Builds run under a per-key lock on the shared volume and are published with
+an atomic rename, so pods starting together build once and never see a
+partial engine.
+
+Layout:
+  <cache-dir>/engines/<key[:2]>/<key>/model.plan   engine
+  <cache-dir>/engines/<key[:2]>/<key>/meta.json    flags, signature, build time
+  <cache-dir>/locks/<key>.lock                     build lock
+  <cache-dir>/tmp/                                 in-progress builds
+
+Usage:
+  python3 engine_cache.py --onnx /models/yolov8s.onnx \\
+                          --output /model-repository/yolov8s/1/model.plan \\
+                          [--cache-dir /engine-cache] [--trtexec PATH] \\
+                          -- --fp16 --workspace=4096 --minShapes=... [--verbose]
+
+  python3 engine_cache.py --list [--cache-dir /engine-cache]
+
+  Local testing without a GPU: --stub-builder writes a fake engine (after
+  --stub-delay seconds) instead of running trtexec, and --signature replaces
+  the nvidia-smi / TensorRT probe.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime
+
+DEFAULT_CACHE_DIR = "/engine-cache"
+DEFAULT_TRTEXEC = "/usr/src/tensorrt/bin/trtexec"
+ENGINE_NAME = "model.plan"
+LOCK_TIMEOUT_SEC = 1800  # a large model can take well over ten minutes to build
+LOCK_POLL_SEC = 2
+
+# Flags that change build logging only, not the engine
+IGNORED_FLAGS = ('--verbose',)
+
+def file_sha256(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _run(cmd):
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=60).stdout.strip()
+    except Exception:
+        return ''
+
+def tensorrt_version(trtexec=DEFAULT_TRTEXEC):
+    """TensorRT version from the Python bindings, falling back to the trtexec banner"""
+    try:
+        import tensorrt
+        return tensorrt.__version__
+    except ImportError:
+        pass
+    # trtexec banner: "&&&& RUNNING TensorRT.trtexec [TensorRT v8601] # ..."
+    match = re.search(r'TensorRT v(\d+)', _run([trtexec, '--help']))
+    if match:
+        return match.group(1)
+    return os.environ.get('TRT_VERSION', 'unknown')
+
+def gpu_signature(trtexec=DEFAULT_TRTEXEC):
+    """Hardware/software signature an engine is only valid for"""
+    gpus = _run(['nvidia-smi', '--query-gpu=name,compute_cap,driver_version', '--format=csv,noheader'])
+    # Engines are built for one device; with several visible GPUs use the first
+    name, compute_cap, driver = ([p.strip() for p in gpus.splitlines()[0].split(',')] + ['', '', ''])[:3] \
+        if gpus else ('unknown', '', '')
+    return {
+        'gpu': name,
+        'compute_cap': compute_cap,
+        'driver': driver,
+        'tensorrt': tensorrt_version(trtexec),
+    }
+
+def normalize_flags(flags):
+    """Build flags that affect the engine, in a stable order"""
+    return sorted(f for f in flags if f not in IGNORED_FLAGS)
+
+def engine_key(onnx_sha256, flags, signature):
+    payload = json.dumps({'onnx': onnx_sha256, 'flags': normalize_flags(flags), 'signature': signature},
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class EngineCache:
+    """Engine store on a shared filesystem with per-key build locks"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        for sub in ('engines', 'locks', 'tmp'):
+            os.makedirs(os.path.join(cache_dir, sub), exist_ok=True)
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, 'engines', key[:2], key)
+
+    def lookup(self, key):
+        """Engine path if the key is published, else None"""
+        path = os.path.join(self.entry_dir(key), ENGINE_NAME)
+        return path if os.path.isfile(path) and os.path.getsize(path) > 0 else None
+
+    def _lock(self, key, timeout):
+        """Exclusive POSIX lock on the key's lock file (works across nodes on NFS/FSS)"""
+        fd = os.open(os.path.join(self.cache_dir, 'locks', f"{key}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.time() + timeout
+        waited = False
+        while True:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                if time.time() > deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"engine build lock {key[:12]} held for more than {timeout}s")
+                if not waited:
+                    print(f"⏳ Another pod is building engine {key[:12]}, waiting...")
+                    waited = True
+                time.sleep(LOCK_POLL_SEC)
+
+    def _unlock(self, fd):
+        fcntl.lockf(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def publish(self, key, build_dir, meta):
+        """Atomically move a finished build directory into place"""
+        with open(os.path.join(build_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        final = self.entry_dir(key)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        try:
+            os.rename(build_dir, final)
+        except OSError:
+            # Published meanwhile (only possible without working locks); keep the existing engine
+            shutil.rmtree(build_dir, ignore_errors=True)
+        return os.path.join(final, ENGINE_NAME)
+
+    def get_or_build(self, key, builder, meta, lock_timeout=LOCK_TIMEOUT_SEC):
+        """(engine path, hit) - build under the key lock when the engine is missing"""
+        path = self.lookup(key)
+        if path:
+            return path, True
+
+        fd = self._lock(key, lock_timeout)
+        try:
+            # Another pod may have published while we waited for the lock
+            path = self.lookup(key)
+            if path:
+                return path, True
+
+            build_dir = os.path.join(self.cache_dir, 'tmp', f"{key}.{os.uname().nodename}.{os.getpid()}")
+            shutil.rmtree(build_dir, ignore_errors=True)
+            os.makedirs(build_dir)
+            try:
+                start = time.perf_counter()
+                builder(os.path.join(build_dir, ENGINE_NAME))
+                engine = os.path.join(build_dir, ENGINE_NAME)
+                if not os.path.isfile(engine) or os.path.getsize(engine) == 0:
+                    raise RuntimeError("builder did not produce an engine")
+                meta = dict(meta, build_sec=round(time.perf_counter() - start, 1),
+                            built_at=datetime.now().isoformat(), built_by=os.uname().nodename)
+                return self.publish(key, build_dir, meta), False
+            except BaseException:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                raise
+        finally:
+            self._unlock(fd)
+
+    def entries(self):
+        """meta.json of every published engine"""
+        root = os.path.join(self.cache_dir, 'engines')
+        found = []
+        for prefix in sorted(os.listdir(root)):
+            for key in sorted(os.listdir(os.path.join(root, prefix))):
+                meta_path = os.path.join(root, prefix, key, 'meta.json')
+                meta = {}
+                if os.path.isfile(meta_path):
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+                meta['key'] = key
+                meta['size_mb'] = os.path.getsize(os.path.join(root, prefix, key, ENGINE_NAME)) / 1e6
+                found.append(meta)
+        return found
+
+def trtexec_builder(trtexec, onnx, flags):
+    def build(engine_path):
+        cmd = [trtexec, f"--onnx={onnx}", f"--saveEngine={engine_path}"] + list(flags)
+        print(f"🔧 {' '.join(cmd)}")
+        subprocess.run(cmd, check=True)
+    return build
+
+def stub_builder(onnx, flags, delay=0.0):
+    """Stand-in for trtexec: writes a deterministic fake engine"""
+    def build(engine_path):
+        print(f"🔧 [stub] building {onnx} {' '.join(flags)} ({delay:.1f}s)")
+        time.sleep(delay)
+        with open(engine_path, 'wb') as f:
+            f.write(b'STUB-ENGINE\n' + hashlib.sha256(f"{onnx}{flags}".encode()).hexdigest().encode())
+    return build
+
+def install(engine_path, output):
+    """Copy the cached engine to the model repository (local copy; the cache may be read-only to Triton)"""
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp = f"{output}.tmp{os.getpid()}"
+    shutil.copyfile(engine_path, tmp)
+    os.replace(tmp, output)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Content-addressed TensorRT engine cache around trtexec",
+                                     usage="%(prog)s --onnx MODEL --output PLAN [options] -- [trtexec build flags]")
+    parser.add_argument('--onnx', help='ONNX model to build')
+    parser.add_argument('--output', help='where to place the engine (model repository path)')
+    parser.add_argument('--cache-dir', default=os.environ.get('ENGINE_CACHE_DIR', DEFAULT_CACHE_DIR),
+                        help=f'shared cache directory (default: $ENGINE_CACHE_DIR or {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--trtexec', default=DEFAULT_TRTEXEC, help=f'trtexec binary (default: {DEFAULT_TRTEXEC})')
+    parser.add_argument('--lock-timeout', type=int, default=LOCK_TIMEOUT_SEC,
+                        help=f'seconds to wait for another build (default: {LOCK_TIMEOUT_SEC})')
+    parser.add_argument('--signature', default=None,
+                        help='override the GPU/TensorRT signature (JSON or plain string), e.g. for local tests')
+    parser.add_argument('--stub-builder', action='store_true', help='write a fake engine instead of running trtexec')
+    parser.add_argument('--stub-delay', type=float, default=0.0, help='seconds the stub build takes')
+    parser.add_argument('--list', action='store_true', help='list cached engines and exit')
+
+    # Everything after "--" goes to trtexec unchanged
+    flags = []
+    if '--' in argv:
+        i = argv.index('--')
+        argv, flags = argv[:i], argv[i + 1:]
+    args = parser.parse_args(argv)
+    if not args.list and not (args.onnx and args.output):
+        parser.error('--onnx and --output are required')
+    args.flags = flags
+    return args
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    cache = EngineCache(args.cache_dir)
+
+    if args.list:
+        entries = cache.entries()
+        print(f"{len(entries)} cached engines in {args.cache_dir}")
+        for e in entries:
+            sig = e.get('signature', {})
+            print(f"  {e['key'][:12]}  {e.get('onnx', '?'):<24} {e['size_mb']:7.1f} MB  "
+                  f"{sig.get('gpu', '?')} TRT {sig.get('tensorrt', '?')}  built {e.get('built_at', '?')[:19]}")
+        return 0
+
+    if args.signature:
+        try:
+            signature = json.loads(args.signature)
+        except ValueError:
+            signature = args.signature
+    else:
+        signature = gpu_signature(args.trtexec)
+
+    start = time.perf_counter()
+    onnx_sha = file_sha256(args.onnx)
+    key = engine_key(onnx_sha, args.flags, signature)
+    print(f"Engine cache: {args.cache_dir}")
+    print(f"  ONNX:      {args.onnx} (sha256 {onnx_sha[:12]})")
+    print(f"  Flags:     {' '.join(normalize_flags(args.flags))}")
+    print(f"  Signature: {json.dumps(signature, sort_keys=True)}")
+    print(f"  Key:       {key[:12]}")
+
+    if args.stub_builder:
+        builder = stub_builder(args.onnx, args.flags, args.stub_delay)
+    else:
+        builder = trtexec_builder(args.trtexec, args.onnx, args.flags)
+    meta = {'onnx': os.path.basename(args.onnx), 'onnx_sha256': onnx_sha,
+            'flags': normalize_flags(args.flags), 'signature': signature}
+
+    engine, hit = cache.get_or_build(key, builder, meta, args.lock_timeout)
+    install(engine, args.output)
+    status = "✓ Cache hit, skipped trtexec" if hit else "✓ Built and cached engine"
+    print(f"{status}: {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB, "
+          f"{time.perf_counter() - start:.1f}s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+#!/bin/bash
+#
+# Model matrix engines - runs in the NIM initContainers
+# Builds MATRIX_MODELS x MATRIX_IMGSZ (comma-separated env vars, set by
+# deploy-all.sh) through the shared engine cache for benchmarking/benchmark_matrix.py.
+# Entries are '<model>' at 640 and '<model>_<imgsz>' otherwise, with the config
+# derived from the deployment's config.pbtxt (name and input dims). A failed
+# build only leaves that entry out of the repository.
+#
+# Usage: matrix_engines.sh [config.pbtxt] [model-repository]
+#   ENGINE_CACHE_ARGS adds engine_cache.py options, e.g. "--stub-builder
+#   --signature test" to try it without a GPU
+#
+set -e
+
+CONFIG="${1:-/scripts/config.pbtxt}"
+REPOSITORY="${2:-/model-repository}"
+ENGINE_CACHE="$(dirname "$0")/engine_cache.py"
+CACHE_DIR="${ENGINE_CACHE_DIR:-/engine-cache}"
+ONNX_DIR="${ONNX_DIR:-/models}"
+
+for MATRIX_MODEL in ${MATRIX_MODELS//,/ }; do
+    for IMGSZ in ${MATRIX_IMGSZ//,/ }; do
+        ENTRY="${MATRIX_MODEL}"
+        [ "${IMGSZ}" = "640" ] || ENTRY="${MATRIX_MODEL}_${IMGSZ}"
+        [ -f "${REPOSITORY}/${ENTRY}/1/model.plan" ] && continue
+        if [ ! -f "${ONNX_DIR}/${MATRIX_MODEL}.onnx" ]; then
+            echo "⚠ ${ONNX_DIR}/${MATRIX_MODEL}.onnx not found, skipping ${ENTRY}"
+            continue
+        fi
+        echo ""
+        echo "🔧 Matrix: converting ${MATRIX_MODEL} at ${IMGSZ}x${IMGSZ} → ${ENTRY}..."
+        mkdir -p "${REPOSITORY}/${ENTRY}/1"
+        if python3 "${ENGINE_CACHE}" \
+            --onnx="${ONNX_DIR}/${MATRIX_MODEL}.onnx" \
+            --output="${REPOSITORY}/${ENTRY}/1/model.plan" \
+            --cache-dir="${CACHE_DIR}" \
+            ${ENGINE_CACHE_ARGS} \
+            -- \
+            --fp16 \
+            --workspace=4096 \
+            --minShapes=images:1x3x${IMGSZ}x${IMGSZ} \
+            --optShapes=images:4x3x${IMGSZ}x${IMGSZ} \
+            --maxShapes=images:8x3x${IMGSZ}x${IMGSZ}; then
+            sed -e "s/^name: .*/name: \"${ENTRY}\"/" \
+                -e "s/dims: \[ 3, 640, 640 \]/dims: [ 3, ${IMGSZ}, ${IMGSZ} ]/" \
+                "${CONFIG}" > "${REPOSITORY}/${ENTRY}/config.pbtxt"
+            echo "✓ ${ENTRY} ready (load with POST /v2/repository/models/${ENTRY}/load)"
+        else
+            echo "⚠ Engine build failed for ${ENTRY}, leaving it out"
+            rm -rf "${REPOSITORY}/${ENTRY}"
+        fi
+    done
+done
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+YOLOv8 Top-K Post-Processing - Triton Python backend model (and local CPU tool)
+Turns the raw output0 tensor ([84, 8400] FP32, ~2.8 MB per image) into the
+top-K detections after confidence filtering and class-aware NMS, so the
+server returns ~2 KB per image instead and clients skip decoding and NMS.
+
+Outputs use the EfficientNMS plugin layout, so a client works unchanged
+against an engine built with that plugin instead of this ensemble:
+  num_detections     [1]         INT32  valid rows in the tensors below
+  detection_boxes    [TOP_K, 4]  FP32   x1, y1, x2, y2 in input pixels (640x640)
+  detection_scores   [TOP_K]     FP32
+  detection_classes  [TOP_K]     INT32  rows past num_detections are zero
+
+In Triton this file is model.py of the <model>_postprocess model, chained
+after the TensorRT engine by the <model>_topk ensemble (see
+kubernetes/nim-grpc/deployment.yaml), with docker/base-yolo/nms.py copied
+beside it. TOP_K, CONF_THRES and IOU_THRES come from the model config
+parameters.
+
+Local testing (CPU only, no Triton):
+  python3 yolo_postprocess.py [--onnx yolov8s.onnx] [--image img.jpg]
+                              [--iterations 100] [--top-k 100]
+
+  With --onnx the model runs on ONNX Runtime (CPU) to produce a real output0;
+  without it a synthetic output0 with a few planted boxes is used. Prints the
+  detections, raw vs top-K bytes and the post-processing time.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+try:
+    from nms import decode  # copied beside model.py in the Triton model repository
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docker', 'base-yolo'))
+    from nms import decode
+
+TOP_K = 100
+CONF_THRES = 0.25
+IOU_THRES = 0.45
+
+OUTPUT_NAMES = ('num_detections', 'detection_boxes', 'detection_scores', 'detection_classes')
+
+def top_k(pred, k=TOP_K, conf=CONF_THRES, iou=IOU_THRES):
+    """One image's (4 + classes, anchors) output -> (num, boxes[k, 4], scores[k], classes[k])"""
+    num = np.zeros(1, dtype=np.int32)
+    boxes = np.zeros((k, 4), dtype=np.float32)
+    scores = np.zeros(k, dtype=np.float32)
+    classes = np.zeros(k, dtype=np.int32)
+
+    kept_boxes, kept_scores, kept_classes = decode(pred, conf, iou, k)
+    n = len(kept_scores)
+    num[0] = n
+    boxes[:n] = kept_boxes
+    scores[:n] = kept_scores
+    classes[:n] = kept_classes
+    return num, boxes, scores, classes
+
+def top_k_batch(output0, k=TOP_K, conf=CONF_THRES, iou=IOU_THRES):
+    """Batched output0 [B, 84, N] -> dict of the four batched output tensors"""
+    per_image = [top_k(pred, k, conf, iou) for pred in output0]
+    return {name: np.stack([r[i] for r in per_image]) for i, name in enumerate(OUTPUT_NAMES)}
+
+class TritonPythonModel:
+    """Triton Python backend entry point (model.py of yolov8s_postprocess)"""
+
+    def initialize(self, args):
+        config = json.loads(args['model_config'])
+        params = {k: v['string_value'] for k, v in config.get('parameters', {}).items()}
+        self.k = int(params.get('TOP_K', TOP_K))
+        self.conf = float(params.get('CONF_THRES', CONF_THRES))
+        self.iou = float(params.get('IOU_THRES', IOU_THRES))
+
+    def execute(self, requests):
+        import triton_python_backend_utils as pb_utils
+
+        responses = []
+        for request in requests:
+            output0 = pb_utils.get_input_tensor_by_name(request, "output0").as_numpy()
+            outputs = top_k_batch(output0.astype(np.float32, copy=False), self.k, self.conf, self.iou)
+            responses.append(pb_utils.InferenceResponse(
+                output_tensors=[pb_utils.Tensor(name, outputs[name]) for name in OUTPUT_NAMES]))
+        return responses
+
+def synthetic_output(classes=80, anchors=8400, boxes=12, seed=0):
+    """Background-noise output0 with a few planted, overlapping high-score boxes"""
+    rng = np.random.default_rng(seed)
+    pred = np.zeros((4 + classes, anchors), dtype=np.float32)
+    pred[:2] = rng.uniform(0, 640, (2, anchors))
+    pred[2:4] = rng.uniform(4, 120, (2, anchors))
+    pred[4:] = rng.uniform(0, 0.05, (classes, anchors))
+    for i in range(boxes):
+        # Three anchors per object, as the detection head produces
+        cols = rng.choice(anchors, 3, replace=False)
+        cx, cy = rng.uniform(60, 580, 2)
+        pred[0, cols] = cx + rng.normal(0, 2, 3)
+        pred[1, cols] = cy + rng.normal(0, 2, 3)
+        pred[2:4, cols] = rng.uniform(40, 120, 2)[:, None]
+        pred[4 + i % classes, cols] = rng.uniform(0.5, 0.95, 3)
+    return pred[None]
+
+def onnx_output(onnx_path, image=None, imgsz=640):
+    """output0 of the ONNX model on ONNX Runtime (CPU) for an image (or random input)"""
+    import onnxruntime as ort
+
+    if image:
+        import cv2
+        img = cv2.resize(cv2.imread(image), (imgsz, imgsz))  # plain resize, no letterbox
+        x = (img[:, :, ::-1].transpose(2, 0, 1)[None] / 255.0).astype(np.float32)
+    else:
+        x = np.random.rand(1, 3, imgsz, imgsz).astype(np.float32)
+    session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+    return session.run(None, {session.get_inputs()[0].name: x})[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the top-K post-processing on CPU")
+    parser.add_argument('--onnx', default=None, help="ONNX model to produce output0 (default: synthetic)")
+    parser.add_argument('--image', default=None, help="input image for --onnx (default: random tensor)")
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--conf', type=float, default=CONF_THRES)
+    parser.add_argument('--iou', type=float, default=IOU_THRES)
+    args = parser.parse_args(argv)
+
+    output0 = onnx_output(args.onnx, args.image, args.imgsz) if args.onnx else synthetic_output()
+    outputs = top_k_batch(output0, args.top_k, args.conf, args.iou)
+
+    times = []
+    for _ in range(args.iterations):
+        start = time.perf_counter()
+        top_k_batch(output0, args.top_k, args.conf, args.iou)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+
+    n = int(outputs['num_detections'][0][0])
+    raw_bytes = output0[0].nbytes
+    topk_bytes = sum(outputs[name][0].nbytes for name in OUTPUT_NAMES)
+
+    print(f"Input: {args.onnx or 'synthetic output0'} {list(output0.shape)}")
+    print(f"Detections: {n} (top-{args.top_k}, conf > {args.conf}, IoU {args.iou})")
+    for box, score, cls in zip(outputs['detection_boxes'][0][:n], outputs['detection_scores'][0][:n],
+                               outputs['detection_classes'][0][:n]):
+        print(f"  class {cls:3d}  score {score:.3f}  box [{', '.join(f'{v:7.1f}' for v in box)}]")
+    print(f"Bytes per image: raw {raw_bytes:,} -> top-K {topk_bytes:,} ({raw_bytes / topk_bytes:.0f}x smaller)")
+    print(f"Post-processing: mean {sum(times) / len(times):.2f} ms, "
+          f"p99 {times[min(len(times) - 1, int(len(times) * 0.99))]:.2f} ms ({args.iterations} runs)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())